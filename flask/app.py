@@ -2,19 +2,28 @@ from apispec import APISpec
 from apispec.ext.marshmallow import MarshmallowPlugin
 from apispec_webframeworks.flask import FlaskPlugin
 from flask_cors import CORS
+from metrics import instrument_app
 from routes.appuser import appuser_bp
+from routes.attendance_report import attendance_report_bp
+from routes.cache_stats import cache_stats_bp
 from routes.class_schedule import class_schedule_bp
 from routes.class_schedule_attendance import class_schedule_attendance_bp
 from routes.create_embedding import embedding_bp
 from routes.detect import detect_bp
+from routes.liveness import liveness_bp
+from routes.metrics import metrics_bp
 from routes.professor import professor_bp
 from routes.recognize import recognize_bp
 from routes.role import role_bp
+from routes.stream import stream_bp
 from routes.work_schedule import work_schedule_bp
+from serialization import OrjsonProvider
 
 from flask import Flask, jsonify
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+instrument_app(app)
 CORS(app)
 
 # Configuración de APISpec
@@ -28,6 +37,8 @@ spec = APISpec(
 # Registrar los blueprints
 app.register_blueprint(detect_bp)
 app.register_blueprint(recognize_bp)
+app.register_blueprint(liveness_bp)
+app.register_blueprint(stream_bp)
 app.register_blueprint(embedding_bp)
 app.register_blueprint(appuser_bp)
 app.register_blueprint(role_bp)
@@ -35,6 +46,9 @@ app.register_blueprint(professor_bp)
 app.register_blueprint(work_schedule_bp)
 app.register_blueprint(class_schedule_attendance_bp)
 app.register_blueprint(class_schedule_bp)
+app.register_blueprint(attendance_report_bp)
+app.register_blueprint(cache_stats_bp)
+app.register_blueprint(metrics_bp)
 
 # Registrar los endpoints en APISpec
 with app.test_request_context():
@@ -0,0 +1,174 @@
+"""
+Detección de inasistencias y salidas sin registrar (tabla ATTENDANCE_ANOMALY, ver sql/).
+
+Solo existen filas en CLASS_SCHEDULE_ATTENDANCE para las clases donde alguien
+registró asistencia. Este proceso expande CLASS_SCHEDULE (días de la semana x
+calendario del rango) en las sesiones esperadas y, con merges vectorizados de
+pandas, marca:
+    ABSENT        sesiones terminadas sin ningún registro de asistencia
+    MISSING_EXIT  entradas sin salida cuando ya pasó END_TIME + la gracia
+
+Cada ejecución reemplaza las anomalías del rango, así que puede repetirse; para
+programarla (cron del host):
+    python attendance_anomalies.py --days 7
+    python attendance_anomalies.py --date-from 2024-09-01 --date-to 2025-01-31
+"""
+import argparse
+import logging
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytz
+
+# Configuración del logger
+logger = logging.getLogger(__name__)
+
+# Minutos tras END_TIME antes de considerar que falta la salida
+EXIT_GRACE_MINUTES = int(os.environ.get('EXIT_GRACE_MINUTES', 10))
+ANOMALY_BATCH_SIZE = int(os.environ.get('ANOMALY_BATCH_SIZE', 5000))
+TIMEZONE = pytz.timezone('America/Guayaquil')
+
+SCHEDULES_QUERY = """
+    SELECT CLASS_SCHEDULE_ID, PROFESSOR_ID, DAYS_OF_WEEK,
+           TO_CHAR(START_TIME, 'HH24:MI:SS') AS START_TIME,
+           TO_CHAR(END_TIME, 'HH24:MI:SS') AS END_TIME
+    FROM CLASS_SCHEDULE
+    WHERE PROFESSOR_ID IS NOT NULL AND DAYS_OF_WEEK IS NOT NULL
+      AND START_TIME IS NOT NULL AND END_TIME IS NOT NULL
+"""
+
+ATTENDANCE_QUERY = """
+    SELECT CLASS_SCHEDULE_ID, PROFESSOR_ID, REGISTER_DATE,
+           CASE WHEN EXIT_TIME IS NULL THEN 1 ELSE 0 END AS MISSING_EXIT
+    FROM CLASS_SCHEDULE_ATTENDANCE
+    WHERE REGISTER_DATE BETWEEN :date_from AND :date_to
+"""
+
+INSERT_ANOMALY_SQL = """
+    INSERT INTO ATTENDANCE_ANOMALY (CLASS_SCHEDULE_ID, PROFESSOR_ID, SESSION_DATE, ANOMALY_TYPE,
+                                    EXPECTED_START, EXPECTED_END, DETECTED_AT)
+    VALUES (:1, :2, :3, :4, :5, :6, SYSDATE)
+"""
+
+ANOMALY_COLUMNS = ['CLASS_SCHEDULE_ID', 'PROFESSOR_ID', 'SESSION_DATE', 'ANOMALY_TYPE',
+                   'EXPECTED_START', 'EXPECTED_END']
+
+
+def read_frame(cursor, query, binds=None):
+    cursor.execute(query, binds or {})
+    columns = [col[0] for col in cursor.description]
+    return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+
+def expected_sessions(schedules, date_from, date_to):
+    """
+    Una fila por clase programada y fecha del rango, con su inicio y fin esperados.
+    """
+    schedules = schedules.assign(DAY_NAME=schedules['DAYS_OF_WEEK'].str.split(','))
+    schedules = schedules.explode('DAY_NAME')
+    schedules['DAY_NAME'] = schedules['DAY_NAME'].str.strip()
+
+    calendar = pd.DataFrame({'SESSION_DATE': pd.date_range(date_from, date_to, freq='D')})
+    calendar['DAY_NAME'] = calendar['SESSION_DATE'].dt.day_name()
+
+    sessions = schedules.merge(calendar, on='DAY_NAME')
+    sessions['EXPECTED_START'] = sessions['SESSION_DATE'] + pd.to_timedelta(sessions['START_TIME'])
+    sessions['EXPECTED_END'] = sessions['SESSION_DATE'] + pd.to_timedelta(sessions['END_TIME'])
+    return sessions.drop_duplicates(['CLASS_SCHEDULE_ID', 'SESSION_DATE'])[
+        ['CLASS_SCHEDULE_ID', 'PROFESSOR_ID', 'SESSION_DATE', 'EXPECTED_START', 'EXPECTED_END']]
+
+
+def find_anomalies(schedules, attendance, date_from, date_to, now, grace_minutes=EXIT_GRACE_MINUTES):
+    """
+    Anti-join de las sesiones esperadas contra las asistencias registradas. Solo
+    se evalúan las sesiones cuyo fin + gracia ya pasó.
+    """
+    sessions = expected_sessions(schedules, date_from, date_to)
+    sessions = sessions[sessions['EXPECTED_END'] + pd.Timedelta(minutes=grace_minutes) <= now]
+
+    attendance = attendance.assign(
+        SESSION_DATE=pd.to_datetime(attendance['REGISTER_DATE']).dt.normalize())
+    registered = attendance[['CLASS_SCHEDULE_ID', 'SESSION_DATE']].drop_duplicates()
+
+    merged = sessions.merge(registered, on=['CLASS_SCHEDULE_ID', 'SESSION_DATE'],
+                            how='left', indicator=True)
+    absent = merged[merged['_merge'] == 'left_only'].assign(ANOMALY_TYPE='ABSENT')
+
+    # La salida faltante se atribuye a quien registró la entrada
+    open_entries = attendance.loc[attendance['MISSING_EXIT'] == 1,
+                                  ['CLASS_SCHEDULE_ID', 'PROFESSOR_ID', 'SESSION_DATE']]
+    missing_exit = sessions.drop(columns='PROFESSOR_ID').merge(
+        open_entries, on=['CLASS_SCHEDULE_ID', 'SESSION_DATE']).assign(ANOMALY_TYPE='MISSING_EXIT')
+
+    anomalies = pd.concat([absent[ANOMALY_COLUMNS], missing_exit[ANOMALY_COLUMNS]], ignore_index=True)
+    return anomalies.drop_duplicates(['CLASS_SCHEDULE_ID', 'SESSION_DATE', 'ANOMALY_TYPE'])
+
+
+def to_rows(anomalies):
+    """
+    Filas con tipos nativos de Python para executemany.
+    """
+    columns = []
+    for name in ANOMALY_COLUMNS:
+        column = anomalies[name]
+        if pd.api.types.is_datetime64_any_dtype(column):
+            columns.append(list(column.dt.to_pydatetime()))
+        elif name == 'ANOMALY_TYPE':
+            columns.append(column.tolist())
+        else:
+            columns.append(column.astype('int64').tolist())
+    return list(zip(*columns))
+
+
+def detect_anomalies(connection, date_from, date_to, now=None):
+    """
+    Reemplaza las anomalías del rango por las detectadas ahora, en una sola
+    transacción. Devuelve el número de anomalías por tipo.
+    """
+    now = now or datetime.now(TIMEZONE).replace(tzinfo=None)
+    cursor = connection.cursor()
+    cursor.arraysize = ANOMALY_BATCH_SIZE
+    try:
+        schedules = read_frame(cursor, SCHEDULES_QUERY)
+        attendance = read_frame(cursor, ATTENDANCE_QUERY, {'date_from': date_from, 'date_to': date_to})
+        anomalies = find_anomalies(schedules, attendance, date_from, date_to, now)
+
+        cursor.execute("DELETE FROM ATTENDANCE_ANOMALY WHERE SESSION_DATE BETWEEN :date_from AND :date_to",
+                       {'date_from': date_from, 'date_to': date_to})
+        rows = to_rows(anomalies)
+        for start in range(0, len(rows), ANOMALY_BATCH_SIZE):
+            cursor.executemany(INSERT_ANOMALY_SQL, rows[start:start + ANOMALY_BATCH_SIZE])
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+    return anomalies['ANOMALY_TYPE'].value_counts().to_dict()
+
+
+if __name__ == '__main__':
+    from db_connection import get_db_connection
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Detectar inasistencias y salidas sin registrar")
+    parser.add_argument('--date-from')
+    parser.add_argument('--date-to')
+    parser.add_argument('--days', type=int, default=7,
+                        help="Días hacia atrás desde hoy si no se indica --date-from")
+    args = parser.parse_args()
+
+    today = datetime.now(TIMEZONE).replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+    date_to = datetime.strptime(args.date_to, '%Y-%m-%d') if args.date_to else today
+    date_from = (datetime.strptime(args.date_from, '%Y-%m-%d') if args.date_from
+                 else date_to - timedelta(days=args.days))
+    if date_to < date_from:
+        parser.error("--date-to debe ser posterior a --date-from")
+
+    connection = get_db_connection()
+    try:
+        counts = detect_anomalies(connection, date_from, date_to)
+    finally:
+        connection.close()
+    logger.info(f"Anomalías del {date_from:%Y-%m-%d} al {date_to:%Y-%m-%d}: {counts}")
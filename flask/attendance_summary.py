@@ -0,0 +1,160 @@
+"""
+Resumen diario de asistencia (ATTENDANCE_DAILY_SUMMARY, ver sql/).
+
+Una fila por profesor y día con las clases y horas programadas, las clases y
+horas asistidas, los atrasos de entrada y salida y las salidas sin registrar.
+register_attendance recalcula la fila del profesor y día afectados dentro de su
+misma transacción (si falla, la asistencia se registra igual y la fila queda
+desactualizada hasta regenerarla); para regenerar un rango completo:
+    python attendance_summary.py --date-from 2024-09-01 --date-to 2025-01-31
+"""
+import argparse
+import logging
+import os
+from datetime import datetime
+
+from db_connection import DB_BACKEND, get_db_connection
+
+# Configuración del logger
+logger = logging.getLogger(__name__)
+
+# 0 = register_attendance no mantiene el resumen (p. ej. sin la DDL aplicada)
+DAILY_SUMMARY_REFRESH = int(os.environ.get('DAILY_SUMMARY_REFRESH', 1))
+
+# Programado (DAYS_OF_WEEK expandido sobre el calendario) frente a asistido, por profesor y día.
+# START_TIME y END_TIME son DATE, así que su diferencia está en días.
+SUMMARY_SOURCE = """
+    SELECT NVL(s.PROFESSOR_ID, t.PROFESSOR_ID) AS PROFESSOR_ID,
+           NVL(s.DAY, t.DAY) AS SUMMARY_DATE,
+           NVL(s.SCHEDULED_CLASSES, 0) AS SCHEDULED_CLASSES,
+           ROUND(NVL(s.SCHEDULED_HOURS, 0), 2) AS SCHEDULED_HOURS,
+           NVL(t.ATTENDED_CLASSES, 0) AS ATTENDED_CLASSES,
+           ROUND(NVL(t.ATTENDED_HOURS, 0), 2) AS ATTENDED_HOURS,
+           NVL(t.LATE_ENTRIES, 0) AS LATE_ENTRIES,
+           NVL(t.LATE_EXITS, 0) AS LATE_EXITS,
+           NVL(t.MISSING_EXITS, 0) AS MISSING_EXITS
+    FROM (
+        SELECT cs.PROFESSOR_ID, d.DAY, COUNT(*) AS SCHEDULED_CLASSES,
+               SUM((cs.END_TIME - cs.START_TIME) * 24) AS SCHEDULED_HOURS
+        FROM CLASS_SCHEDULE cs
+        JOIN (
+            SELECT :date_from + LEVEL - 1 AS DAY FROM DUAL
+            CONNECT BY LEVEL <= :date_to - :date_from + 1
+        ) d ON INSTR(', ' || cs.DAYS_OF_WEEK || ',',
+                     ', ' || TRIM(TO_CHAR(d.DAY, 'Day', 'NLS_DATE_LANGUAGE=ENGLISH')) || ',') > 0
+        WHERE 1 = 1{schedule_filter}
+        GROUP BY cs.PROFESSOR_ID, d.DAY
+    ) s
+    FULL OUTER JOIN (
+        SELECT a.PROFESSOR_ID, a.REGISTER_DATE AS DAY, COUNT(*) AS ATTENDED_CLASSES,
+               SUM(NVL(a.TOTAL_HOURS, 0)) AS ATTENDED_HOURS,
+               SUM(CASE WHEN a.LATE_ENTRY = 'SI' THEN 1 ELSE 0 END) AS LATE_ENTRIES,
+               SUM(CASE WHEN a.LATE_EXIT = 'SI' THEN 1 ELSE 0 END) AS LATE_EXITS,
+               SUM(CASE WHEN a.EXIT_TIME IS NULL THEN 1 ELSE 0 END) AS MISSING_EXITS
+        FROM CLASS_SCHEDULE_ATTENDANCE a
+        WHERE a.REGISTER_DATE BETWEEN :date_from AND :date_to{attendance_filter}
+        GROUP BY a.PROFESSOR_ID, a.REGISTER_DATE
+    ) t ON t.PROFESSOR_ID = s.PROFESSOR_ID AND t.DAY = s.DAY
+"""
+
+MERGE_SUMMARY = """
+    MERGE INTO ATTENDANCE_DAILY_SUMMARY ds
+    USING ({source}) src
+    ON (ds.PROFESSOR_ID = src.PROFESSOR_ID AND ds.SUMMARY_DATE = src.SUMMARY_DATE)
+    WHEN MATCHED THEN UPDATE SET
+        ds.SCHEDULED_CLASSES = src.SCHEDULED_CLASSES, ds.SCHEDULED_HOURS = src.SCHEDULED_HOURS,
+        ds.ATTENDED_CLASSES = src.ATTENDED_CLASSES, ds.ATTENDED_HOURS = src.ATTENDED_HOURS,
+        ds.LATE_ENTRIES = src.LATE_ENTRIES, ds.LATE_EXITS = src.LATE_EXITS,
+        ds.MISSING_EXITS = src.MISSING_EXITS, ds.UPDATED_AT = SYSDATE
+    WHEN NOT MATCHED THEN INSERT (
+        PROFESSOR_ID, SUMMARY_DATE, SCHEDULED_CLASSES, SCHEDULED_HOURS, ATTENDED_CLASSES,
+        ATTENDED_HOURS, LATE_ENTRIES, LATE_EXITS, MISSING_EXITS, UPDATED_AT
+    ) VALUES (
+        src.PROFESSOR_ID, src.SUMMARY_DATE, src.SCHEDULED_CLASSES, src.SCHEDULED_HOURS,
+        src.ATTENDED_CLASSES, src.ATTENDED_HOURS, src.LATE_ENTRIES, src.LATE_EXITS,
+        src.MISSING_EXITS, SYSDATE
+    )
+"""
+
+# Variante para DB_BACKEND=sqlite, que no tiene MERGE
+UPSERT_SUMMARY = """
+    INSERT INTO ATTENDANCE_DAILY_SUMMARY (
+        PROFESSOR_ID, SUMMARY_DATE, SCHEDULED_CLASSES, SCHEDULED_HOURS, ATTENDED_CLASSES,
+        ATTENDED_HOURS, LATE_ENTRIES, LATE_EXITS, MISSING_EXITS, UPDATED_AT
+    )
+    SELECT src.*, SYSDATE FROM ({source}) src WHERE 1 = 1
+    ON CONFLICT (PROFESSOR_ID, SUMMARY_DATE) DO UPDATE SET
+        SCHEDULED_CLASSES = excluded.SCHEDULED_CLASSES, SCHEDULED_HOURS = excluded.SCHEDULED_HOURS,
+        ATTENDED_CLASSES = excluded.ATTENDED_CLASSES, ATTENDED_HOURS = excluded.ATTENDED_HOURS,
+        LATE_ENTRIES = excluded.LATE_ENTRIES, LATE_EXITS = excluded.LATE_EXITS,
+        MISSING_EXITS = excluded.MISSING_EXITS, UPDATED_AT = excluded.UPDATED_AT
+"""
+
+
+def merge_summary_query(professor_id=None):
+    schedule_filter = attendance_filter = ""
+    if professor_id is not None:
+        schedule_filter = " AND cs.PROFESSOR_ID = :professor_id"
+        attendance_filter = " AND a.PROFESSOR_ID = :professor_id"
+    source = SUMMARY_SOURCE.format(schedule_filter=schedule_filter,
+                                   attendance_filter=attendance_filter)
+    template = UPSERT_SUMMARY if DB_BACKEND == 'sqlite' else MERGE_SUMMARY
+    return template.format(source=source)
+
+
+def refresh_daily_summary(cursor, professor_id, register_date):
+    """
+    Recalcula la fila (profesor, día) a partir de sus pocas asistencias del día.
+    No confirma la transacción: la confirma quien registró la asistencia.
+    """
+    cursor.execute(merge_summary_query(professor_id), {
+        'professor_id': professor_id,
+        'date_from': register_date,
+        'date_to': register_date,
+    })
+
+
+def rebuild_daily_summary(connection, date_from, date_to, professor_id=None):
+    """
+    Regenera el rango en una sola transacción: borra sus filas y las vuelve a
+    calcular con un MERGE por conjuntos. Devuelve las filas escritas.
+    """
+    binds = {'date_from': date_from, 'date_to': date_to}
+    delete = "DELETE FROM ATTENDANCE_DAILY_SUMMARY WHERE SUMMARY_DATE BETWEEN :date_from AND :date_to"
+    if professor_id is not None:
+        delete += " AND PROFESSOR_ID = :professor_id"
+        binds['professor_id'] = professor_id
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute(delete, binds)
+        cursor.execute(merge_summary_query(professor_id), binds)
+        written = cursor.rowcount
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+    return written
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Regenerar el resumen diario de asistencia")
+    parser.add_argument('--date-from', required=True)
+    parser.add_argument('--date-to', required=True)
+    parser.add_argument('--professor-id', type=int)
+    args = parser.parse_args()
+
+    date_from = datetime.strptime(args.date_from, '%Y-%m-%d')
+    date_to = datetime.strptime(args.date_to, '%Y-%m-%d')
+    if date_to < date_from:
+        parser.error("--date-to debe ser posterior a --date-from")
+
+    connection = get_db_connection()
+    try:
+        written = rebuild_daily_summary(connection, date_from, date_to, args.professor_id)
+    finally:
+        connection.close()
+    logger.info(f"Resumen diario regenerado del {args.date_from} al {args.date_to}: {written} filas")
@@ -0,0 +1,96 @@
+"""
+Mide la latencia de detección y el recall frente a la resolución de entrada de YOLO.
+
+Uso (desde /app):
+    python -m benchmarks.bench_detect_resolution --images academic_staff_database --sizes 320 480 640 960
+
+La referencia son las detecciones sobre la imagen completa con --reference-size.
+Para cada tamaño se mide decodificación (reducida) + letterbox + inferencia, y el
+recall es la fracción de rostros de referencia recuperados con IoU >= --iou.
+"""
+import argparse
+import json
+import os
+import time
+
+import cv2
+import inference
+import numpy as np
+from box_ops import box_iou, unletterbox_boxes
+from image_ops import decode_image, letterbox
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+MIN_CONFIDENCE = 0.8
+
+
+def list_images(directory, limit):
+    paths = []
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)[:limit] if limit else sorted(paths)
+
+
+def detect_at(data, size):
+    """
+    Ejecuta la ruta de /detect para un tamaño de entrada y devuelve (cajas, segundos).
+    """
+    start = time.perf_counter()
+    img, scale = decode_image(data, size)
+    model_input, ratio, pad = letterbox(img, size)
+    boxes = inference.detect(model_input, imgsz=size)
+    boxes = unletterbox_boxes(boxes, ratio, pad, scale)
+    elapsed = time.perf_counter() - start
+    return boxes[boxes[:, 4] > MIN_CONFIDENCE], elapsed
+
+
+def run(paths, sizes, reference_size, iou_threshold):
+    blobs = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            blobs.append(f.read())
+
+    # Referencia: imagen completa (sin decodificación reducida)
+    references = []
+    for data in blobs:
+        img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        model_input, ratio, pad = letterbox(img, reference_size)
+        boxes = unletterbox_boxes(inference.detect(
+            model_input, imgsz=reference_size), ratio, pad)
+        references.append(boxes[boxes[:, 4] > MIN_CONFIDENCE])
+
+    report = []
+    for size in sizes:
+        detect_at(blobs[0], size)  # calentamiento
+        latencies, found, expected = [], 0, 0
+        for data, reference in zip(blobs, references):
+            boxes, elapsed = detect_at(data, size)
+            latencies.append(elapsed * 1000)
+            expected += len(reference)
+            if len(reference) and len(boxes):
+                found += int((box_iou(reference, boxes).max(axis=1) >= iou_threshold).sum())
+
+        report.append({
+            'input_size': size,
+            'images': len(blobs),
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p95_ms': float(np.percentile(latencies, 95)),
+            'recall': found / expected if expected else None,
+        })
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--images', required=True,
+                        help="Directorio con imágenes de prueba")
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[320, 480, 640, 960])
+    parser.add_argument('--reference-size', type=int, default=1280)
+    parser.add_argument('--iou', type=float, default=0.5)
+    parser.add_argument('--limit', type=int, default=200)
+    args = parser.parse_args()
+
+    paths = list_images(args.images, args.limit)
+    print(json.dumps(run(paths, args.sizes, args.reference_size, args.iou), indent=2))
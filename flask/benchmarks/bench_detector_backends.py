@@ -0,0 +1,93 @@
+"""
+Compara los backends de detección (ultralytics, onnx, openvino) sobre las mismas entradas.
+
+Uso (desde /app):
+    python -m benchmarks.bench_detector_backends --images academic_staff_database --backends ultralytics onnx
+
+Para cada backend se informa la latencia y, frente a ultralytics (PyTorch),
+cuántas imágenes producen exactamente las mismas cajas, la diferencia máxima
+en coordenadas/confianza y el IoU mínimo entre cajas emparejadas.
+"""
+import argparse
+import json
+import time
+
+import cv2
+import numpy as np
+from benchmarks.bench_detect_resolution import list_images
+from box_ops import box_iou
+from detectors import build_detector
+from image_ops import DETECT_INPUT_SIZE, letterbox
+
+
+def compare(reference, boxes):
+    """
+    Empareja cada caja de referencia con la de mayor IoU del otro backend.
+    """
+    if len(reference) != len(boxes):
+        return {'same_count': False}
+    if len(reference) == 0:
+        return {'same_count': True, 'exact': True, 'max_coord_diff': 0.0,
+                'max_conf_diff': 0.0, 'min_iou': 1.0}
+
+    ious = box_iou(reference, boxes)
+    match = ious.argmax(axis=1)
+    matched = boxes[match]
+    return {
+        'same_count': True,
+        'exact': bool(np.array_equal(reference, matched)),
+        'max_coord_diff': float(np.abs(reference[:, :4] - matched[:, :4]).max()),
+        'max_conf_diff': float(np.abs(reference[:, 4] - matched[:, 4]).max()),
+        'min_iou': float(ious[np.arange(len(reference)), match].min()),
+    }
+
+
+def run(paths, backends, imgsz):
+    inputs = []
+    for path in paths:
+        img = cv2.imread(path)
+        if img is not None:
+            inputs.append(letterbox(img, imgsz)[0])
+
+    outputs, report = {}, {}
+    for backend in ['ultralytics'] + [b for b in backends if b != 'ultralytics']:
+        detector = build_detector(backend)
+        detector.detect(inputs[0], imgsz)  # calentamiento
+
+        latencies, results = [], []
+        for model_input in inputs:
+            start = time.perf_counter()
+            boxes = detector.detect(model_input, imgsz)
+            latencies.append((time.perf_counter() - start) * 1000)
+            results.append(np.asarray(boxes, dtype=np.float32))
+        outputs[backend] = results
+
+        entry = {
+            'images': len(inputs),
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p95_ms': float(np.percentile(latencies, 95)),
+        }
+        if backend != 'ultralytics':
+            comparisons = [compare(r, b) for r, b in zip(outputs['ultralytics'], results)]
+            same = [c for c in comparisons if c['same_count']]
+            entry['agreement'] = {
+                'same_count': len(same),
+                'exact': sum(c['exact'] for c in same),
+                'max_coord_diff': max((c['max_coord_diff'] for c in same), default=None),
+                'max_conf_diff': max((c['max_conf_diff'] for c in same), default=None),
+                'min_iou': min((c['min_iou'] for c in same), default=None),
+            }
+        report[backend] = entry
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--images', required=True)
+    parser.add_argument('--backends', nargs='+', default=['ultralytics', 'onnx', 'openvino'])
+    parser.add_argument('--imgsz', type=int, default=DETECT_INPUT_SIZE)
+    parser.add_argument('--limit', type=int, default=200)
+    args = parser.parse_args()
+
+    paths = list_images(args.images, args.limit)
+    print(json.dumps(run(paths, args.backends, args.imgsz), indent=2))
@@ -0,0 +1,106 @@
+"""
+Compara el envío de fotogramas a un proceso de inferencia serializados (pickle)
+frente a referencias a ranuras del anillo de memoria compartida.
+
+Uso (desde /app):
+    python -m benchmarks.bench_frame_transfer --iterations 200
+
+Cada solicitud simulada envía el fotograma completo (como /detect) y un
+recorte del rostro (como /recognize). "bytes_copied" cuenta las copias en
+espacio de usuario: la serialización en el emisor más el arreglo que se
+materializa en el receptor.
+"""
+import argparse
+import json
+import pickle
+import time
+from multiprocessing import Pipe, get_context
+
+import numpy as np
+from shared_frames import FrameRing, resolve_frames
+
+RESOLUTIONS = [(480, 640), (720, 1280), (1080, 1920)]
+
+
+def _receiver(conn, ring_spec):
+    ring = FrameRing.attach(*ring_spec)
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        args, _ = resolve_frames(ring, message, {})
+        # Tocar los datos para que ambos caminos lean los mismos píxeles
+        conn.send(sum(int(a[0, 0, 0]) for a in args))
+    ring.shm.close()
+
+
+def _crop_box(shape):
+    h, w = shape[:2]
+    return w // 4, h // 4, w // 2, h // 2
+
+
+def run(iterations):
+    ring = FrameRing.create(name='bench_frames', slots=2,
+                            slot_bytes=max(h * w * 3 for h, w in RESOLUTIONS))
+    ctx = get_context('spawn')
+    parent, child = Pipe()
+    process = ctx.Process(target=_receiver, args=(
+        child, (ring.shm.name, ring.slots, ring.slot_bytes)))
+    process.start()
+
+    report = []
+    try:
+        for shape in RESOLUTIONS:
+            frame = np.random.randint(0, 255, size=shape + (3,), dtype=np.uint8)
+            x1, y1, x2, y2 = _crop_box(shape)
+            crop = frame[y1:y2, x1:x2]
+
+            # Camino anterior: fotograma y recorte serializados en cada llamada
+            start = time.perf_counter()
+            pickled_bytes = 0
+            for _ in range(iterations):
+                for payload in ([frame], [np.ascontiguousarray(crop)]):
+                    pickled_bytes += len(pickle.dumps(payload))
+                    parent.send(payload)
+                    parent.recv()
+            pickled_seconds = time.perf_counter() - start
+            pickled_copied = 2 * pickled_bytes // iterations
+
+            # Camino nuevo: una escritura en la ranura y referencias por ID
+            start = time.perf_counter()
+            shared_bytes = 0
+            for _ in range(iterations):
+                ref = ring.write(0, frame)
+                shared_bytes += frame.nbytes
+                for payload in ([ref], [ref.crop(x1, y1, x2, y2)]):
+                    shared_bytes += len(pickle.dumps(payload))
+                    parent.send(payload)
+                    parent.recv()
+            shared_seconds = time.perf_counter() - start
+            shared_copied = shared_bytes // iterations
+
+            report.append({
+                'resolution': f"{shape[1]}x{shape[0]}",
+                'frame_bytes': frame.nbytes,
+                'pickled': {
+                    'bytes_copied_per_request': pickled_copied,
+                    'ms_per_request': 1000 * pickled_seconds / iterations,
+                },
+                'shared_memory': {
+                    'bytes_copied_per_request': shared_copied,
+                    'ms_per_request': 1000 * shared_seconds / iterations,
+                },
+            })
+    finally:
+        parent.send(None)
+        process.join()
+        ring.close()
+
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--iterations', type=int, default=100)
+    args = parser.parse_args()
+    print(json.dumps(run(args.iterations), indent=2))
@@ -0,0 +1,122 @@
+"""
+Compara la construcción y serialización de respuestas JSON con el camino
+anterior (nombres de columna por fila + json de la biblioteca estándar, como
+jsonify) frente a serialization (columnas en caché + orjson).
+
+Uso (desde /app):
+    python -m benchmarks.bench_serialization --iterations 200
+
+Los conjuntos de resultados imitan /professors?per_page=100 y un listado de
+asistencias de un semestre, con los tipos que devuelve cx_Oracle.
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from werkzeug.http import http_date
+
+import serialization
+from serialization import rows_to_dicts, to_native
+
+PROFESSOR_COLUMNS = ('PROFESSOR_ID', 'USER_ID', 'PROFESSOR_CODE', 'FIRST_NAME', 'LAST_NAME',
+                     'EMAIL', 'REGISTRATION_DATE', 'PHOTO', 'UNIVERSITY_ID', 'ID_CARD')
+ATTENDANCE_COLUMNS = ('CLASS_SCHEDULE_ATTENDANCE_ID', 'PROFESSOR_ID', 'ATTENDANCE_CODE',
+                      'REGISTER_DATE', 'ENTRY_TIME', 'EXIT_TIME', 'TOTAL_HOURS', 'LATE_ENTRY',
+                      'TYPE', 'REGISTER_ENTRY', 'REGISTER_EXIT', 'LATE_EXIT')
+
+
+class FakeCursor:
+    """
+    Cursor mínimo: description y statement como los de cx_Oracle.
+    """
+
+    def __init__(self, columns, statement):
+        self.description = [(name, None, None, None, None, None, None) for name in columns]
+        self.statement = statement
+
+
+def professor_rows(count):
+    base = datetime(2024, 8, 1)
+    return [(i, 1000 + i, f"P{i:05d}", f"Nombre{i}", f"Apellido{i}", f"docente{i}@espe.edu.ec",
+             base + timedelta(days=i % 300), f"/photos/{i}.jpg", f"L00{i:06d}", f"17{i:08d}")
+            for i in range(count)]
+
+
+def attendance_rows(count):
+    base = datetime(2024, 9, 2, 7, 0)
+    rows = []
+    for i in range(count):
+        entry = base + timedelta(days=i // 40, minutes=random.randint(-10, 15))
+        rows.append((i, i % 400, f"{i % 900}-{i % 400}-{entry:%Y%m%d}", entry.replace(hour=0, minute=0),
+                     entry, entry + timedelta(hours=2), Decimal('2.00'), random.choice(['SI', 'NO']),
+                     'PRESENCIAL', 'SI', 'SI', 'NO'))
+    return rows
+
+
+def stdlib_default(value):
+    # Lo que hace el proveedor por defecto de Flask con fechas y Decimal
+    if isinstance(value, datetime):
+        return http_date(value)
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(type(value).__name__)
+
+
+def legacy(cursor, rows):
+    items = [dict(zip([col[0] for col in cursor.description], row)) for row in rows]
+    return json.dumps({'items': items}, default=stdlib_default, sort_keys=True,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def optimized(cursor, rows):
+    items = rows_to_dicts(cursor, rows)
+    return serialization.orjson.dumps(
+        {'items': items}, default=to_native,
+        option=serialization.orjson.OPT_PASSTHROUGH_DATETIME | serialization.orjson.OPT_SORT_KEYS)
+
+
+def measure(fn, cursor, rows, iterations):
+    fn(cursor, rows)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        size = len(fn(cursor, rows))
+    elapsed = time.perf_counter() - start
+    return {
+        'ms_per_response': round(elapsed / iterations * 1000, 3),
+        'rows_per_second': round(len(rows) * iterations / elapsed),
+        'bytes': size,
+    }
+
+
+def run(iterations):
+    if serialization.orjson is None:
+        raise SystemExit("orjson no está instalado")
+
+    cases = [
+        ('professors_page_100', FakeCursor(PROFESSOR_COLUMNS, 'SELECT professors'),
+         professor_rows(100), iterations),
+        ('attendance_semester_20k', FakeCursor(ATTENDANCE_COLUMNS, 'SELECT attendance'),
+         attendance_rows(20000), max(1, iterations // 50)),
+    ]
+    report = []
+    for name, cursor, rows, runs in cases:
+        before = measure(legacy, cursor, rows, runs)
+        after = measure(optimized, cursor, rows, runs)
+        report.append({
+            'case': name,
+            'rows': len(rows),
+            'legacy': before,
+            'optimized': after,
+            'speedup': round(before['ms_per_response'] / after['ms_per_response'], 2),
+        })
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(run(args.iterations), indent=2))
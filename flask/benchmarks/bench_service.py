@@ -0,0 +1,187 @@
+"""
+Benchmark del servicio completo sin red, modelos ni Oracle.
+
+Uso (desde /app):
+    python -m benchmarks.bench_service --requests 200 --identities 50 --output bench.json
+
+Genera una galería sintética (benchmarks.synthetic), usa DB_BACKEND=sqlite
+sobre un archivo temporal (benchmarks.sqlite_standin) y envía solicitudes a /detect,
+/recognize y /class_schedule_attendance con el cliente de pruebas de Flask.
+Por endpoint informa la latencia p50/p95/p99, el throughput y los códigos de
+estado; además el pico de memoria (RSS) del proceso, todo en JSON.
+"""
+import argparse
+import io
+import json
+import logging
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+
+import cv2
+import numpy as np
+from benchmarks import sqlite_standin, synthetic
+
+FRAME_SIZE = (720, 1280)
+FACE_SIZE = (180, 220)
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def encode_jpeg(img):
+    ok, buffer = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    return buffer.tobytes()
+
+
+def make_frames(identities, count, faces_per_frame, rng):
+    """
+    Fotogramas JPEG con rostros de la galería y sus cajas reales.
+    """
+    frames = []
+    for _ in range(count):
+        chosen = rng.choice(identities, size=faces_per_frame, replace=False)
+        faces = synthetic.layout_faces(chosen, FRAME_SIZE, FACE_SIZE, rng)
+        frames.append((encode_jpeg(synthetic.render_frame(faces, FRAME_SIZE, rng)), faces))
+    return frames
+
+
+def detect_request(client, frame):
+    image, _ = frame
+    return client.post('/detect', data={'image': (io.BytesIO(image), 'frame.jpg')},
+                       content_type='multipart/form-data')
+
+
+def recognize_request(client, frame):
+    image, faces = frame
+    boxes = [{'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2, 'confidence': 0.95}
+             for _, x1, y1, x2, y2 in faces]
+    return client.post('/recognize', data={'image': (io.BytesIO(image), 'frame.jpg'),
+                                           'faces': json.dumps(boxes)},
+                       content_type='multipart/form-data')
+
+
+def attendance_requests(classes, count):
+    """
+    Entrada (07:05) y salida (09:02) alternadas, cada par en una clase y fecha nuevas.
+    """
+    first_day = date(2024, 9, 2)
+    payloads = []
+    for n in range(count):
+        class_schedule_id, professor_id = classes[(n // 2) % len(classes)][:2]
+        day = first_day + timedelta(days=n // (2 * len(classes)))
+        clock = '07:05:00.000' if n % 2 == 0 else '09:02:00.000'
+        payloads.append({
+            'CLASS_SCHEDULE_ID': class_schedule_id,
+            'PROFESSOR_ID': professor_id,
+            'REGISTER_DATE': day.isoformat(),
+            'TIME': f"{day.isoformat()}T{clock}Z",
+        })
+    return payloads
+
+
+def measure(send, inputs, warmup):
+    for item in inputs[:warmup]:
+        send(item)
+
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    for item in inputs[warmup:]:
+        t0 = time.perf_counter()
+        response = send(item)
+        latencies.append(time.perf_counter() - t0)
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+    elapsed = time.perf_counter() - start
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {
+        'requests': len(latencies),
+        'warmup': warmup,
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'mean_ms': round(float(np.mean(latencies)) * 1000, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'status': statuses,
+    }
+
+
+def run(requests, warmup, identities, images_per_identity, faces_per_frame, seed):
+    rng = np.random.default_rng(seed)
+    ids = list(range(1, identities + 1))
+
+    started = time.perf_counter()
+    sqlite_standin.install()
+    gallery = synthetic.build_gallery(ids, images_per_identity, face_size=FACE_SIZE, seed=seed)
+    synthetic.install(gallery)
+    classes = sqlite_standin.seed(identities)
+
+    # La cascada de ojos se crea al importar la ruta
+    from app import app
+    import routes.recognize
+    routes.recognize.eye_cascade = synthetic.SyntheticEyeCascade()
+    client = app.test_client()
+    setup_seconds = time.perf_counter() - started
+
+    total = requests + warmup
+    frames = make_frames(ids, total, faces_per_frame, rng)
+    endpoints = {
+        '/detect': measure(lambda f: detect_request(client, f), frames, warmup),
+        '/recognize': measure(lambda f: recognize_request(client, f), frames, warmup),
+        '/class_schedule_attendance': measure(
+            lambda payload: client.post('/class_schedule_attendance', json=payload),
+            attendance_requests(classes, total), warmup),
+    }
+    return {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'config': {
+            'requests': requests,
+            'warmup': warmup,
+            'identities': identities,
+            'images_per_identity': images_per_identity,
+            'faces_per_frame': faces_per_frame,
+            'frame_size': list(FRAME_SIZE),
+            'seed': seed,
+        },
+        'setup_seconds': round(setup_seconds, 3),
+        'endpoints': endpoints,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--identities', type=int, default=50)
+    parser.add_argument('--images-per-identity', type=int, default=5)
+    parser.add_argument('--faces-per-frame', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args()
+
+    # Los logs por solicitud distorsionarían las latencias
+    logging.basicConfig(level=logging.WARNING)
+    report = run(args.requests, args.warmup, args.identities, args.images_per_identity,
+                 args.faces_per_frame, args.seed)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
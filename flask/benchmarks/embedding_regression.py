@@ -0,0 +1,99 @@
+"""
+Compara dos backends de embeddings sobre un conjunto local de imágenes etiquetadas.
+
+Uso (desde /app):
+    python -m benchmarks.embedding_regression --images academic_staff_database \\
+        --reference onnx --candidate onnx-int8
+
+Las imágenes se organizan en una carpeta por identidad (como la base de rostros).
+Los rostros se recortan una sola vez con el detector configurado y ambos backends
+reciben exactamente los mismos recortes. Se informa:
+  - la deriva coseno entre el embedding de referencia y el del candidato,
+  - la exactitud de verificación (todas las parejas) al umbral indicado,
+  - la latencia por rostro y la aceleración del candidato.
+"""
+import argparse
+import json
+import time
+
+import cv2
+import numpy as np
+from benchmarks.bench_detect_resolution import list_images
+from detectors import crop_best_face
+from embedders import build_embedder
+from gallery import COSINE_THRESHOLD, identity_from_path, normalize
+
+
+def load_faces(paths):
+    faces, labels = [], []
+    for path in paths:
+        img = cv2.imread(path)
+        face = crop_best_face(img) if img is not None else None
+        if face is not None:
+            faces.append(face)
+            labels.append(identity_from_path(path))
+    return faces, np.array(labels)
+
+
+def embed_all(backend, faces, batch_size):
+    embedder = build_embedder(backend)
+    embedder.embed_faces(faces[:1])  # calentamiento
+
+    start = time.perf_counter()
+    embeddings = np.concatenate([embedder.embed_faces(faces[i:i + batch_size])
+                                 for i in range(0, len(faces), batch_size)])
+    elapsed = time.perf_counter() - start
+    return normalize(embeddings), 1000 * elapsed / len(faces)
+
+
+def verification(embeddings, labels, threshold):
+    """
+    Exactitud, TAR y FAR sobre todas las parejas distintas (distancia coseno <= threshold).
+    """
+    distances = 1.0 - embeddings @ embeddings.T
+    same = labels[:, None] == labels[None, :]
+    upper = np.triu_indices(len(labels), k=1)
+    accepted, genuine = distances[upper] <= threshold, same[upper]
+
+    return {
+        'pairs': int(len(genuine)),
+        'accuracy': float((accepted == genuine).mean()),
+        'tar': float(accepted[genuine].mean()) if genuine.any() else None,
+        'far': float(accepted[~genuine].mean()) if (~genuine).any() else None,
+    }
+
+
+def run(paths, reference, candidate, threshold, batch_size):
+    faces, labels = load_faces(paths)
+    ref_embeddings, ref_ms = embed_all(reference, faces, batch_size)
+    cand_embeddings, cand_ms = embed_all(candidate, faces, batch_size)
+
+    drift = 1.0 - (ref_embeddings * cand_embeddings).sum(axis=1)
+    return {
+        'faces': len(faces),
+        'identities': int(len(set(labels))),
+        'threshold': threshold,
+        'cosine_drift': {
+            'mean': float(drift.mean()),
+            'p95': float(np.percentile(drift, 95)),
+            'max': float(drift.max()),
+        },
+        reference: dict(verification(ref_embeddings, labels, threshold), ms_per_face=ref_ms),
+        candidate: dict(verification(cand_embeddings, labels, threshold), ms_per_face=cand_ms),
+        'speedup': ref_ms / cand_ms if cand_ms else None,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--images', required=True)
+    parser.add_argument('--reference', default='onnx')
+    parser.add_argument('--candidate', default='onnx-int8')
+    parser.add_argument('--threshold', type=float, default=COSINE_THRESHOLD)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--limit', type=int, default=500)
+    args = parser.parse_args()
+
+    paths = list_images(args.images, args.limit)
+    print(json.dumps(run(paths, args.reference, args.candidate,
+                         args.threshold, args.batch_size), indent=2))
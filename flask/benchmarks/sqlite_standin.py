@@ -0,0 +1,66 @@
+"""
+Base SQLite en un archivo temporal en lugar de Oracle para los benchmarks.
+
+Usa el backend sqlite de db_connection (esquema de sql/schema_sqlite.sql y
+traducción del SQL de Oracle); aquí solo se elige el archivo y se cargan
+profesores y clases de 07:00 a 09:00 todos los días.
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+ALL_DAYS = "Monday, Tuesday, Wednesday, Thursday, Friday, Saturday, Sunday"
+
+
+def install(directory=None):
+    """
+    Selecciona DB_BACKEND=sqlite con un archivo nuevo. Debe llamarse antes de
+    importar db_connection (el backend se elige al importarlo).
+    """
+    if 'db_connection' in sys.modules:
+        raise RuntimeError("db_connection ya está importado; llamar a install antes")
+    directory = directory or tempfile.mkdtemp(prefix='bench_db_')
+    path = os.path.join(directory, 'attendance.sqlite')
+    os.environ['DB_BACKEND'] = 'sqlite'
+    os.environ['DB_SQLITE_PATH'] = path
+    return path
+
+
+def seed(professors, classes_per_professor=1):
+    """
+    Carga los profesores y sus clases. Devuelve la lista de
+    (CLASS_SCHEDULE_ID, PROFESSOR_ID, START_TIME, END_TIME).
+    """
+    from db_connection import get_db_connection
+
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    try:
+        cursor.executemany("""
+            INSERT INTO PROFESSOR (PROFESSOR_ID, PROFESSOR_CODE, FIRST_NAME, LAST_NAME, EMAIL)
+            VALUES (:1, :2, :3, :4, :5)
+        """, [(i, f"PC{i:03}", f"Nombre{i}", f"Apellido{i}", f"docente{i}@espe.edu.ec")
+              for i in range(1, professors + 1)])
+
+        base = datetime(2024, 8, 17, 7, 0)
+        rows = []
+        for professor_id in range(1, professors + 1):
+            for n in range(classes_per_professor):
+                start = base + timedelta(hours=2 * n)
+                rows.append((professor_id, 'SYNTHETIC', 'GRADO', f"C{n}", f"Materia {n}",
+                             str(1000 + professor_id * 10 + n), 'ACTIVO', '1', 3, 'PRESENCIAL',
+                             'A', '101', 40, start, start + timedelta(hours=2), ALL_DAYS))
+        cursor.executemany("""
+            INSERT INTO CLASS_SCHEDULE (
+                PROFESSOR_ID, KNOWLEDGE_AREA, EDUCATION_LEVEL, CODE, SUBJECT, NRC, STATUS, SECTION,
+                CREDITS, TYPE, BUILDING, CLASSROOM, CAPACITY, START_TIME, END_TIME, DAYS_OF_WEEK
+            ) VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :9, :10, :11, :12, :13, :14, :15, :16)
+        """, rows)
+        connection.commit()
+
+        cursor.execute("SELECT CLASS_SCHEDULE_ID, PROFESSOR_ID, START_TIME, END_TIME FROM CLASS_SCHEDULE")
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        connection.close()
@@ -0,0 +1,192 @@
+"""
+Mundo sintético para los benchmarks sin modelos ni base de rostros.
+
+Cada identidad es un patrón de textura generado a partir de su número; los
+rostros se dibujan como elipses con ese patrón (tono piel: rojo > azul) sobre
+fondo negro, con dos ojos oscuros con reflejo. Los backends sintéticos hacen
+trabajo real y dependiente de la imagen, pero sin redes neuronales:
+
+    SyntheticDetector   componentes conexas de los píxeles con tono piel
+    SyntheticEmbedder   el recorte reducido a 16x32 en gris (512 valores), normalizado
+    SyntheticEyeCascade la cascada Haar real; si no encuentra ojos, los del dibujo
+
+Así se miden la decodificación, el letterbox, la selección de cajas, la vida,
+la búsqueda en la galería, la caché y la serialización, no la latencia de YOLO
+ni de Facenet512 (para eso están bench_detector_backends y embedding_regression).
+"""
+import os
+
+import cv2
+import numpy as np
+from embedders import EMBEDDING_SIZE
+from gallery import Gallery
+
+BACKEND_NAME = 'synthetic'
+PATTERN_CELLS = 8
+# Posición de los ojos en el rostro (fracción del ancho y del alto)
+EYE_CENTERS = ((0.3, 0.38), (0.7, 0.38))
+
+
+def identity_pattern(identity):
+    rng = np.random.default_rng(int(identity))
+    return rng.integers(90, 230, size=(PATTERN_CELLS, PATTERN_CELLS), dtype=np.uint8)
+
+
+def render_face(identity, width, height, rng, noise=6.0):
+    """
+    Rostro BGR de width x height: elipse con la textura de la identidad, ruido y ojos.
+    """
+    texture = cv2.resize(identity_pattern(identity), (width, height), interpolation=cv2.INTER_LINEAR)
+    texture = np.clip(texture + rng.normal(0, noise, texture.shape), 0, 255).astype(np.uint8)
+
+    face = np.zeros((height, width, 3), dtype=np.uint8)
+    face[..., 2] = np.maximum(texture, 120)  # rojo
+    face[..., 1] = (texture * 0.75).astype(np.uint8)
+    face[..., 0] = (texture * 0.45).astype(np.uint8)  # azul
+
+    mask = np.zeros((height, width), dtype=np.uint8)
+    cv2.ellipse(mask, (width // 2, height // 2), (width // 2 - 1, height // 2 - 1), 0, 0, 360, 255, -1)
+    face[mask == 0] = 0
+
+    radius = max(2, width // 12)
+    for fx, fy in EYE_CENTERS:
+        center = (int(width * fx), int(height * fy))
+        cv2.circle(face, center, radius, (40, 30, 30), -1)
+        cv2.circle(face, (center[0] + radius // 3, center[1] - radius // 3), max(1, radius // 3),
+                   (255, 255, 255), -1)
+    return face
+
+
+def render_frame(faces, size=(720, 1280), rng=None, noise=6.0):
+    """
+    Fotograma de cámara con los rostros [(identidad, x1, y1, x2, y2)].
+    """
+    rng = rng or np.random.default_rng()
+    frame = np.zeros(size + (3,), dtype=np.uint8)
+    for identity, x1, y1, x2, y2 in faces:
+        face = render_face(identity, x2 - x1, y2 - y1, rng, noise)
+        region = frame[y1:y2, x1:x2]
+        np.copyto(region, face, where=face.any(axis=2, keepdims=True))
+    return frame
+
+
+def layout_faces(identities, size=(720, 1280), face_size=(180, 220), rng=None):
+    """
+    Cajas sin solaparse, una por identidad, en una fila del fotograma.
+    """
+    rng = rng or np.random.default_rng()
+    height, width = size
+    face_w, face_h = face_size
+    slot = width // max(len(identities), 1)
+    faces = []
+    for i, identity in enumerate(identities):
+        x1 = i * slot + int(rng.integers(0, max(slot - face_w, 1)))
+        y1 = int(rng.integers(0, height - face_h))
+        faces.append((identity, x1, y1, x1 + face_w, y1 + face_h))
+    return faces
+
+
+def skin_mask(img):
+    return (img[..., 2].astype(np.int16) - img[..., 0]) > 40
+
+
+class SyntheticDetector:
+    name = BACKEND_NAME
+
+    def __init__(self, min_area=400, confidence=0.95):
+        self.min_area = min_area
+        self.confidence = confidence
+
+    def detect(self, img, imgsz=None):
+        mask = skin_mask(img).astype(np.uint8)
+        count, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        stats = stats[1:count]
+        stats = stats[stats[:, cv2.CC_STAT_AREA] >= self.min_area]
+        boxes = np.empty((len(stats), 6), dtype=np.float32)
+        boxes[:, 0] = stats[:, cv2.CC_STAT_LEFT]
+        boxes[:, 1] = stats[:, cv2.CC_STAT_TOP]
+        boxes[:, 2] = stats[:, cv2.CC_STAT_LEFT] + stats[:, cv2.CC_STAT_WIDTH]
+        boxes[:, 3] = stats[:, cv2.CC_STAT_TOP] + stats[:, cv2.CC_STAT_HEIGHT]
+        boxes[:, 4] = self.confidence
+        boxes[:, 5] = 0
+        return boxes
+
+
+class SyntheticEmbedder:
+    name = BACKEND_NAME
+    detects_faces = False
+
+    def embed_faces(self, faces):
+        if len(faces) == 0:
+            return np.empty((0, EMBEDDING_SIZE), dtype=np.float32)
+        vectors = []
+        for face in faces:
+            gray = face if face.ndim == 2 else cv2.cvtColor(face, cv2.COLOR_BGR2GRAY)
+            small = cv2.resize(gray, (16, EMBEDDING_SIZE // 16), interpolation=cv2.INTER_AREA)
+            vector = small.astype(np.float32).ravel()
+            vector -= vector.mean()
+            vectors.append(vector / max(float(np.linalg.norm(vector)), 1e-6))
+        return np.stack(vectors)
+
+    def embed_image(self, img):
+        return self.embed_faces([img])
+
+    def represent(self, img, enforce_detection=True):
+        height, width = img.shape[:2]
+        return [{
+            'embedding': self.embed_faces([img])[0].tolist(),
+            'facial_area': {'x': 0, 'y': 0, 'w': width, 'h': height},
+            'face_confidence': None,
+        }]
+
+
+class SyntheticEyeCascade:
+    """
+    Ejecuta la cascada de ojos real (su costo es parte de la vida) y, si no
+    encuentra ojos en el rostro dibujado, devuelve los del dibujo.
+    """
+
+    def __init__(self):
+        self.cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_eye.xml')
+
+    def detectMultiScale(self, gray, *args, **kwargs):
+        eyes = self.cascade.detectMultiScale(gray, *args, **kwargs)
+        if len(eyes):
+            return eyes
+        height, width = gray.shape[:2]
+        side = max(4, width // 6)
+        return np.array([(int(width * fx) - side // 2, int(height * fy) - side // 2, side, side)
+                         for fx, fy in EYE_CENTERS])
+
+
+def build_gallery(identities, images_per_identity, root='/synthetic', face_size=(180, 220), seed=0):
+    """
+    Galería con images_per_identity recortes ruidosos de cada identidad.
+    """
+    rng = np.random.default_rng(seed)
+    embedder = SyntheticEmbedder()
+    faces, paths = [], []
+    for identity in identities:
+        for n in range(images_per_identity):
+            faces.append(render_face(identity, face_size[0], face_size[1], rng))
+            paths.append(os.path.join(root, str(identity), f"{n}.jpg"))
+    return Gallery(embedder.embed_faces(faces), paths, BACKEND_NAME)
+
+
+def install(gallery):
+    """
+    Reemplaza en este proceso el detector, el backend de embeddings y la galería
+    por los sintéticos. Debe llamarse antes de importar la aplicación.
+    """
+    import detectors
+    import embedders
+    import gallery as gallery_module
+    import model_server
+
+    os.environ.pop('MODEL_SERVER_HOST', None)
+    model_server.MODEL_SERVER_HOST = None
+    detectors._detector = SyntheticDetector()
+    embedders._embedder = SyntheticEmbedder()
+    with gallery_module._gallery_lock:
+        gallery_module._gallery = gallery
+        gallery_module._checked_at = float('inf')
@@ -0,0 +1,87 @@
+import numpy as np
+
+
+def unletterbox_boxes(boxes, ratio, pad, scale=1):
+    """
+    Lleva cajas (x1, y1, x2, y2, ...) de la entrada con letterbox a coordenadas
+    de la imagen original. scale es el factor de la decodificación reducida.
+    """
+    boxes = np.array(boxes, dtype=np.float32, copy=True)
+    if len(boxes) == 0:
+        return boxes
+    boxes[:, [0, 2]] -= pad[0]
+    boxes[:, [1, 3]] -= pad[1]
+    boxes[:, :4] *= scale / ratio
+    return boxes
+
+
+def clip_boxes(boxes, width, height):
+    """
+    Recorta las coordenadas de las cajas a los límites de la imagen (en el sitio).
+    """
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width - 1)
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height - 1)
+    return boxes
+
+
+def box_iou(boxes_a, boxes_b):
+    """
+    IoU entre todas las parejas de cajas: devuelve una matriz (len(a), len(b)).
+    """
+    a = np.asarray(boxes_a, dtype=np.float32)[:, None, :4]
+    b = np.asarray(boxes_b, dtype=np.float32)[None, :, :4]
+
+    inter_w = (np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0])).clip(0)
+    inter_h = (np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1])).clip(0)
+    inter = inter_w * inter_h
+
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-9)
+
+
+def select_faces(boxes, min_confidence, top_k=1, min_size=0):
+    """
+    Filtra las cajas por confianza (> min_confidence) y tamaño mínimo (lado menor
+    en píxeles) y las ordena por confianza descendente. top_k=0 devuelve todas.
+    """
+    boxes = np.asarray(boxes, dtype=np.float32)
+    if len(boxes) == 0:
+        return boxes.reshape(0, 6)
+
+    sides = np.minimum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1])
+    boxes = boxes[(boxes[:, 4] > min_confidence) & (sides >= min_size)]
+
+    order = np.argsort(-boxes[:, 4], kind='stable')
+    if top_k:
+        order = order[:top_k]
+    return boxes[order]
+
+
+def nms(boxes, iou_threshold=0.5):
+    """
+    Supresión de no máximos: conserva la caja de mayor confianza de cada grupo
+    de cajas que se solapan con IoU > iou_threshold.
+    """
+    boxes = np.asarray(boxes, dtype=np.float32)
+    if len(boxes) <= 1:
+        return boxes
+
+    boxes = boxes[np.argsort(-boxes[:, 4], kind='stable')]
+    overlaps = box_iou(boxes, boxes) > iou_threshold
+    keep = np.ones(len(boxes), dtype=bool)
+    for i in range(len(boxes)):
+        if keep[i]:
+            keep[i + 1:] &= ~overlaps[i, i + 1:]
+    return boxes[keep]
+
+
+def merge_frames(boxes_per_frame, iou_threshold=0.5):
+    """
+    Une las detecciones de varios fotogramas de la misma cámara: un rostro visto
+    en varios fotogramas queda como una sola caja (la de mayor confianza).
+    """
+    frames = [np.asarray(b, dtype=np.float32).reshape(-1, 6) for b in boxes_per_frame]
+    if not frames:
+        return np.empty((0, 6), dtype=np.float32)
+    return nms(np.concatenate(frames), iou_threshold)
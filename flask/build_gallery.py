@@ -0,0 +1,237 @@
+"""
+Reconstruye fuera de línea la galería de rostros del backend de embeddings activo.
+
+    python build_gallery.py --workers 8
+    python build_gallery.py --source rostros --workers 8
+    python build_gallery.py --output /tmp/gallery_onnx.npz --no-resume
+
+Los procesos del pool decodifican cada imagen y recortan su rostro principal con
+el detector; el proceso principal embebe los recortes en lotes. Con el backend
+deepface (que detecta por su cuenta) cada proceso calcula también el embedding,
+igual que la sincronización de la galería en el servidor.
+
+El avance se guarda cada --checkpoint-every imágenes en <salida>.checkpoint.npz;
+una ejecución interrumpida continúa desde ahí. El artefacto final se escribe de
+forma atómica y los servidores de modelos lo recargan al detectar el cambio.
+"""
+import argparse
+import hashlib
+import logging
+import multiprocessing
+import os
+import re
+import sys
+import time
+
+import numpy as np
+from embedders import EMBEDDING_BACKEND, EMBEDDING_SIZE, build_embedder
+from gallery import (DEEPFACE_DB_PATH, IMAGE_EXTENSIONS, Gallery, embed_gallery_image,
+                     gallery_path, list_gallery_images)
+
+# Configuración del logger
+logger = logging.getLogger(__name__)
+
+# Dígitos de la cédula (nombre de las carpetas de la base de rostros)
+ID_CARD_DIGITS = 10
+
+_worker = {}
+
+
+def init_worker(backend, threads):
+    """
+    Carga los modelos una vez por proceso, limitando sus hilos para no saturar los núcleos.
+    """
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    os.environ['DETECTOR_THREADS'] = str(threads)
+    if backend == 'deepface':
+        _worker['embedder'] = build_embedder(backend)
+    else:
+        from detectors import get_detector
+        _worker['detector'] = get_detector()
+
+
+def process_image(path):
+    """
+    Devuelve (ruta, tipo, dato): el recorte del rostro ('face'), el embedding
+    ('embedding') o el motivo del fallo ('error').
+    """
+    import cv2
+
+    img = cv2.imread(path)
+    if img is None:
+        return path, 'error', "No se pudo decodificar la imagen"
+
+    if 'embedder' in _worker:
+        embedding = embed_gallery_image(img, _worker['embedder'])
+        if embedding is None:
+            return path, 'error', "No se encontró un rostro"
+        return path, 'embedding', np.asarray(embedding, dtype=np.float32)
+
+    from detectors import crop_best_face
+    face = crop_best_face(img, _worker['detector'])
+    if face is None:
+        return path, 'error', "No se encontró un rostro"
+    return path, 'face', np.ascontiguousarray(face)
+
+
+def checkpoint_path(output):
+    return f"{output}.checkpoint.npz"
+
+
+def load_checkpoint(path, backend):
+    if not os.path.exists(path):
+        return [], [], []
+    with np.load(path, allow_pickle=False) as data:
+        if str(data['backend']) != backend:
+            logger.warning(f"Checkpoint de otro backend ({data['backend']}), se ignora")
+            return [], [], []
+        return (list(data['embeddings']), data['paths'].tolist(), data['failed'].tolist())
+
+
+def save_checkpoint(path, backend, embeddings, paths, failed):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, embeddings=np.asarray(embeddings, dtype=np.float32).reshape(-1, EMBEDDING_SIZE),
+                 paths=np.array(paths, dtype=str), failed=np.array(failed, dtype=str),
+                 backend=np.array(backend))
+    os.replace(tmp_path, path)
+
+
+def directory_hashes(directory):
+    if not os.path.isdir(directory):
+        return set()
+    digests = set()
+    for name in os.listdir(directory):
+        if name.lower().endswith(IMAGE_EXTENSIONS):
+            with open(os.path.join(directory, name), 'rb') as f:
+                digests.add(hashlib.sha1(f.read()).hexdigest())
+    return digests
+
+
+def materialize_rostros(db_path):
+    """
+    Escribe en la base de rostros (una carpeta por cédula, MaestroID) las imágenes de la
+    tabla Rostros que aún no estén en disco. Una imagen ya guardada con otro
+    nombre (p. ej. por la inscripción masiva) se reconoce por su contenido y no
+    se duplica: contaría dos veces en el centroide de la identidad.
+    """
+    from db_connection import get_db_connection
+
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    cursor.arraysize = 100
+    written = 0
+    hashes = {}  # carpeta -> SHA-1 de las imágenes que ya contiene
+    try:
+        cursor.execute("SELECT MaestroID, ROWIDTOCHAR(ROWID), ImagenRostro FROM Rostros")
+        for maestro_id, row_id, image in cursor:
+            # MaestroID es NUMBER: se pierden los ceros a la izquierda de la cédula
+            directory = os.path.join(db_path, str(int(maestro_id)).zfill(ID_CARD_DIGITS))
+            path = os.path.join(directory, f"rostro_{re.sub(r'[^A-Za-z0-9]', '_', row_id)}.jpg")
+            if os.path.exists(path) or image is None:
+                continue
+            # LOB de cx_Oracle o bytes (DB_BACKEND=sqlite)
+            data = image.read() if hasattr(image, 'read') else image
+            if directory not in hashes:
+                hashes[directory] = directory_hashes(directory)
+            digest = hashlib.sha1(data).hexdigest()
+            if digest in hashes[directory]:
+                continue
+            os.makedirs(directory, exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+            hashes[directory].add(digest)
+            written += 1
+    finally:
+        cursor.close()
+        connection.close()
+    logger.info(f"Rostros: {written} imágenes nuevas escritas en {db_path}")
+
+
+def print_progress(done, total, started, failed):
+    elapsed = time.monotonic() - started
+    rate = done / elapsed if elapsed else 0.0
+    eta = (total - done) / rate if rate else 0.0
+    sys.stderr.write(f"\r[{done}/{total}] {rate:.1f} img/s, {failed} fallidas, ETA {eta:.0f}s ")
+    sys.stderr.flush()
+
+
+def build(db_path, output, backend, workers, batch_size, checkpoint_every, resume):
+    paths = list_gallery_images(db_path)
+    checkpoint = checkpoint_path(output)
+    embeddings, done_paths, failed = load_checkpoint(checkpoint, backend) if resume else ([], [], [])
+    processed = set(done_paths) | set(failed)
+    pending = [p for p in paths if p not in processed]
+    logger.info(f"{len(paths)} imágenes, {len(processed)} ya procesadas, {len(pending)} pendientes")
+
+    embedder = None if backend == 'deepface' else build_embedder(backend)
+    faces, face_paths = [], []
+    started, since_checkpoint = time.monotonic(), 0
+
+    def flush_faces():
+        if faces:
+            embeddings.extend(embedder.embed_faces(faces))
+            done_paths.extend(face_paths)
+            faces.clear()
+            face_paths.clear()
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    if backend != 'deepface':
+        # Exportar el detector aquí y no en cada proceso del pool
+        from detectors import prepare_detector
+        prepare_detector()
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(workers, initializer=init_worker, initargs=(backend, threads)) as pool:
+        for count, (path, kind, value) in enumerate(
+                pool.imap_unordered(process_image, pending, chunksize=4), start=1):
+            if kind == 'face':
+                faces.append(value)
+                face_paths.append(path)
+                if len(faces) >= batch_size:
+                    flush_faces()
+            elif kind == 'embedding':
+                embeddings.append(value)
+                done_paths.append(path)
+            else:
+                failed.append(path)
+                logger.debug(f"{path}: {value}")
+
+            since_checkpoint += 1
+            if since_checkpoint >= checkpoint_every:
+                flush_faces()
+                save_checkpoint(checkpoint, backend, embeddings, done_paths, failed)
+                since_checkpoint = 0
+            print_progress(len(processed) + count, len(paths), started, len(failed))
+
+    flush_faces()
+    sys.stderr.write("\n")
+
+    # Solo las imágenes que siguen existiendo, en el orden de la base de rostros
+    current = set(paths)
+    keep = [i for i, p in enumerate(done_paths) if p in current]
+    gallery = Gallery([embeddings[i] for i in keep], [done_paths[i] for i in keep], backend)
+    gallery.save(output)
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    logger.info(f"Galería escrita en {output}: {len(gallery)} imágenes, "
+                f"{len(failed)} sin rostro o ilegibles")
+    return gallery
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Reconstruir la galería de rostros")
+    parser.add_argument('--source', choices=['directory', 'rostros'], default='directory')
+    parser.add_argument('--db-path', default=DEEPFACE_DB_PATH)
+    parser.add_argument('--backend', default=EMBEDDING_BACKEND)
+    parser.add_argument('--output')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--checkpoint-every', type=int, default=500)
+    parser.add_argument('--no-resume', dest='resume', action='store_false')
+    args = parser.parse_args()
+
+    if args.source == 'rostros':
+        materialize_rostros(args.db_path)
+    build(args.db_path, args.output or gallery_path(args.db_path, args.backend), args.backend,
+          args.workers, args.batch_size, args.checkpoint_every, args.resume)
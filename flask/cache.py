@@ -0,0 +1,229 @@
+"""
+Caché compartida de consultas por entidad e ID (roles, horarios de trabajo,
+usuarios y profesores), datos que cambian pocas veces por semestre.
+
+Las claves llevan la generación de su espacio de nombres (entidad:generación:id).
+Las rutas PUT/PATCH/DELETE invalidan el espacio completo incrementando su
+generación, así que todas las búsquedas de una entidad (por ID, cédula, correo...)
+dejan de verse a la vez.
+
+CACHE_BACKEND elige dónde se guardan:
+    local  LRU con caducidad en el proceso (por defecto; con varios procesos,
+           TTL corto porque cada uno tiene su propia copia)
+    redis  servidor compatible con Redis en CACHE_REDIS_URL, compartido entre
+           procesos; el desalojo lo hace el servidor (maxmemory-policy allkeys-lru)
+"""
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from db_connection import get_db_connection
+from serialization import row_to_dict
+
+# Configuración del logger
+logger = logging.getLogger(__name__)
+
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'local')
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+# Entradas máximas de la caché local (0 = caché deshabilitada)
+CACHE_SIZE = int(os.environ.get('CACHE_SIZE', 1024))
+CACHE_TTL = int(os.environ.get('CACHE_TTL', 300))
+# Procesos del servidor web (WEB_CONCURRENCY, la que lee gunicorn). Con la caché
+# local una invalidación solo llega al proceso que atendió la escritura, así que
+# con varios procesos el TTL se limita a CACHE_LOCAL_TTL (los demás ven datos
+# viejos a lo sumo ese tiempo); para invalidar en todos, CACHE_BACKEND=redis
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 1))
+CACHE_LOCAL_TTL = int(os.environ.get('CACHE_LOCAL_TTL', 5))
+
+
+class LocalBackend:
+    """
+    LRU con caducidad en memoria, con la misma interfaz que RedisBackend.
+    """
+
+    def __init__(self, max_size=CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()  # clave -> (valor, caduca en)
+        self.generations = {}
+        self.lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self.entries[key]
+                self.expirations += 1
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, ttl):
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def generation(self, namespace):
+        return self.generations.get(namespace, 0)
+
+    def bump(self, namespace):
+        with self.lock:
+            self.generations[namespace] = self.generations.get(namespace, 0) + 1
+            # Las claves de generaciones anteriores ya no se pueden leer
+            prefix = f"{namespace}:"
+            for key in [k for k in self.entries if k.startswith(prefix)]:
+                del self.entries[key]
+
+    def stats(self):
+        with self.lock:
+            return {'size': len(self.entries), 'evictions': self.evictions,
+                    'expirations': self.expirations}
+
+
+class RedisBackend:
+    """
+    Servidor compatible con Redis; los valores se guardan con pickle.
+    """
+
+    def __init__(self, url=CACHE_REDIS_URL):
+        import redis
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self.client.get(key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(key, pickle.dumps(value), ex=ttl)
+
+    def generation(self, namespace):
+        return int(self.client.get(f"generation:{namespace}") or 0)
+
+    def bump(self, namespace):
+        self.client.incr(f"generation:{namespace}")
+
+    def stats(self):
+        return {'size': self.client.dbsize()}
+
+
+class QueryCache:
+    """
+    Caché de filas por (entidad, clave) con invalidación por entidad.
+    """
+
+    def __init__(self, backend, ttl=CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'errors': 0}
+
+    def _count(self, stat):
+        with self.lock:
+            self.stats[stat] += 1
+
+    def _key(self, namespace, key):
+        return f"{namespace}:{self.backend.generation(namespace)}:{key}"
+
+    def get_or_load(self, namespace, key, load):
+        """
+        Valor en caché o, si no está, el de load(). Los None (no encontrado) no se
+        guardan. Si el backend falla se consulta directamente la base de datos.
+        """
+        try:
+            cache_key = self._key(namespace, key)
+            value = self.backend.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Caché no disponible: {e}")
+            self._count('errors')
+            return load()
+
+        if value is not None:
+            self._count('hits')
+            return value
+
+        self._count('misses')
+        value = load()
+        if value is not None:
+            try:
+                self.backend.set(cache_key, value, self.ttl)
+            except Exception as e:
+                logger.warning(f"No se pudo guardar en la caché: {e}")
+                self._count('errors')
+        return value
+
+    def invalidate(self, namespace):
+        try:
+            self.backend.bump(namespace)
+            self._count('invalidations')
+        except Exception as e:
+            logger.error(f"No se pudo invalidar la caché de {namespace}: {e}")
+            self._count('errors')
+
+    def snapshot(self):
+        with self.lock:
+            stats = dict(self.stats)
+        try:
+            stats.update(self.backend.stats())
+        except Exception as e:
+            logger.warning(f"No se pudieron leer las estadísticas de la caché: {e}")
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+        stats['backend'] = type(self.backend).__name__
+        return stats
+
+
+def build_backend(name=CACHE_BACKEND):
+    if name == 'redis':
+        try:
+            return RedisBackend()
+        except ImportError:
+            logger.warning("redis no está instalado, se usa la caché local")
+    return LocalBackend()
+
+
+def build_cache(name=CACHE_BACKEND, workers=WEB_CONCURRENCY):
+    backend = build_backend(name)
+    if isinstance(backend, LocalBackend) and workers > 1:
+        logger.warning(f"Caché local con {workers} procesos: las invalidaciones no se comparten, "
+                       f"TTL limitado a {CACHE_LOCAL_TTL}s (usar CACHE_BACKEND=redis)")
+        return QueryCache(backend, min(CACHE_TTL, CACHE_LOCAL_TTL))
+    return QueryCache(backend)
+
+
+_cache = build_cache()
+
+
+def get_cache():
+    return _cache
+
+
+def fetch_one_cached(namespace, key, query, binds):
+    """
+    Primera fila de la consulta como diccionario (columna -> valor), o None,
+    pasando por la caché de la entidad.
+    """
+    def load():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, binds)
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return row_to_dict(cursor, row)
+        finally:
+            cursor.close()
+            conn.close()
+
+    return _cache.get_or_load(namespace, key, load)
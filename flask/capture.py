@@ -0,0 +1,273 @@
+"""
+Captura de cámaras en el servidor.
+
+Cada fuente configurada en CAPTURE_SOURCES (dispositivos V4L2 como /dev/video0,
+índices de cámara o archivos de video para pruebas) se procesa en tres hilos
+conectados por colas acotadas que descartan el fotograma más antiguo:
+
+    captura -> detección (YOLO) -> reconocimiento (vida + Facenet512)
+
+Los reconocimientos se publican en un EventBus del proceso, que /stream/events
+expone como Server-Sent Events.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import cv2
+from box_ops import select_faces
+from liveness import check_liveness
+from recognition import detect_boxes, identify_each
+
+# Configuración del logger
+logger = logging.getLogger(__name__)
+
+# Fuentes separadas por comas; vacío = captura deshabilitada
+CAPTURE_SOURCES = os.environ.get('CAPTURE_SOURCES', '')
+CAPTURE_WIDTH = int(os.environ.get('CAPTURE_WIDTH', 1280))
+CAPTURE_HEIGHT = int(os.environ.get('CAPTURE_HEIGHT', 720))
+CAPTURE_FPS = int(os.environ.get('CAPTURE_FPS', 15))
+# Fotogramas en espera entre etapas; con la cola llena se descarta el más antiguo
+CAPTURE_QUEUE_SIZE = int(os.environ.get('CAPTURE_QUEUE_SIZE', 1))
+MIN_CONFIDENCE = 0.8
+EVENT_HISTORY = 100
+SUBSCRIBER_QUEUE_SIZE = 100
+
+eye_cascade = cv2.CascadeClassifier(
+    cv2.data.haarcascades + 'haarcascade_eye.xml')
+
+
+def put_latest(q, item):
+    """
+    Encola sin bloquear; si la cola está llena descarta el elemento más antiguo.
+    Devuelve True si se descartó algo.
+    """
+    dropped = False
+    while True:
+        try:
+            q.put_nowait(item)
+            return dropped
+        except queue.Full:
+            try:
+                q.get_nowait()
+                dropped = True
+            except queue.Empty:
+                pass
+
+
+class EventBus:
+    """
+    Distribuye los eventos de reconocimiento a todos los suscriptores del proceso.
+    """
+
+    def __init__(self, history=EVENT_HISTORY):
+        self.lock = threading.Lock()
+        self.subscribers = []
+        self.recent = deque(maxlen=history)
+
+    def subscribe(self):
+        q = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self.lock:
+            self.subscribers.append(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self.lock:
+            if q in self.subscribers:
+                self.subscribers.remove(q)
+
+    def publish(self, event):
+        with self.lock:
+            self.recent.append(event)
+            subscribers = list(self.subscribers)
+        # Un suscriptor lento pierde los eventos más antiguos, no bloquea la captura
+        for q in subscribers:
+            put_latest(q, event)
+
+
+def open_source(source):
+    """
+    Abre una cámara V4L2, un índice de cámara o un archivo de video.
+    """
+    if source.isdigit():
+        cap = cv2.VideoCapture(int(source), cv2.CAP_V4L2)
+    elif source.startswith('/dev/video'):
+        cap = cv2.VideoCapture(source, cv2.CAP_V4L2)
+    else:
+        return cv2.VideoCapture(source)
+
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAPTURE_WIDTH)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAPTURE_HEIGHT)
+    cap.set(cv2.CAP_PROP_FPS, CAPTURE_FPS)
+    # Solo interesa el fotograma más reciente
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+class CameraPipeline:
+    """
+    Captura, detección y reconocimiento de una fuente en hilos en segundo plano.
+
+    tracker (opcional) recibe las cajas de cada fotograma y decide qué rostros
+    necesitan reconocimiento; sin tracker se reconocen todos los rostros.
+    """
+
+    def __init__(self, source, bus, tracker=None, queue_size=CAPTURE_QUEUE_SIZE):
+        self.source = source
+        self.name = os.path.basename(source) or source
+        self.bus = bus
+        self.tracker = tracker
+        self.detect_queue = queue.Queue(maxsize=queue_size)
+        self.recognize_queue = queue.Queue(maxsize=queue_size)
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.stats = {'captured': 0, 'dropped_detect': 0, 'detected': 0,
+                      'dropped_recognize': 0, 'recognized': 0, 'events': 0}
+
+    def start(self):
+        for target in (self.capture_loop, self.detect_loop, self.recognize_loop):
+            thread = threading.Thread(target=target, name=f"{self.name}-{target.__name__}",
+                                      daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        logger.info(f"Captura iniciada: {self.source}")
+
+    def stop(self):
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join(timeout=2)
+
+    def capture_loop(self):
+        cap = open_source(self.source)
+        if not cap.isOpened():
+            logger.error(f"No se pudo abrir la fuente de video: {self.source}")
+            return
+
+        # Los archivos se leen a su velocidad nominal para simular una cámara
+        is_file = not (self.source.isdigit() or self.source.startswith('/dev/video'))
+        interval = 1.0 / (cap.get(cv2.CAP_PROP_FPS) or CAPTURE_FPS) if is_file else 0
+
+        try:
+            while not self.stop_event.is_set():
+                ok, frame = cap.read()
+                if not ok:
+                    if is_file:
+                        logger.info(f"Fin del video: {self.source}")
+                        break
+                    time.sleep(0.1)
+                    continue
+
+                self.stats['captured'] += 1
+                if put_latest(self.detect_queue, (time.time(), frame)):
+                    self.stats['dropped_detect'] += 1
+                if interval:
+                    time.sleep(interval)
+        finally:
+            cap.release()
+
+    def detect_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                timestamp, frame = self.detect_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            try:
+                boxes = select_faces(detect_boxes(frame), MIN_CONFIDENCE, top_k=0)
+            except Exception as e:
+                logger.exception(f"Error en la detección ({self.name}): {str(e)}")
+                continue
+            if len(boxes) == 0:
+                continue
+
+            self.stats['detected'] += 1
+            faces = [{'box': box} for box in boxes[:, :4].astype(int).tolist()]
+            if self.tracker is not None:
+                faces = self.tracker.update(boxes, timestamp)
+            # Una caja recortada al borde puede quedar sin ancho o alto: su recorte estaría vacío
+            faces = [face for face in faces if face.get('recognize', True)
+                     and face['box'][2] > face['box'][0] and face['box'][3] > face['box'][1]]
+            if faces and put_latest(self.recognize_queue, (timestamp, frame, faces)):
+                self.stats['dropped_recognize'] += 1
+
+    def recognize_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                timestamp, frame, faces = self.recognize_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            try:
+                self.recognize(timestamp, frame, faces)
+            except Exception as e:
+                logger.exception(f"Error en el reconocimiento ({self.name}): {str(e)}")
+
+    def recognize(self, timestamp, frame, faces):
+        crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in (f['box'] for f in faces)]
+        live, _ = check_liveness(crops, eye_cascade)
+
+        for face, is_live in zip(faces, live):
+            identity, score = None, None
+            if is_live:
+                match = identify_each(frame, [face['box']])[0]
+                identity, score = match['identity'], match['score']
+            self.stats['recognized'] += 1
+
+            if self.tracker is not None and 'track_id' in face:
+                self.tracker.set_identity(face['track_id'], identity, is_live, timestamp)
+
+            event = {
+                'camera': self.name,
+                'timestamp': timestamp,
+                'box': face['box'],
+                'live': is_live,
+                'identity': identity or ("Desconocido" if is_live else None),
+                'score': score,
+            }
+            if 'track_id' in face:
+                event['track_id'] = face['track_id']
+            self.bus.publish(event)
+            self.stats['events'] += 1
+
+
+_bus = EventBus()
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+
+def get_event_bus():
+    return _bus
+
+
+def get_pipelines():
+    return dict(_pipelines)
+
+
+def start_capture(sources=None, tracker_factory=None):
+    """
+    Inicia (una sola vez por fuente) las capturas configuradas en CAPTURE_SOURCES.
+    No se llama al importar: /stream la inicia en su primer uso.
+    """
+    if sources is None:
+        sources = [s.strip() for s in CAPTURE_SOURCES.split(',') if s.strip()]
+
+    with _pipelines_lock:
+        for source in sources:
+            if source in _pipelines:
+                continue
+            tracker = tracker_factory() if tracker_factory else None
+            pipeline = CameraPipeline(source, _bus, tracker)
+            pipeline.start()
+            _pipelines[source] = pipeline
+    return get_pipelines()
+
+
+def stop_capture():
+    with _pipelines_lock:
+        for pipeline in _pipelines.values():
+            pipeline.stop()
+        _pipelines.clear()
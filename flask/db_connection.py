@@ -1,15 +1,105 @@
-import cx_Oracle
+"""
+Acceso a la base de datos. DB_BACKEND elige la implementación:
+    oracle  pool de sesiones de cx_Oracle sobre oracle-db (producción)
+    sqlite  base local con el esquema de sql/ (sqlite_backend), para pruebas de
+            carga, benchmarks y perfiles sin el contenedor de Oracle
+Las rutas escriben SQL de Oracle y usan get_db_connection, las excepciones y
+los tipos exportados aquí, e insert_returning_id para las claves generadas.
+"""
+import os
+import threading
+
+try:
+    import cx_Oracle
+except ImportError:  # solo lo necesita DB_BACKEND=oracle
+    cx_Oracle = None
+
+DB_BACKEND = os.environ.get('DB_BACKEND', 'oracle')
+# Tamaño del pool de sesiones de Oracle (por proceso)
+DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN', 2))
+DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX', 10))
+
+
+class OracleBackend:
+    name = 'oracle'
+
+    def __init__(self):
+        if cx_Oracle is None:
+            raise ImportError("cx_Oracle no está instalado (DB_BACKEND=oracle)")
+        self.DatabaseError = cx_Oracle.DatabaseError
+        self.IntegrityError = cx_Oracle.IntegrityError
+        self.pool = None
+        self.lock = threading.Lock()
+
+    def get_pool(self):
+        """
+        Pool de sesiones compartido por los hilos del proceso (se crea en el primer uso).
+        """
+        with self.lock:
+            if self.pool is None:
+                # Configuración de la conexión a la base de datos Oracle
+                dsn = cx_Oracle.makedsn("oracle-db", 1521, service_name="ORCLPDB1")
+                self.pool = cx_Oracle.SessionPool(user="espe_system", password="admin", dsn=dsn,
+                                                  min=DB_POOL_MIN, max=DB_POOL_MAX, increment=1,
+                                                  threaded=True, getmode=cx_Oracle.SPOOL_ATTRVAL_WAIT)
+        return self.pool
+
+    def connect(self):
+        return self.get_pool().acquire()
+
+    def pool_stats(self):
+        pool = self.pool
+        if pool is None:
+            return None
+        return {'opened': pool.opened, 'busy': pool.busy, 'min': pool.min, 'max': pool.max}
+
+    def insert_returning_id(self, cursor, statement, binds, column):
+        new_id = cursor.var(int)
+        cursor.execute(f"{statement} RETURNING {column} INTO :new_id", dict(binds, new_id=new_id))
+        # Con DML RETURNING el valor es una lista (una entrada por fila afectada)
+        return new_id.getvalue()[0]
+
+
+def build_backend(name=DB_BACKEND):
+    if name == 'sqlite':
+        from sqlite_backend import SqliteBackend
+        return SqliteBackend()
+    if name != 'oracle':
+        raise ValueError(f"DB_BACKEND desconocido: {name}")
+    return OracleBackend()
+
+
+_backend = build_backend()
+
+DatabaseError = _backend.DatabaseError
+IntegrityError = _backend.IntegrityError
+# Tipos de setinputsizes para columnas LOB (SQLite no los necesita)
+LONG_BINARY = getattr(cx_Oracle, 'LONG_BINARY', None)
+LONG_STRING = getattr(cx_Oracle, 'LONG_STRING', None)
 
 
 def get_db_connection():
     """
-    Establece y devuelve una conexión a la base de datos Oracle.
+    Establece y devuelve una conexión a la base de datos; con Oracle se toma del
+    pool y al cerrarla vuelve al pool.
     """
     try:
-        # Configuración de la conexión a la base de datos Oracle
-        dsn = cx_Oracle.makedsn("oracle-db", 1521, service_name="ORCLPDB1")
-        connection = cx_Oracle.connect(user="espe_system", password="admin", dsn=dsn)
-        return connection
-    except cx_Oracle.DatabaseError as e:
+        return _backend.connect()
+    except DatabaseError as e:
         print(f"Error al conectarse a la base de datos: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+def insert_returning_id(cursor, statement, binds, column):
+    """
+    Ejecuta el INSERT y devuelve el valor generado de column (la clave primaria).
+    """
+    return _backend.insert_returning_id(cursor, statement, binds, column)
+
+
+def pool_stats():
+    """
+    Conexiones abiertas, ocupadas y límites del pool, o None si aún no se creó
+    (o el backend no usa pool).
+    """
+    return _backend.pool_stats()
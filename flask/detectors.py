@@ -0,0 +1,228 @@
+"""
+Backends de detección de rostros intercambiables por configuración.
+
+    DETECTOR_BACKEND=ultralytics  PyTorch con ultralytics (comportamiento original)
+    DETECTOR_BACKEND=onnx         ONNX Runtime en CPU
+    DETECTOR_BACKEND=openvino     OpenVINO IR en CPU
+
+Los modelos ONNX / OpenVINO se exportan una sola vez desde los pesos .pt:
+    python detectors.py --export onnx
+"""
+import argparse
+import logging
+import os
+
+import numpy as np
+from box_ops import clip_boxes, nms, select_faces, unletterbox_boxes
+from image_ops import DETECT_INPUT_SIZE, letterbox
+
+# Configuración del logger
+logger = logging.getLogger(__name__)
+
+# Configuración de los backends
+DETECTOR_BACKEND = os.environ.get('DETECTOR_BACKEND', 'ultralytics')
+# Hilos intra-op del runtime; 0 = núcleos asignados al proceso
+DETECTOR_THREADS = int(os.environ.get('DETECTOR_THREADS', 0))
+YOLO_MODEL_PATH = '/app/yolov8l-face-lindevs.pt'
+ONNX_MODEL_PATH = os.path.splitext(YOLO_MODEL_PATH)[0] + '.onnx'
+OPENVINO_MODEL_DIR = os.path.splitext(YOLO_MODEL_PATH)[0] + '_openvino_model'
+
+# Mismos umbrales que usa ultralytics por defecto en predict
+CONF_THRESHOLD = 0.25
+IOU_THRESHOLD = 0.7
+MAX_DETECTIONS = 300
+# Confianza mínima de un rostro válido (igual que /detect)
+MIN_FACE_CONFIDENCE = 0.8
+
+
+def available_threads():
+    if DETECTOR_THREADS:
+        return DETECTOR_THREADS
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def check_model_file(path):
+    if not os.path.exists(path):
+        logger.error(f"El modelo YOLO no se encontró en la ruta: {path}")
+        raise FileNotFoundError(
+            f"El modelo YOLO no se encontró en la ruta: {path}")
+
+
+def check_input_size(input_size, imgsz):
+    """
+    Los modelos exportados tienen entrada fija: el llamador hace el letterbox y
+    deshace la transformación con imgsz, así que otro tamaño daría cajas erróneas.
+    """
+    if imgsz and imgsz != input_size:
+        raise ValueError(f"El detector exportado espera imgsz={input_size}, no {imgsz}; "
+                         f"exportarlo con DETECT_INPUT_SIZE={imgsz} o ajustar DETECT_INPUT_SIZE")
+
+
+def preprocess(img, imgsz):
+    """
+    Igual que ultralytics: letterbox a imgsz, BGR -> RGB, HWC -> NCHW y escala a [0, 1].
+    """
+    if img.shape[:2] != (imgsz, imgsz):
+        img, _, _ = letterbox(img, imgsz)
+    tensor = img[..., ::-1].transpose(2, 0, 1)[None]
+    return np.ascontiguousarray(tensor, dtype=np.float32) / 255.0
+
+
+def postprocess(output, conf_threshold=CONF_THRESHOLD, iou_threshold=IOU_THRESHOLD):
+    """
+    Convierte la salida cruda de YOLOv8 (1, 4 + clases, anclas) en un arreglo
+    Nx6 (x1, y1, x2, y2, conf, cls) tras filtrar por confianza y aplicar NMS.
+    """
+    preds = output[0].T
+    scores = preds[:, 4:]
+    classes = scores.argmax(axis=1)
+    confidences = scores[np.arange(len(scores)), classes]
+
+    keep = confidences > conf_threshold
+    preds, confidences, classes = preds[keep], confidences[keep], classes[keep]
+    if len(preds) == 0:
+        return np.empty((0, 6), dtype=np.float32)
+
+    xy, half_wh = preds[:, :2], preds[:, 2:4] / 2
+    boxes = np.column_stack(
+        [xy - half_wh, xy + half_wh, confidences, classes]).astype(np.float32)
+    return nms(boxes, iou_threshold)[:MAX_DETECTIONS]
+
+
+class UltralyticsDetector:
+    name = 'ultralytics'
+
+    def __init__(self, model_path=YOLO_MODEL_PATH):
+        check_model_file(model_path)
+        from ultralytics import YOLO
+        self.model = YOLO(model_path)
+
+    def detect(self, img, imgsz=None):
+        options = {'imgsz': imgsz} if imgsz else {}
+        results = self.model(img, verbose=False, **options)
+        if not results or not results[0].boxes:
+            return np.empty((0, 6), dtype=np.float32)
+        return results[0].boxes.data.cpu().numpy()
+
+
+class OnnxDetector:
+    name = 'onnx'
+
+    def __init__(self, model_path=ONNX_MODEL_PATH, threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads or available_threads()
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            model_path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        self.input_size = self.session.get_inputs()[0].shape[2]
+
+    def detect(self, img, imgsz=None):
+        # El modelo exportado tiene entrada fija
+        check_input_size(self.input_size, imgsz)
+        output = self.session.run(
+            None, {self.input_name: preprocess(img, self.input_size)})[0]
+        return postprocess(output)
+
+
+class OpenVinoDetector:
+    name = 'openvino'
+
+    def __init__(self, model_dir=OPENVINO_MODEL_DIR, threads=None):
+        from openvino.runtime import Core
+
+        core = Core()
+        xml_path = os.path.join(model_dir, os.path.basename(
+            os.path.splitext(YOLO_MODEL_PATH)[0]) + '.xml')
+        model = core.read_model(xml_path)
+        self.compiled = core.compile_model(model, 'CPU', {
+            'INFERENCE_NUM_THREADS': threads or available_threads(),
+            'PERFORMANCE_HINT': 'LATENCY',
+        })
+        self.output = self.compiled.output(0)
+        self.input_size = model.input(0).shape[2]
+
+    def detect(self, img, imgsz=None):
+        check_input_size(self.input_size, imgsz)
+        output = self.compiled(preprocess(img, self.input_size))[self.output]
+        return postprocess(output)
+
+
+def export_model(fmt, imgsz=DETECT_INPUT_SIZE):
+    """
+    Exporta los pesos .pt a ONNX u OpenVINO con entrada fija imgsz x imgsz.
+    """
+    check_model_file(YOLO_MODEL_PATH)
+    from ultralytics import YOLO
+
+    logger.info(f"Exportando {YOLO_MODEL_PATH} a {fmt} (imgsz={imgsz})")
+    return YOLO(YOLO_MODEL_PATH).export(format=fmt, imgsz=imgsz, dynamic=False, simplify=True)
+
+
+def prepare_detector(backend=DETECTOR_BACKEND):
+    """
+    Exporta el modelo del backend si aún no existe. El servidor de modelos lo
+    llama antes de iniciar el pool para que los procesos no exporten a la vez.
+    """
+    if backend == 'onnx' and not os.path.exists(ONNX_MODEL_PATH):
+        export_model('onnx')
+    elif backend == 'openvino' and not os.path.isdir(OPENVINO_MODEL_DIR):
+        export_model('openvino')
+
+
+def build_detector(backend):
+    if backend == 'ultralytics':
+        return UltralyticsDetector()
+    if backend == 'onnx':
+        prepare_detector(backend)
+        return OnnxDetector()
+    if backend == 'openvino':
+        prepare_detector(backend)
+        return OpenVinoDetector()
+    raise ValueError(f"Backend de detección desconocido: {backend}")
+
+
+_detector = None
+
+
+def get_detector():
+    """
+    Devuelve (cargando una sola vez por proceso) el detector configurado.
+    """
+    global _detector
+    if _detector is None:
+        _detector = build_detector(DETECTOR_BACKEND)
+        logger.info(f"Detector de rostros cargado: {_detector.name}")
+    return _detector
+
+
+def crop_best_face(img, detector=None, min_confidence=MIN_FACE_CONFIDENCE):
+    """
+    Detecta el rostro de mayor confianza de la imagen y devuelve su recorte, o None.
+    """
+    detector = detector or get_detector()
+    model_input, ratio, pad = letterbox(img, DETECT_INPUT_SIZE)
+    boxes = unletterbox_boxes(detector.detect(model_input, DETECT_INPUT_SIZE), ratio, pad)
+    boxes = select_faces(clip_boxes(boxes, img.shape[1], img.shape[0]), min_confidence)
+    if len(boxes) == 0:
+        return None
+
+    x1, y1, x2, y2 = boxes[0, :4].astype(int)
+    if x1 >= x2 or y1 >= y2:
+        return None
+    return img[y1:y2, x1:x2]
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Exportar el detector YOLO")
+    parser.add_argument('--export', choices=['onnx', 'openvino'], required=True)
+    parser.add_argument('--imgsz', type=int, default=DETECT_INPUT_SIZE)
+    args = parser.parse_args()
+    print(export_model(args.export, args.imgsz))
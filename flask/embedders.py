@@ -0,0 +1,219 @@
+"""
+Backends de embeddings Facenet512 intercambiables al arrancar.
+
+    EMBEDDING_BACKEND=deepface   DeepFace.represent (TensorFlow, comportamiento original)
+    EMBEDDING_BACKEND=onnx       Facenet512 exportado a ONNX (FP32) en ONNX Runtime
+    EMBEDDING_BACKEND=onnx-int8  Facenet512 cuantizado a INT8 en ONNX Runtime
+
+Exportar y cuantizar (una sola vez):
+    python embedders.py --export
+    python embedders.py --quantize dynamic
+    python embedders.py --quantize static --calibration-dir academic_staff_database
+"""
+import argparse
+import logging
+import os
+
+import cv2
+import numpy as np
+
+# Configuración del logger
+logger = logging.getLogger(__name__)
+
+# Configuración de los backends
+EMBEDDING_BACKEND = os.environ.get('EMBEDDING_BACKEND', 'deepface')
+EMBEDDING_THREADS = int(os.environ.get('EMBEDDING_THREADS', 0))
+EMBEDDING_MODEL_NAME = 'Facenet512'
+FACENET_ONNX_PATH = '/app/facenet512.onnx'
+FACENET_INT8_PATH = '/app/facenet512_int8.onnx'
+FACENET_INPUT_SIZE = 160
+EMBEDDING_SIZE = 512
+
+
+def available_threads():
+    if EMBEDDING_THREADS:
+        return EMBEDDING_THREADS
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def preprocess_face(face, size=FACENET_INPUT_SIZE):
+    """
+    Igual que DeepFace: escala a [0, 1], redimensiona conservando la proporción
+    y rellena con ceros hasta size x size.
+    """
+    height, width = face.shape[:2]
+    factor = min(size / height, size / width)
+    new_width, new_height = max(int(width * factor), 1), max(int(height * factor), 1)
+    resized = cv2.resize(face, (new_width, new_height)).astype(np.float32) / 255.0
+
+    canvas = np.zeros((size, size, 3), dtype=np.float32)
+    top, left = (size - new_height) // 2, (size - new_width) // 2
+    canvas[top:top + new_height, left:left + new_width] = resized
+    return canvas
+
+
+class DeepFaceEmbedder:
+    name = 'deepface'
+    # DeepFace detecta (opencv) el rostro dentro de las imágenes que recibe
+    detects_faces = True
+
+    def __init__(self):
+        from deepface import DeepFace
+        self.deepface = DeepFace
+        DeepFace.build_model(EMBEDDING_MODEL_NAME)
+
+    def represent(self, img, enforce_detection=True):
+        return self.deepface.represent(
+            img_path=img, model_name=EMBEDDING_MODEL_NAME, enforce_detection=enforce_detection)
+
+    def embed_image(self, img):
+        objs = self.represent(img, enforce_detection=False)
+        return np.array([o['embedding'] for o in objs], dtype=np.float32).reshape(-1, EMBEDDING_SIZE)
+
+    def embed_faces(self, faces):
+        embeddings = [self.deepface.represent(img_path=face, model_name=EMBEDDING_MODEL_NAME,
+                                              detector_backend='skip')[0]['embedding']
+                      for face in faces]
+        return np.array(embeddings, dtype=np.float32).reshape(-1, EMBEDDING_SIZE)
+
+
+class OnnxEmbedder:
+    # Recibe recortes de rostro ya detectados por YOLO
+    detects_faces = False
+
+    def __init__(self, model_path, name, threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads or available_threads()
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            model_path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        self.name = name
+
+    def embed_faces(self, faces):
+        if len(faces) == 0:
+            return np.empty((0, EMBEDDING_SIZE), dtype=np.float32)
+        batch = np.stack([preprocess_face(face) for face in faces])
+        return self.session.run(None, {self.input_name: batch})[0].astype(np.float32)
+
+    def embed_image(self, img):
+        return self.embed_faces([img])
+
+    def represent(self, img, enforce_detection=True):
+        height, width = img.shape[:2]
+        return [{
+            'embedding': self.embed_faces([img])[0].tolist(),
+            'facial_area': {'x': 0, 'y': 0, 'w': width, 'h': height},
+            'face_confidence': None,
+        }]
+
+
+def build_embedder(backend):
+    if backend == 'deepface':
+        return DeepFaceEmbedder()
+    if backend == 'onnx':
+        return OnnxEmbedder(FACENET_ONNX_PATH, backend)
+    if backend == 'onnx-int8':
+        return OnnxEmbedder(FACENET_INT8_PATH, backend)
+    raise ValueError(f"Backend de embeddings desconocido: {backend}")
+
+
+_embedder = None
+
+
+def get_embedder():
+    """
+    Devuelve (cargando una sola vez por proceso) el backend de embeddings configurado.
+    """
+    global _embedder
+    if _embedder is None:
+        _embedder = build_embedder(EMBEDDING_BACKEND)
+        logger.info(f"Backend de embeddings cargado: {_embedder.name}")
+    return _embedder
+
+
+def export_onnx(output_path=FACENET_ONNX_PATH):
+    """
+    Exporta el modelo Keras de Facenet512 que usa DeepFace a ONNX (lote dinámico).
+    """
+    import tensorflow as tf
+    import tf2onnx
+    from deepface import DeepFace
+
+    client = DeepFace.build_model(EMBEDDING_MODEL_NAME)
+    keras_model = getattr(client, 'model', client)
+    signature = [tf.TensorSpec((None, FACENET_INPUT_SIZE, FACENET_INPUT_SIZE, 3),
+                               tf.float32, name='input')]
+    tf2onnx.convert.from_keras(keras_model, input_signature=signature,
+                               opset=13, output_path=output_path)
+    logger.info(f"Facenet512 exportado a {output_path}")
+    return output_path
+
+
+def _calibration_faces(directory, limit):
+    from detectors import crop_best_face
+
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if limit <= 0:
+                return
+            img = cv2.imread(os.path.join(root, name))
+            face = crop_best_face(img) if img is not None else None
+            if face is not None:
+                yield preprocess_face(face)
+                limit -= 1
+
+
+def quantize(mode, calibration_dir=None, calibration_size=200,
+             input_path=FACENET_ONNX_PATH, output_path=FACENET_INT8_PATH):
+    """
+    Cuantiza el modelo ONNX a INT8. "static" calibra las activaciones con
+    rostros reales de calibration_dir; "dynamic" solo cuantiza los pesos.
+    """
+    from onnxruntime.quantization import (CalibrationDataReader, QuantFormat,
+                                          QuantType, quantize_dynamic,
+                                          quantize_static)
+
+    if not os.path.exists(input_path):
+        export_onnx(input_path)
+
+    if mode == 'dynamic':
+        quantize_dynamic(input_path, output_path, weight_type=QuantType.QUInt8)
+    else:
+        if not calibration_dir:
+            raise ValueError("La cuantización estática requiere --calibration-dir")
+
+        class FaceReader(CalibrationDataReader):
+            def __init__(self):
+                self.faces = _calibration_faces(calibration_dir, calibration_size)
+
+            def get_next(self):
+                face = next(self.faces, None)
+                return None if face is None else {'input': face[None]}
+
+        quantize_static(input_path, output_path, FaceReader(), quant_format=QuantFormat.QDQ,
+                        per_channel=True, weight_type=QuantType.QInt8,
+                        activation_type=QuantType.QUInt8)
+
+    logger.info(f"Modelo INT8 ({mode}) guardado en {output_path}")
+    return output_path
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Exportar y cuantizar Facenet512")
+    parser.add_argument('--export', action='store_true')
+    parser.add_argument('--quantize', choices=['dynamic', 'static'])
+    parser.add_argument('--calibration-dir')
+    parser.add_argument('--calibration-size', type=int, default=200)
+    args = parser.parse_args()
+
+    if args.export:
+        print(export_onnx())
+    if args.quantize:
+        print(quantize(args.quantize, args.calibration_dir, args.calibration_size))
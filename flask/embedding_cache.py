@@ -0,0 +1,125 @@
+"""
+Caché de embeddings por hash perceptual del recorte de rostro.
+
+Los kioscos reenvían recortes casi idénticos (el mismo rostro con unos píxeles
+de diferencia). La clave es el dHash del recorte normalizado (gris, reducido a
+HASH_SIZE x HASH_SIZE + 1); un recorte con el mismo hash reutiliza el embedding
+y no pasa por Facenet512. EMBEDDING_CACHE_MAX_DISTANCE > 0 acepta también hashes
+que difieren en hasta esa cantidad de bits, pero el embedding reutilizado puede
+ser el de otra persona con un encuadre parecido, y va directo a la galería.
+
+Solo se guardan embeddings: la búsqueda en la galería se hace siempre, así que
+los cambios en la galería se ven de inmediato.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+# Entradas máximas (0 = caché deshabilitada)
+EMBEDDING_CACHE_SIZE = int(os.environ.get('EMBEDDING_CACHE_SIZE', 512))
+EMBEDDING_CACHE_TTL = float(os.environ.get('EMBEDDING_CACHE_TTL', 30))
+# Bits distintos tolerados entre hashes (de HASH_SIZE * HASH_SIZE); 0 = solo coincidencia exacta
+EMBEDDING_CACHE_MAX_DISTANCE = int(os.environ.get('EMBEDDING_CACHE_MAX_DISTANCE', 0))
+HASH_SIZE = 16
+
+# Bits en 1 de cada byte, para la distancia de Hamming vectorizada
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def dhash(img, size=HASH_SIZE):
+    """
+    Hash de diferencias: compara cada píxel con su vecino derecho en la imagen
+    reducida. Devuelve size * size bits empaquetados en bytes.
+    """
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (size + 1, size), interpolation=cv2.INTER_AREA)
+    return np.packbits(small[:, 1:] > small[:, :-1])
+
+
+class EmbeddingCache:
+    """
+    LRU con caducidad de embeddings indexados por dHash.
+    """
+
+    def __init__(self, max_size=EMBEDDING_CACHE_SIZE, ttl=EMBEDDING_CACHE_TTL,
+                 max_distance=EMBEDDING_CACHE_MAX_DISTANCE):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self.entries = OrderedDict()  # hash (bytes) -> (embeddings, guardado en)
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'near_hits': 0, 'misses': 0,
+                      'evictions': 0, 'expirations': 0}
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def _nearest(self, key, now):
+        """
+        Clave vigente más cercana a key por distancia de Hamming, o None.
+        """
+        keys = list(self.entries)
+        stored = np.frombuffer(b''.join(keys), dtype=np.uint8).reshape(len(keys), -1)
+        distances = POPCOUNT[stored ^ key].sum(axis=1, dtype=np.int32)
+        ages = now - np.array([self.entries[k][1] for k in keys])
+        distances[ages > self.ttl] = self.max_distance + 1
+
+        best = int(distances.argmin())
+        return keys[best] if distances[best] <= self.max_distance else None
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self.lock:
+            cache_key = key.tobytes()
+            entry = self.entries.get(cache_key)
+            if entry is not None and now - entry[1] > self.ttl:
+                del self.entries[cache_key]
+                self.stats['expirations'] += 1
+                entry = None
+
+            if entry is None and self.max_distance and self.entries:
+                cache_key = self._nearest(key, now)
+                entry = self.entries.get(cache_key) if cache_key else None
+                if entry is not None:
+                    self.stats['near_hits'] += 1
+            elif entry is not None:
+                self.stats['hits'] += 1
+
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(cache_key)
+            return entry[0]
+
+    def put(self, key, embeddings):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.entries[key.tobytes()] = (embeddings, time.monotonic())
+            self.entries.move_to_end(key.tobytes())
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def snapshot(self):
+        with self.lock:
+            stats = dict(self.stats, size=len(self.entries))
+        # hits: hash idéntico; near_hits: hash a distancia 1..max_distance
+        lookups = stats['hits'] + stats['near_hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+        stats['near_hit_ratio'] = stats['near_hits'] / lookups if lookups else 0.0
+        return stats
+
+
+_cache = EmbeddingCache()
+
+
+def get_embedding_cache():
+    return _cache
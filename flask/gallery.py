@@ -0,0 +1,362 @@
+import glob
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+import cv2
+import numpy as np
+from embedders import EMBEDDING_SIZE, get_embedder
+from utils import detect_directory_changes
+
+# Configuración del logger
+logger = logging.getLogger(__name__)
+
+DEEPFACE_DB_PATH = '/app/academic_staff_database'
+# Cada cuántos segundos se revisa si cambiaron las imágenes o el artefacto
+GALLERY_REFRESH_SECONDS = int(os.environ.get('GALLERY_REFRESH_SECONDS', 30))
+# Umbral de distancia coseno que DeepFace.find usa para Facenet512
+COSINE_THRESHOLD = 0.30
+# Centroides por identidad de la capa de prototipos (1 = se mantiene incrementalmente)
+PROTOTYPES_PER_IDENTITY = int(os.environ.get('PROTOTYPES_PER_IDENTITY', 1))
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def identity_from_path(path):
+    """
+    La identidad es el nombre de la carpeta que contiene la imagen.
+    """
+    return os.path.basename(os.path.dirname(path))
+
+
+def normalize(embeddings):
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-12)
+
+
+def spherical_kmeans(embeddings, k, iterations=10):
+    """
+    k centroides L2-normalizados de un conjunto de embeddings normalizados.
+    """
+    k = min(k, len(embeddings))
+    centroids = embeddings[np.linspace(0, len(embeddings) - 1, k).astype(int)]
+    for _ in range(iterations):
+        labels = (embeddings @ centroids.T).argmax(axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, embeddings)
+        empty = ~sums.any(axis=1)
+        sums[empty] = centroids[empty]
+        centroids = normalize(sums)
+    return centroids
+
+
+class Gallery:
+    """
+    Embeddings L2-normalizados de todas las imágenes de la base de rostros, más
+    una capa de prototipos: PROTOTYPES_PER_IDENTITY centroides por identidad.
+    """
+
+    def __init__(self, embeddings, paths, backend, prototypes_per_identity=PROTOTYPES_PER_IDENTITY):
+        self.embeddings = normalize(
+            np.asarray(embeddings, dtype=np.float32).reshape(-1, EMBEDDING_SIZE))
+        self.paths = list(paths)
+        self.identities = np.array(
+            [identity_from_path(p) for p in self.paths], dtype=object)
+        self.backend = backend
+        self.prototypes_per_identity = prototypes_per_identity
+        # Suma de embeddings y número de imágenes por identidad (centroide incremental)
+        self._sums = {}
+        self._touched = set()
+        self._clusters = {}
+        self._update_prototypes(self.identities, self.embeddings, 1)
+        self._index_identities()
+
+    def _update_prototypes(self, identities, embeddings, sign):
+        """
+        Suma (sign=1) o resta (sign=-1) embeddings de los centroides de sus identidades.
+        """
+        for name in set(identities):
+            rows = embeddings[identities == name].astype(np.float64)
+            total, count = self._sums.get(name, (np.zeros(EMBEDDING_SIZE), 0))
+            total, count = total + sign * rows.sum(axis=0), count + sign * len(rows)
+            if count > 0:
+                self._sums[name] = (total, count)
+            else:
+                self._sums.pop(name, None)
+                self._clusters.pop(name, None)
+            self._touched.add(name)
+
+    def _index_identities(self):
+        """
+        Código entero de identidad por imagen, para agrupar puntajes sin bucles.
+        """
+        if len(self.identities):
+            self.names, self.codes = np.unique(self.identities.astype(str), return_inverse=True)
+        else:
+            self.names, self.codes = np.array([], dtype=str), np.array([], dtype=np.intp)
+        self._index_prototypes()
+
+    def _index_prototypes(self):
+        """
+        Matriz de prototipos agrupada por identidad (en el orden de self.names).
+        Con varios centroides por identidad solo se recalculan las identidades modificadas.
+        """
+        if self.prototypes_per_identity > 1:
+            for name in self._touched & set(self._sums):
+                self._clusters[name] = spherical_kmeans(
+                    self.embeddings[self.identities == name], self.prototypes_per_identity)
+        self._touched.clear()
+
+        vectors, codes = [], []
+        for code, name in enumerate(self.names):
+            if self.prototypes_per_identity > 1:
+                centroids = self._clusters[name]
+            else:
+                centroids = normalize(self._sums[name][0])[None]
+            vectors.append(centroids)
+            codes.extend([code] * len(centroids))
+
+        self.prototypes = (np.concatenate(vectors).astype(np.float32) if vectors
+                           else np.empty((0, EMBEDDING_SIZE), dtype=np.float32))
+        self.prototype_codes = np.array(codes, dtype=np.intp)
+        self._prototype_starts = np.flatnonzero(
+            np.r_[True, self.prototype_codes[1:] != self.prototype_codes[:-1]]) if codes else []
+
+    def __len__(self):
+        return len(self.paths)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['embeddings'], data['paths'].tolist(), str(data['backend']))
+
+    @classmethod
+    def from_deepface_pickle(cls, path):
+        """
+        Importa las representaciones que DeepFace.find guardó en la base de rostros.
+        """
+        with open(path, 'rb') as f:
+            entries = pickle.load(f)
+
+        paths, embeddings = [], []
+        for entry in entries:
+            if isinstance(entry, dict):
+                embedding = entry.get('embedding', entry.get('Facenet512_representation'))
+                identity = entry.get('identity')
+            else:
+                identity, embedding = entry[0], entry[1]
+            if identity and embedding is not None:
+                paths.append(identity)
+                embeddings.append(embedding)
+        return cls(embeddings, paths, 'deepface')
+
+    def save(self, path):
+        """
+        Guarda el artefacto de forma atómica (archivo temporal + os.replace).
+        """
+        # Nombre temporal único: varios procesos del servidor de modelos guardan el mismo artefacto
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), prefix=os.path.basename(path),
+                                         suffix='.tmp', delete=False) as f:
+            np.savez(f, embeddings=self.embeddings, paths=np.array(self.paths, dtype=str),
+                     backend=np.array(self.backend))
+        os.replace(f.name, path)
+
+    def add(self, embeddings, paths):
+        if len(paths) == 0:
+            return
+        embeddings = normalize(np.asarray(embeddings).reshape(-1, EMBEDDING_SIZE))
+        identities = np.array([identity_from_path(p) for p in paths], dtype=object)
+        self.embeddings = np.concatenate([self.embeddings, embeddings])
+        self.paths.extend(paths)
+        self.identities = np.concatenate([self.identities, identities])
+        self._update_prototypes(identities, embeddings, 1)
+        self._index_identities()
+
+    def remove(self, paths):
+        removed = set(paths)
+        keep = np.array([p not in removed for p in self.paths], dtype=bool)
+        if keep.all():
+            return
+        self._update_prototypes(self.identities[~keep], self.embeddings[~keep], -1)
+        self.embeddings = self.embeddings[keep]
+        self.identities = self.identities[keep]
+        self.paths = [p for p, k in zip(self.paths, keep) if k]
+        self._index_identities()
+
+    def score_identities(self, embedding, top_n=3, identities=None):
+        """
+        Similitud coseno de cada identidad (en el orden de self.names): la máxima
+        y la media de sus top_n imágenes más similares. Con identities (códigos)
+        solo se comparan las imágenes de esas identidades; el resto queda en -inf.
+        """
+        embeddings, codes = self.embeddings, self.codes
+        if identities is not None:
+            rows = np.flatnonzero(np.isin(codes, identities))
+            embeddings, codes = embeddings[rows], codes[rows]
+
+        similarities = embeddings @ normalize(embedding)
+        # Ordenar por identidad y, dentro de cada una, por similitud descendente
+        order = np.lexsort((-similarities, codes))
+        codes, similarities = codes[order], similarities[order]
+
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        sizes = np.diff(np.r_[starts, len(codes)])
+        top = np.arange(len(codes)) - np.repeat(starts, sizes) < top_n
+
+        present = codes[starts]
+        best = np.full(len(self.names), -np.inf)
+        best[present] = similarities[starts]
+        counts = np.bincount(codes[top], minlength=len(self.names))
+        mean = np.bincount(codes[top], weights=similarities[top],
+                           minlength=len(self.names)) / np.maximum(counts, 1)
+        mean[counts == 0] = -np.inf
+        return best, mean
+
+    def score_prototypes(self, embedding):
+        """
+        Similitud de cada identidad con su prototipo más cercano (una fila por
+        identidad en lugar de una por imagen).
+        """
+        similarities = self.prototypes @ normalize(embedding)
+        return np.maximum.reduceat(similarities, self._prototype_starts)
+
+
+def gallery_path(db_path, backend):
+    """
+    El artefacto va junto a la base de rostros y no dentro: guardarlo no debe
+    cambiar la fecha de modificación que get_gallery vigila.
+    """
+    return f"{os.path.normpath(db_path)}_gallery_{backend}.npz"
+
+
+def list_gallery_images(db_path):
+    paths = []
+    for root, _, files in os.walk(db_path):
+        for name in files:
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def embed_gallery_image(img, embedder):
+    """
+    Embedding del rostro principal de una imagen de la galería, o None si no hay rostro.
+    """
+    if embedder.detects_faces:
+        embeddings = embedder.embed_image(img)
+        return embeddings[0] if len(embeddings) else None
+
+    from detectors import crop_best_face
+    face = crop_best_face(img)
+    return embedder.embed_faces([face])[0] if face is not None else None
+
+
+def sync_gallery(gallery, db_path, embedder):
+    """
+    Agrega las imágenes nuevas y quita las eliminadas. Devuelve True si hubo cambios.
+    """
+    current = list_gallery_images(db_path)
+    known = set(gallery.paths)
+    current_set = set(current)
+
+    removed = [p for p in gallery.paths if p not in current_set]
+    gallery.remove(removed)
+
+    paths, embeddings = [], []
+    for path in (p for p in current if p not in known):
+        img = cv2.imread(path)
+        embedding = embed_gallery_image(img, embedder) if img is not None else None
+        if embedding is None:
+            logger.warning(f"Galería: no se encontró un rostro en {path}")
+            continue
+        paths.append(path)
+        embeddings.append(embedding)
+    gallery.add(embeddings, paths)
+
+    if removed or paths:
+        logger.info(
+            f"Galería sincronizada: {len(paths)} imágenes nuevas, {len(removed)} eliminadas")
+    return bool(removed or paths)
+
+
+def load_gallery(db_path, embedder):
+    """
+    Carga el artefacto del backend activo (o importa el pickle de DeepFace) y lo
+    sincroniza con las imágenes de la base de rostros.
+    """
+    path = gallery_path(db_path, embedder.name)
+    legacy_path = os.path.join(db_path, f"gallery_{embedder.name}.npz")
+    if not os.path.exists(path) and os.path.exists(legacy_path):
+        try:
+            os.replace(legacy_path, path)
+        except FileNotFoundError:  # otro proceso ya lo movió
+            pass
+    if os.path.exists(path):
+        gallery = Gallery.load(path)
+    else:
+        pickles = glob.glob(os.path.join(db_path, 'ds_model_facenet512_*.pkl'))
+        if embedder.name == 'deepface' and pickles:
+            gallery = Gallery.from_deepface_pickle(pickles[0])
+        else:
+            gallery = Gallery([], [], embedder.name)
+
+    if sync_gallery(gallery, db_path, embedder) or not os.path.exists(path):
+        gallery.save(path)
+    logger.info(f"Galería cargada: {len(gallery)} imágenes ({embedder.name})")
+    return gallery
+
+
+_gallery = None
+_gallery_lock = threading.Lock()
+_checked_at = 0.0
+_artifact_mtime = None
+_directory_mtime = None
+
+
+def get_gallery(db_path=DEEPFACE_DB_PATH):
+    """
+    Devuelve la galería del proceso, recargándola si otro proceso actualizó el
+    artefacto o sincronizándola si cambiaron las imágenes.
+    """
+    global _gallery, _checked_at, _artifact_mtime, _directory_mtime
+    with _gallery_lock:
+        now = time.monotonic()
+        if _gallery is not None and now - _checked_at < GALLERY_REFRESH_SECONDS:
+            return _gallery
+        _checked_at = now
+
+        embedder = get_embedder()
+        path = gallery_path(db_path, embedder.name)
+        artifact_mtime = os.path.getmtime(path) if os.path.exists(path) else None
+        directory_mtime = detect_directory_changes(db_path)
+
+        if _gallery is None or artifact_mtime != _artifact_mtime:
+            _gallery = load_gallery(db_path, embedder)
+        elif directory_mtime != _directory_mtime and sync_gallery(_gallery, db_path, embedder):
+            _gallery.save(path)
+
+        _artifact_mtime = os.path.getmtime(path)
+        _directory_mtime = detect_directory_changes(db_path)
+        return _gallery
+
+
+def enroll_images(embeddings, paths, db_path=DEEPFACE_DB_PATH):
+    """
+    Agrega a la galería imágenes ya embebidas (p. ej. una inscripción masiva) y
+    guarda el artefacto una sola vez. Devuelve cuántas imágenes eran nuevas.
+    """
+    global _artifact_mtime
+    gallery = get_gallery(db_path)
+    with _gallery_lock:
+        known = set(gallery.paths)
+        new = [i for i, p in enumerate(paths) if p not in known]
+        if new:
+            gallery.add([embeddings[i] for i in new], [paths[i] for i in new])
+            path = gallery_path(db_path, gallery.backend)
+            gallery.save(path)
+            _artifact_mtime = os.path.getmtime(path)
+            logger.info(f"Galería: {len(new)} imágenes inscritas")
+        return len(new)
@@ -0,0 +1,80 @@
+"""
+Respuestas condicionales para los GET que los kioscos consultan repetidamente.
+
+conditional_get añade un ETag fuerte y Cache-Control a las respuestas 200 y
+contesta 304 Not Modified cuando coincide con If-None-Match:
+    - con version, el ETag sale de la URL y de una versión barata de las filas
+      (table_version), y el 304 se responde sin ejecutar la consulta ni serializar;
+    - sin version, el ETag es el hash del cuerpo ya generado (se ahorra la
+      transferencia y el parseo en el cliente).
+"""
+import hashlib
+import logging
+from functools import wraps
+
+from db_connection import get_db_connection
+
+from flask import make_response, request
+
+# Configuración del logger
+logger = logging.getLogger(__name__)
+
+
+def table_version(table, where="", binds=None):
+    """
+    Versión de las filas de una tabla: cuántas hay y el mayor ORA_ROWSCN. Cambia
+    con cada INSERT, UPDATE o DELETE confirmado (sin ROWDEPENDENCIES el SCN es
+    por bloque, así que puede cambiar de más, nunca de menos).
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SELECT COUNT(*), MAX(ORA_ROWSCN) FROM {table}"
+                       f"{' WHERE ' + where if where else ''}", binds or {})
+        count, scn = cursor.fetchone()
+        return f"{count}:{scn}"
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+        digest.update(b'|')
+    return digest.hexdigest()
+
+
+def not_modified(etag, cache_control):
+    response = make_response('', 304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+
+def conditional_get(cache_control='no-cache', version=None):
+    """
+    Decorador de vistas GET. version(**argumentos de la ruta) devuelve la versión
+    de los datos que sirve la vista; si falla se usa el hash del cuerpo.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = None
+            if version is not None:
+                try:
+                    etag = make_etag(request.full_path, version(**kwargs))
+                except Exception as e:
+                    logger.warning(f"No se pudo obtener la versión de {request.path}: {e}")
+                if etag and request.if_none_match.contains(etag):
+                    return not_modified(etag, cache_control)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            response.set_etag(etag or make_etag(response.get_data()))
+            response.headers['Cache-Control'] = cache_control
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
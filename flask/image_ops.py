@@ -0,0 +1,93 @@
+import logging
+import os
+import struct
+
+import cv2
+import numpy as np
+
+# Configuración del logger
+logger = logging.getLogger(__name__)
+
+# Lado del cuadrado de entrada de YOLO (múltiplo de 32)
+DETECT_INPUT_SIZE = int(os.environ.get('DETECT_INPUT_SIZE', 640))
+LETTERBOX_COLOR = (114, 114, 114)
+
+# Factores de reducción que cv2.imdecode puede aplicar durante la decodificación
+REDUCED_DECODE_FLAGS = [
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+]
+
+
+def read_image_size(data):
+    """
+    Lee el ancho y alto de una imagen JPEG o PNG desde su cabecera, sin decodificarla.
+    Devuelve None si el formato no se reconoce.
+    """
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and len(data) >= 24:
+        width, height = struct.unpack('>II', data[16:24])
+        return width, height
+
+    if data[:2] != b'\xff\xd8':
+        return None
+
+    # Recorrer los marcadores JPEG hasta el SOF (Start Of Frame)
+    offset = 2
+    while offset + 9 < len(data):
+        if data[offset] != 0xFF:
+            offset += 1
+            continue
+        marker = data[offset + 1]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+            offset += 1 if marker == 0xFF else 2
+            continue
+        length = struct.unpack('>H', data[offset + 2:offset + 4])[0]
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack('>HH', data[offset + 5:offset + 9])
+            return width, height
+        offset += 2 + length
+    return None
+
+
+def decode_image(data, target_size=None):
+    """
+    Decodifica la imagen. Si se indica target_size y la imagen es mucho mayor,
+    usa la decodificación reducida de OpenCV (1/2 o 1/4) sin bajar el lado
+    mayor por debajo de target_size.
+
+    Devuelve (imagen, factor) donde factor convierte coordenadas de la imagen
+    decodificada a la original.
+    """
+    np_img = np.frombuffer(data, np.uint8)
+
+    if target_size:
+        size = read_image_size(data)
+        if size:
+            long_side = max(size)
+            for factor, flag in REDUCED_DECODE_FLAGS:
+                if long_side // factor >= target_size:
+                    img = cv2.imdecode(np_img, flag)
+                    if img is not None:
+                        return img, factor
+                    break
+
+    return cv2.imdecode(np_img, cv2.IMREAD_COLOR), 1
+
+
+def letterbox(img, size=DETECT_INPUT_SIZE, color=LETTERBOX_COLOR):
+    """
+    Redimensiona conservando la proporción y rellena hasta un cuadrado size x size
+    en un solo paso. Devuelve (imagen, ratio, (pad_x, pad_y)).
+    """
+    height, width = img.shape[:2]
+    ratio = min(size / height, size / width)
+    new_width, new_height = int(round(width * ratio)), int(round(height * ratio))
+
+    if (new_width, new_height) != (width, height):
+        interpolation = cv2.INTER_AREA if ratio < 1 else cv2.INTER_LINEAR
+        img = cv2.resize(img, (new_width, new_height), interpolation=interpolation)
+
+    pad_x, pad_y = (size - new_width) // 2, (size - new_height) // 2
+    img = cv2.copyMakeBorder(img, pad_y, size - new_height - pad_y, pad_x, size - new_width - pad_x,
+                             cv2.BORDER_CONSTANT, value=color)
+    return img, ratio, (pad_x, pad_y)
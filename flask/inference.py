@@ -0,0 +1,100 @@
+import logging
+
+from detectors import crop_best_face, get_detector
+from embedders import get_embedder
+from gallery import enroll_images, get_gallery
+from matching import match_embeddings
+
+# Configuración del logger
+logger = logging.getLogger(__name__)
+
+
+def warmup():
+    """
+    Carga todos los modelos en memoria para que la primera solicitud no pague el costo.
+    """
+    get_detector()
+    get_embedder()
+    get_gallery()
+    logger.info("Modelos de inferencia precargados.")
+
+
+def detect(img, imgsz=None):
+    """
+    Ejecuta el detector configurado y devuelve un arreglo Nx6 (x1, y1, x2, y2, conf, cls).
+    Con imgsz igual al lado de una imagen ya preparada con letterbox, no se vuelve a redimensionar.
+    """
+    return get_detector().detect(img, imgsz)
+
+
+def represent(img, enforce_detection=True):
+    """
+    Genera los embeddings Facenet512 de la imagen con el backend configurado.
+    """
+    return get_embedder().represent(img, enforce_detection=enforce_detection)
+
+
+def search(embeddings):
+    """
+    Puntúa los embeddings contra cada identidad de la galería y decide con el
+    umbral calibrado: {'identity', 'score', 'threshold', 'candidates'}.
+    """
+    return match_embeddings(get_gallery(), embeddings)
+
+
+def identify(img, return_embeddings=False):
+    """
+    Calcula los embeddings del rostro y los busca en la galería. Con
+    return_embeddings devuelve también los embeddings (para guardarlos en caché).
+    """
+    embeddings = get_embedder().embed_image(img)
+    match = search(embeddings)
+    return (match, embeddings) if return_embeddings else match
+
+
+def embed_enrollment_image(img, embedder):
+    """
+    Como embed_gallery_image pero exigiendo un rostro: en la inscripción una
+    imagen sin rostro se informa como error en lugar de embeberse completa.
+    """
+    try:
+        objs = embedder.represent(img, enforce_detection=True)
+    except ValueError:  # DeepFace no detectó un rostro
+        return None
+    return objs[0]['embedding'] if objs else None
+
+
+def embed_batch(images):
+    """
+    Embedding del rostro principal de cada imagen (None si no tiene rostro). Con
+    backends que reciben recortes, los rostros se embeben en un solo lote.
+    """
+    embedder = get_embedder()
+    if embedder.detects_faces:
+        return [embed_enrollment_image(img, embedder) for img in images]
+
+    faces = [crop_best_face(img) for img in images]
+    found = [i for i, face in enumerate(faces) if face is not None]
+    embeddings = [None] * len(images)
+    for i, embedding in zip(found, embedder.embed_faces([faces[i] for i in found])):
+        embeddings[i] = embedding
+    return embeddings
+
+
+def enroll(embeddings, paths):
+    """
+    Agrega las imágenes inscritas a la galería de este proceso y guarda el artefacto;
+    los demás procesos lo recargan al detectar el cambio.
+    """
+    return enroll_images(embeddings, paths)
+
+
+# Operaciones que puede ejecutar un proceso de inferencia
+OPERATIONS = {
+    'detect': detect,
+    'represent': represent,
+    'identify': identify,
+    'search': search,
+    'embed_batch': embed_batch,
+    'enroll': enroll,
+}
@@ -0,0 +1,188 @@
+"""
+Detección de vida de rostros.
+
+    check_liveness       reflejo en los ojos sobre los recortes de una sola imagen
+    check_blink_burst    parpadeo a partir de landmarks en una ráfaga de fotogramas
+
+El modo ráfaga usa el modelo de landmarks LBF de OpenCV (opencv-contrib, 68 puntos):
+    wget https://raw.githubusercontent.com/kurnianggoro/GSOC2017/master/data/lbfmodel.yaml
+"""
+import logging
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# Configuración del logger
+logger = logging.getLogger(__name__)
+
+# Lado del recorte en escala de grises sobre el que trabaja la cascada de ojos
+LIVENESS_FACE_SIZE = int(os.environ.get('LIVENESS_FACE_SIZE', 128))
+# Mismos parámetros que la detección de ojos y reflejos original
+EYE_SCALE_FACTOR = 1.3
+EYE_MIN_NEIGHBORS = 5
+REFLECTION_THRESHOLD = 42
+
+# Modo ráfaga (parpadeo)
+LANDMARK_MODEL_PATH = os.environ.get('LANDMARK_MODEL_PATH', '/app/lbfmodel.yaml')
+# Umbral de EAR por debajo del cual el ojo se considera cerrado (el mismo de la versión original)
+BLINK_EAR_THRESHOLD = float(os.environ.get('BLINK_EAR_THRESHOLD', 0.25))
+MIN_BURST_FRAMES = 3
+# Margen alrededor de los landmarks del fotograma anterior para seguir el rostro
+TRACK_MARGIN = 0.25
+# Índices de los ojos en el esquema de 68 puntos
+LEFT_EYE = slice(36, 42)
+RIGHT_EYE = slice(42, 48)
+JPEG_SOI = b'\xff\xd8'
+JPEG_EOI = b'\xff\xd9'
+
+
+def check_liveness(crops, eye_cascade):
+    """
+    Evalúa la vitalidad de todos los recortes de rostro de una solicitud.
+
+    Cada recorte se convierte a gris y se reduce a LIVENESS_FACE_SIZE una sola
+    vez; la cascada de ojos y la búsqueda de reflejos trabajan sobre esos
+    buffers. Un rostro es real si tiene al menos un ojo con reflejo (algún
+    píxel por encima de REFLECTION_THRESHOLD, equivalente a umbralizar y buscar
+    contornos).
+
+    Devuelve (lista de bool, tiempos por etapa en ms).
+    """
+    timings = {}
+    size = LIVENESS_FACE_SIZE
+
+    start = time.perf_counter()
+    grays = np.empty((len(crops), size, size), dtype=np.uint8)
+    for i, crop in enumerate(crops):
+        gray = crop if crop.ndim == 2 else cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+        grays[i] = cv2.resize(gray, (size, size), interpolation=cv2.INTER_AREA)
+    timings['grayscale_ms'] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    eyes_mask = np.zeros(grays.shape, dtype=bool)
+    eye_counts = []
+    for i, gray in enumerate(grays):
+        eyes = eye_cascade.detectMultiScale(gray, EYE_SCALE_FACTOR, EYE_MIN_NEIGHBORS)
+        eye_counts.append(len(eyes))
+        for (ex, ey, ew, eh) in eyes:
+            eyes_mask[i, ey:ey + eh, ex:ex + ew] = True
+    timings['eye_detection_ms'] = (time.perf_counter() - start) * 1000
+
+    # Reflejos de todos los ojos de todos los rostros en una sola operación
+    start = time.perf_counter()
+    reflective = ((grays > REFLECTION_THRESHOLD) & eyes_mask).reshape(len(crops), -1)
+    live = reflective.any(axis=1)
+    timings['reflection_ms'] = (time.perf_counter() - start) * 1000
+
+    logger.info(
+        f"Liveness: ojos por rostro = {eye_counts}, vivos = {live.tolist()}, tiempos = "
+        + ", ".join(f"{k}={v:.2f}" for k, v in timings.items()))
+    return live.tolist(), timings
+
+
+def split_mjpeg(data):
+    """
+    Separa un fragmento MJPEG (JPEG concatenados) en los bytes de cada fotograma.
+    """
+    frames = []
+    start = data.find(JPEG_SOI)
+    while start != -1:
+        end = data.find(JPEG_EOI, start + 2)
+        if end == -1:
+            break
+        frames.append(data[start:end + 2])
+        start = data.find(JPEG_SOI, end + 2)
+    return frames
+
+
+_facemark = None
+_facemark_lock = threading.Lock()
+
+
+def get_facemark():
+    """
+    Devuelve (cargando una sola vez por proceso) el modelo de landmarks LBF.
+    """
+    global _facemark
+    if _facemark is None:
+        if not os.path.exists(LANDMARK_MODEL_PATH):
+            raise FileNotFoundError(
+                f"El modelo de landmarks no se encontró en la ruta: {LANDMARK_MODEL_PATH}")
+        facemark = cv2.face.createFacemarkLBF()
+        facemark.loadModel(LANDMARK_MODEL_PATH)
+        _facemark = facemark
+        logger.info(f"Modelo de landmarks cargado: {LANDMARK_MODEL_PATH}")
+    return _facemark
+
+
+def eye_aspect_ratios(landmarks):
+    """
+    EAR promedio de ambos ojos para cada fotograma de un arreglo (F, 68, 2).
+    """
+    eyes = np.stack([landmarks[:, LEFT_EYE], landmarks[:, RIGHT_EYE]], axis=1)
+    vertical = (np.linalg.norm(eyes[:, :, 1] - eyes[:, :, 5], axis=-1)
+                + np.linalg.norm(eyes[:, :, 2] - eyes[:, :, 4], axis=-1))
+    horizontal = np.linalg.norm(eyes[:, :, 0] - eyes[:, :, 3], axis=-1)
+    return (vertical / (2.0 * np.maximum(horizontal, 1e-6))).mean(axis=1)
+
+
+def detect_blink_series(ears, threshold=BLINK_EAR_THRESHOLD):
+    """
+    Hay parpadeo si algún fotograma con ojos cerrados (EAR < threshold) queda
+    entre dos fotogramas con ojos abiertos.
+    """
+    ears = ears[~np.isnan(ears)]
+    open_frames = np.flatnonzero(ears >= threshold)
+    if len(open_frames) < 2:
+        return False
+    return bool((ears[open_frames[0]:open_frames[-1]] < threshold).any())
+
+
+def track_box(landmarks, width, height):
+    """
+    Caja (x, y, w, h) del rostro en el siguiente fotograma a partir de los landmarks actuales.
+    """
+    (x1, y1), (x2, y2) = landmarks.min(axis=0), landmarks.max(axis=0)
+    margin_x, margin_y = (x2 - x1) * TRACK_MARGIN, (y2 - y1) * TRACK_MARGIN
+    x1, y1 = max(x1 - margin_x, 0), max(y1 - margin_y, 0)
+    x2, y2 = min(x2 + margin_x, width - 1), min(y2 + margin_y, height - 1)
+    return np.array([[x1, y1, x2 - x1, y2 - y1]], dtype=np.int32)
+
+
+def check_blink_burst(frames, box):
+    """
+    Evalúa el parpadeo en una ráfaga de fotogramas en escala de grises.
+
+    box es la caja (x1, y1, x2, y2) del rostro en el primer fotograma; en los
+    siguientes se sigue con los landmarks del fotograma anterior. Devuelve
+    (parpadeo detectado, serie de EAR, tiempos por etapa en ms).
+    """
+    timings = {}
+    facemark = get_facemark()
+    x1, y1, x2, y2 = box
+    face = np.array([[x1, y1, x2 - x1, y2 - y1]], dtype=np.int32)
+
+    start = time.perf_counter()
+    landmarks = np.full((len(frames), 68, 2), np.nan, dtype=np.float32)
+    # El modelo LBF no es seguro entre hilos
+    with _facemark_lock:
+        for i, gray in enumerate(frames):
+            ok, points = facemark.fit(gray, face)
+            if not ok:
+                continue
+            landmarks[i] = points[0].reshape(68, 2)
+            face = track_box(landmarks[i], gray.shape[1], gray.shape[0])
+    timings['landmarks_ms'] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    ears = eye_aspect_ratios(landmarks)
+    blink = len(frames) >= MIN_BURST_FRAMES and detect_blink_series(ears)
+    timings['blink_ms'] = (time.perf_counter() - start) * 1000
+
+    logger.info(
+        f"Liveness (ráfaga): {len(frames)} fotogramas, EAR = {np.round(ears, 3).tolist()}, "
+        f"parpadeo = {blink}")
+    return blink, ears, timings
@@ -0,0 +1,173 @@
+"""
+Decisión de identidad a partir de puntajes por identidad.
+
+Cada identidad de la galería recibe un puntaje de similitud coseno (la media de
+sus SCORE_TOP_N imágenes más parecidas, o la máxima) y el rostro se asigna a
+la mejor identidad si supera el umbral calibrado del despliegue.
+
+MATCH_MODE elige contra qué se compara el rostro:
+    full       todas las imágenes de la galería
+    prototype  solo los centroides de cada identidad (una fila por persona)
+    rerank     centroides y, para las RERANK_SHORTLIST mejores identidades,
+               todas sus imágenes (mismo puntaje que full)
+
+El umbral se toma, en orden, de RECOGNITION_THRESHOLD, del archivo de
+calibración del backend de embeddings o del umbral por defecto de DeepFace:
+    python matching.py --target-far 0.001
+"""
+import argparse
+import json
+import logging
+import os
+import time
+
+import numpy as np
+from gallery import COSINE_THRESHOLD, DEEPFACE_DB_PATH
+
+# Configuración del logger
+logger = logging.getLogger(__name__)
+
+# mean = media de las top-n imágenes de cada identidad; max = la más similar
+SCORE_AGGREGATION = os.environ.get('SCORE_AGGREGATION', 'mean')
+SCORE_TOP_N = int(os.environ.get('SCORE_TOP_N', 3))
+TOP_K_CANDIDATES = int(os.environ.get('TOP_K_CANDIDATES', 5))
+MATCH_MODE = os.environ.get('MATCH_MODE', 'rerank')
+RERANK_SHORTLIST = int(os.environ.get('RERANK_SHORTLIST', 10))
+# Umbral de similitud fijo; vacío = usar la calibración
+RECOGNITION_THRESHOLD = os.environ.get('RECOGNITION_THRESHOLD', '')
+DEFAULT_THRESHOLD = 1.0 - COSINE_THRESHOLD
+
+
+def calibration_path(backend, db_path=DEEPFACE_DB_PATH):
+    return os.path.join(db_path, f"calibration_{backend}.json")
+
+
+_thresholds = {}
+
+
+def get_threshold(backend):
+    """
+    Umbral de similitud del backend (cargado una sola vez por proceso).
+    """
+    if RECOGNITION_THRESHOLD:
+        return float(RECOGNITION_THRESHOLD)
+    if backend not in _thresholds:
+        path = calibration_path(backend)
+        if os.path.exists(path):
+            with open(path) as f:
+                _thresholds[backend] = float(json.load(f)['threshold'])
+            logger.info(f"Umbral calibrado ({backend}): {_thresholds[backend]:.4f}")
+        else:
+            _thresholds[backend] = DEFAULT_THRESHOLD
+    return _thresholds[backend]
+
+
+def identity_scores(gallery, embedding, aggregation=SCORE_AGGREGATION, top_n=SCORE_TOP_N,
+                    mode=MATCH_MODE):
+    """
+    (puntaje, similitud máxima, media top-n) de cada identidad; -inf para las
+    identidades que la primera pasada por prototipos descartó.
+    """
+    shortlist = None
+    if mode != 'full':
+        first_pass = gallery.score_prototypes(embedding)
+        if mode == 'prototype':
+            return first_pass, first_pass, first_pass
+        if RERANK_SHORTLIST < len(first_pass):
+            shortlist = np.argpartition(-first_pass, RERANK_SHORTLIST - 1)[:RERANK_SHORTLIST]
+
+    best, mean = gallery.score_identities(embedding, top_n, shortlist)
+    return (mean if aggregation == 'mean' else best), best, mean
+
+
+def rank_identities(gallery, embeddings, top_k=TOP_K_CANDIDATES):
+    """
+    Las top_k identidades con su puntaje. Con varios embeddings (varios rostros
+    en el recorte) cada identidad conserva su mejor puntaje.
+    """
+    if len(gallery) == 0 or len(embeddings) == 0:
+        return []
+
+    scores, best, mean = zip(*(identity_scores(gallery, e) for e in embeddings))
+    row = np.stack(scores).argmax(axis=0)
+    columns = np.arange(len(gallery.names))
+    scores, best, mean = (np.stack(a)[row, columns] for a in (scores, best, mean))
+
+    k = min(top_k, int(np.isfinite(scores).sum()))
+    if k == 0:
+        return []
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind='stable')]
+    return [{'identity': str(gallery.names[i]), 'score': round(float(scores[i]), 4),
+             'max_similarity': round(float(best[i]), 4),
+             'mean_similarity': round(float(mean[i]), 4)} for i in top]
+
+
+def match_embeddings(gallery, embeddings, top_k=TOP_K_CANDIDATES):
+    """
+    Candidatos y decisión: identity es None si ningún puntaje supera el umbral.
+    """
+    candidates = rank_identities(gallery, embeddings, top_k)
+    threshold = get_threshold(gallery.backend)
+    accepted = bool(candidates) and candidates[0]['score'] >= threshold
+    return {
+        'identity': candidates[0]['identity'] if accepted else None,
+        'score': candidates[0]['score'] if candidates else None,
+        'threshold': threshold,
+        'candidates': candidates,
+    }
+
+
+def calibrate(gallery, target_far, aggregation=SCORE_AGGREGATION, top_n=SCORE_TOP_N):
+    """
+    Calibra el umbral con la galería (dejando fuera cada imagen): puntaje de su
+    propia identidad (genuino) frente al mejor puntaje de las demás (impostor).
+    El umbral es el menor que mantiene la tasa de falsos aceptados <= target_far.
+    """
+    from gallery import Gallery
+
+    genuine, impostor = [], []
+    for i in range(len(gallery)):
+        keep = np.arange(len(gallery)) != i
+        rest = Gallery(gallery.embeddings[keep], [p for j, p in enumerate(gallery.paths) if j != i],
+                       gallery.backend, gallery.prototypes_per_identity)
+        scores, _, _ = identity_scores(rest, gallery.embeddings[i], aggregation, top_n)
+        own = rest.names == gallery.identities[i]
+        if own.any():
+            genuine.append(scores[own][0])
+        if (~own).any():
+            impostor.append(scores[~own].max())
+
+    genuine, impostor = np.array(genuine), np.array(impostor)
+    if len(impostor) == 0 or len(genuine) == 0:
+        raise ValueError("La galería necesita al menos dos identidades con varias imágenes")
+
+    threshold = float(np.quantile(impostor, 1.0 - target_far))
+    return {
+        'backend': gallery.backend,
+        'threshold': threshold,
+        'aggregation': aggregation,
+        'top_n': top_n,
+        'mode': MATCH_MODE,
+        'target_far': target_far,
+        'far': float((impostor >= threshold).mean()),
+        'tar': float((genuine >= threshold).mean()),
+        'genuine': int(len(genuine)),
+        'impostor': int(len(impostor)),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+if __name__ == '__main__':
+    from gallery import get_gallery
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Calibrar el umbral de reconocimiento")
+    parser.add_argument('--target-far', type=float, default=0.001)
+    args = parser.parse_args()
+
+    gallery = get_gallery()
+    result = calibrate(gallery, args.target_far)
+    with open(calibration_path(gallery.backend), 'w') as f:
+        json.dump(result, f, indent=2)
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,177 @@
+"""
+Métricas del servicio en formato de texto de Prometheus (GET /metrics).
+
+- http_request_duration_seconds / http_requests_total / http_requests_in_flight
+  por ruta, registradas por instrument_app.
+- stage_duration_seconds por ruta y etapa (decode, detect, liveness, identify,
+  match, embed, db...), registradas con:
+      with stage('decode'):
+          img = cv2.imdecode(...)
+  Fuera de una solicitud (hilos de captura) la ruta es "background".
+- db_pool_connections con el estado del pool de sesiones de Oracle.
+
+Las métricas son por proceso.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from db_connection import pool_stats
+
+from flask import g, has_request_context, request
+
+# Límites de los histogramas de latencia, en segundos
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, description, labelnames=()):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def header(self):
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, labels=(), amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        with self.lock:
+            values = dict(self.values)
+        return self.header() + [f"{self.name}{_labels(self.labelnames, labels)} {value}"
+                                for labels, value in sorted(values.items())]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, description, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = buckets
+
+    def observe(self, labels, value):
+        with self.lock:
+            entry = self.values.get(labels)
+            if entry is None:
+                entry = self.values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self):
+        with self.lock:
+            values = {labels: (list(counts), total, count)
+                      for labels, (counts, total, count) in self.values.items()}
+        lines = self.header()
+        for labels, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, counts):
+                cumulative += bucket
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', "Duración de las solicitudes HTTP",
+                            ('route', 'method'))
+REQUESTS = Counter('http_requests_total', "Solicitudes HTTP atendidas",
+                   ('route', 'method', 'status'))
+IN_FLIGHT = Gauge('http_requests_in_flight', "Solicitudes HTTP en curso", ('route',))
+STAGE_LATENCY = Histogram('stage_duration_seconds', "Duración de cada etapa del procesamiento",
+                          ('route', 'stage'))
+
+
+def current_route():
+    if has_request_context():
+        return request.url_rule.rule if request.url_rule else 'unmatched'
+    return 'background'
+
+
+@contextmanager
+def stage(name):
+    """
+    Mide el bloque como la etapa name de la ruta actual (también si lanza una excepción).
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.observe((current_route(), name), time.perf_counter() - start)
+
+
+def instrument_app(app):
+    """
+    Registra la latencia, el estado y las solicitudes en curso de cada ruta.
+    Con respuestas en streaming la duración incluye el envío del cuerpo.
+    """
+    @app.before_request
+    def start_timer():
+        g.metrics_route = current_route()
+        g.metrics_start = time.perf_counter()
+        IN_FLIGHT.inc((g.metrics_route,))
+
+    @app.after_request
+    def count_response(response):
+        if 'metrics_route' in g:
+            REQUESTS.inc((g.metrics_route, request.method, str(response.status_code)))
+        return response
+
+    @app.teardown_request
+    def stop_timer(exc):
+        if 'metrics_start' not in g:
+            return
+        IN_FLIGHT.dec((g.metrics_route,))
+        REQUEST_LATENCY.observe((g.metrics_route, request.method),
+                                time.perf_counter() - g.pop('metrics_start'))
+
+
+def render_pool():
+    stats = pool_stats()
+    lines = ["# HELP db_pool_connections Conexiones del pool de sesiones de Oracle",
+             "# TYPE db_pool_connections gauge"]
+    if stats:
+        lines += [f'db_pool_connections{{state="{state}"}} {value}' for state, value in stats.items()]
+    return lines
+
+
+def render():
+    lines = []
+    for metric in (REQUEST_LATENCY, REQUESTS, IN_FLIGHT, STAGE_LATENCY):
+        lines += metric.render()
+    lines += render_pool()
+    return "\n".join(lines) + "\n"
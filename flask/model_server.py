@@ -0,0 +1,332 @@
+"""
+Servidor de modelos.
+
+Aloja YOLO y Facenet512 en un pool configurable de procesos de inferencia,
+independiente de los workers de Flask. Los workers de Flask se conectan por un
+socket local y envían operaciones (detect, represent, identify); los procesos de
+inferencia pueden fijarse a núcleos específicos. Los fotogramas viajan por un
+anillo de memoria compartida (shared_frames) y se referencian por ranura.
+
+Uso:
+    MODEL_SERVER_AUTHKEY=<clave compartida> python model_server.py
+
+Si MODEL_SERVER_HOST no está definido, run_inference ejecuta las operaciones en
+el mismo proceso (comportamiento original).
+"""
+import logging
+import os
+import threading
+from multiprocessing import get_context
+from multiprocessing.connection import Client, Listener
+
+from shared_frames import (FrameRef, FrameRing, SlotAllocator,
+                           get_attached_ring, resolve_frames)
+
+# Configuración del logger
+logger = logging.getLogger(__name__)
+
+# Configuración del servidor de modelos
+MODEL_SERVER_HOST = os.environ.get('MODEL_SERVER_HOST')
+# Solo local por defecto; en docker-compose, el nombre del servicio en la red interna
+MODEL_SERVER_BIND = os.environ.get('MODEL_SERVER_BIND', '127.0.0.1')
+MODEL_SERVER_PORT = int(os.environ.get('MODEL_SERVER_PORT', 6000))
+MODEL_SERVER_WORKERS = int(os.environ.get('MODEL_SERVER_WORKERS', 2))
+# Obligatoria y sin valor por defecto: las conexiones intercambian objetos pickle
+MODEL_SERVER_AUTHKEY = os.environ.get('MODEL_SERVER_AUTHKEY')
+# Núcleos por proceso de inferencia, p. ej. "0-1;2-3" (un grupo por proceso)
+MODEL_SERVER_CPUS = os.environ.get('MODEL_SERVER_CPUS', '')
+# Ranuras del anillo de fotogramas reservadas para cada conexión de cliente
+FRAME_SLOTS_PER_CLIENT = int(os.environ.get('FRAME_SLOTS_PER_CLIENT', 2))
+
+# Anillo de fotogramas visible por los procesos de inferencia (nombre, ranuras, bytes)
+_ring_spec = None
+
+
+class ModelServerError(Exception):
+    """
+    Error devuelto por un proceso de inferencia del servidor de modelos.
+    """
+
+
+def get_authkey():
+    """
+    Clave compartida entre el servidor de modelos y sus clientes. Sin ella no se
+    arranca ni se conecta: multiprocessing.connection deserializa con pickle todo
+    lo que recibe de un cliente autenticado.
+    """
+    if not MODEL_SERVER_AUTHKEY:
+        raise RuntimeError("MODEL_SERVER_AUTHKEY no está definido")
+    return MODEL_SERVER_AUTHKEY.encode()
+
+
+def parse_cpu_groups(spec):
+    """
+    Convierte una especificación como "0-1;2,3" en una lista de conjuntos de núcleos.
+    """
+    groups = []
+    for group in filter(None, (g.strip() for g in spec.split(';'))):
+        cpus = set()
+        for part in filter(None, (p.strip() for p in group.split(','))):
+            if '-' in part:
+                start, end = part.split('-')
+                cpus.update(range(int(start), int(end) + 1))
+            else:
+                cpus.add(int(part))
+        groups.append(cpus)
+    return groups
+
+
+def _init_worker(counter, cpu_groups, ring_spec):
+    """
+    Inicializa un proceso de inferencia: fija sus núcleos y precarga los modelos.
+    """
+    global _ring_spec
+    _ring_spec = ring_spec
+
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+
+    if cpu_groups:
+        cpus = cpu_groups[index % len(cpu_groups)]
+        # Limitar los hilos de las librerías numéricas a los núcleos asignados
+        os.environ['OMP_NUM_THREADS'] = str(len(cpus))
+        if hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, cpus)
+        logger.info(f"Proceso de inferencia {index} fijado a los núcleos {sorted(cpus)}")
+
+    import inference
+    inference.warmup()
+
+
+def _run_operation(op, args, kwargs):
+    """
+    Ejecuta una operación registrada en inference.OPERATIONS dentro del proceso de inferencia.
+    """
+    import inference
+
+    if _ring_spec is not None:
+        # Las FrameRef se convierten en vistas sobre la memoria compartida, sin copia
+        args, kwargs = resolve_frames(get_attached_ring(*_ring_spec), args, kwargs)
+    return inference.OPERATIONS[op](*args, **kwargs)
+
+
+class ModelServer:
+    """
+    Acepta conexiones de los workers de Flask y reparte las operaciones en el pool de inferencia.
+    """
+
+    def __init__(self, address, authkey, workers, cpu_groups=None):
+        self.address = address
+        self.authkey = authkey
+        self.workers = workers
+        self.cpu_groups = cpu_groups or []
+        self._pool = None
+        self.ring = None
+        self.allocator = None
+
+    def start_pool(self):
+        from detectors import prepare_detector
+        prepare_detector()
+
+        self.ring = FrameRing.create()
+        self.allocator = SlotAllocator(self.ring.slots)
+        ring_spec = (self.ring.shm.name, self.ring.slots, self.ring.slot_bytes)
+
+        # "spawn" para que cada proceso cargue sus propios modelos sin heredar estado de hilos
+        ctx = get_context('spawn')
+        counter = ctx.Value('i', 0)
+        self._pool = ctx.Pool(processes=self.workers, initializer=_init_worker,
+                              initargs=(counter, self.cpu_groups, ring_spec))
+        logger.info(f"Pool de inferencia iniciado con {self.workers} procesos.")
+
+    def handle_connection(self, conn):
+        leased = []
+        try:
+            while True:
+                try:
+                    op, args, kwargs = conn.recv()
+                except EOFError:
+                    break
+
+                if op == 'lease':
+                    # Reservar ranuras del anillo para esta conexión hasta que se cierre
+                    slots = self.allocator.lease(FRAME_SLOTS_PER_CLIENT)
+                    leased.extend(slots)
+                    conn.send(('ok', (self.ring.shm.name, self.ring.slots,
+                                      self.ring.slot_bytes, slots)))
+                    continue
+
+                try:
+                    result = self.dispatch(op, args, kwargs)
+                    conn.send(('ok', result))
+                except Exception as e:
+                    logger.exception(f"Error ejecutando la operación {op}")
+                    conn.send(('error', f"{type(e).__name__}: {e}"))
+        finally:
+            self.allocator.release(leased)
+            conn.close()
+
+    def dispatch(self, op, args, kwargs):
+        return self._pool.apply(_run_operation, (op, args, kwargs))
+
+    def serve_forever(self):
+        if self._pool is None:
+            self.start_pool()
+
+        with Listener(self.address, authkey=self.authkey) as listener:
+            logger.info(f"Servidor de modelos escuchando en {self.address}")
+            while True:
+                conn = listener.accept()
+                threading.Thread(target=self.handle_connection,
+                                 args=(conn,), daemon=True).start()
+
+
+class ModelClient:
+    """
+    Cliente del servidor de modelos. Mantiene una conexión por hilo, con sus
+    propias ranuras del anillo de fotogramas.
+    """
+
+    def __init__(self, address, authkey):
+        self.address = address
+        self.authkey = authkey
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = Client(self.address, authkey=self.authkey)
+            self._local.conn = conn
+            self._local.ring = None
+            self._local.slots = []
+            self._local.cursor = 0
+            self._lease(conn)
+        return conn
+
+    def _lease(self, conn):
+        conn.send(('lease', (), {}))
+        status, payload = conn.recv()
+        if status != 'ok':
+            return
+
+        name, slots, slot_bytes, leased = payload
+        try:
+            # Adjuntar por conexión: tras un reinicio del servidor el segmento es otro
+            self._local.ring = FrameRing.attach(name, slots, slot_bytes)
+            self._local.slots = leased
+        except FileNotFoundError:
+            # El servidor no comparte memoria con este proceso: se envían los fotogramas serializados
+            logger.warning(
+                "No se pudo adjuntar el anillo de fotogramas; se usará transferencia serializada.")
+
+    def _reset(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+        ring = getattr(self._local, 'ring', None)
+        if ring is not None:
+            ring.close()
+        self._local.conn = None
+        self._local.ring = None
+
+    def share(self, array):
+        """
+        Escribe el fotograma en una ranura propia y devuelve su FrameRef. Si no
+        hay ranuras o no cabe, devuelve el propio arreglo. La referencia es
+        válida hasta que el mismo hilo comparta FRAME_SLOTS_PER_CLIENT fotogramas más.
+        """
+        self._connection()
+        slots = self._local.slots
+        if not slots or not self._local.ring.fits(array):
+            return array
+
+        slot = slots[self._local.cursor % len(slots)]
+        self._local.cursor += 1
+        return self._local.ring.write(slot, array)
+
+    def call(self, op, *args, **kwargs):
+        # Las FrameRef no sobreviven a una reconexión (las ranuras se vuelven a repartir)
+        uses_frames = any(isinstance(a, FrameRef)
+                          for a in list(args) + list(kwargs.values()))
+
+        # Un reintento si la conexión se cerró (p. ej. reinicio del servidor de modelos)
+        for attempt in range(2):
+            try:
+                conn = self._connection()
+                conn.send((op, args, kwargs))
+                status, payload = conn.recv()
+                break
+            except (EOFError, OSError):
+                self._reset()
+                if attempt or uses_frames:
+                    raise
+
+        if status == 'error':
+            raise ModelServerError(payload)
+        return payload
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def is_remote():
+    """
+    Indica si las operaciones de inferencia se delegan al servidor de modelos.
+    """
+    return bool(MODEL_SERVER_HOST)
+
+
+def get_model_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ModelClient(
+                (MODEL_SERVER_HOST, MODEL_SERVER_PORT), get_authkey())
+        return _client
+
+
+def share_frame(img):
+    """
+    Publica el fotograma en memoria compartida para las siguientes operaciones
+    de inferencia. Sin servidor de modelos devuelve la misma imagen.
+    """
+    if is_remote():
+        return get_model_client().share(img)
+    return img
+
+
+def crop_frame(frame, x1, y1, x2, y2):
+    """
+    Recorta un fotograma compartido (por referencia) o un ndarray (por vista).
+    """
+    if isinstance(frame, FrameRef):
+        return frame.crop(x1, y1, x2, y2)
+    return frame[y1:y2, x1:x2]
+
+
+def run_inference(op, *args, **kwargs):
+    """
+    Ejecuta una operación de inferencia en el servidor de modelos o, si no está
+    configurado, en el proceso actual.
+    """
+    if is_remote():
+        return get_model_client().call(op, *args, **kwargs)
+
+    import inference
+    return inference.OPERATIONS[op](*args, **kwargs)
+
+
+def serve():
+    server = ModelServer((MODEL_SERVER_BIND, MODEL_SERVER_PORT), get_authkey(),
+                         MODEL_SERVER_WORKERS, parse_cpu_groups(MODEL_SERVER_CPUS))
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    serve()
@@ -0,0 +1,81 @@
+import logging
+
+from box_ops import clip_boxes, unletterbox_boxes
+from embedding_cache import dhash, get_embedding_cache
+from image_ops import DETECT_INPUT_SIZE, letterbox
+from metrics import stage
+from model_server import crop_frame, run_inference, share_frame
+
+# Configuración del logger
+logger = logging.getLogger(__name__)
+
+
+def detect_boxes(img, scale=1):
+    """
+    Detecta rostros con YOLO sobre la imagen con letterbox y devuelve las cajas
+    (x1, y1, x2, y2, conf, cls) en la resolución original. scale es el factor
+    con el que se redujo img al decodificarla.
+    """
+    model_input, ratio, pad = letterbox(img, DETECT_INPUT_SIZE)
+    boxes = run_inference('detect', share_frame(model_input),
+                          imgsz=DETECT_INPUT_SIZE)
+
+    width, height = img.shape[1] * scale, img.shape[0] * scale
+    return clip_boxes(unletterbox_boxes(boxes, ratio, pad, scale), width, height)
+
+
+def identify_region(img, frame, x1, y1, x2, y2):
+    """
+    Identifica una región; si un recorte casi idéntico se vio hace poco, reutiliza
+    su embedding y solo busca en la galería.
+    """
+    cache = get_embedding_cache()
+    if not cache.enabled:
+        with stage('identify'):
+            return run_inference('identify', crop_frame(frame, x1, y1, x2, y2))
+
+    key = dhash(img[y1:y2, x1:x2])
+    embeddings = cache.get(key)
+    if embeddings is not None:
+        with stage('match'):
+            return run_inference('search', embeddings)
+
+    # identify = embedding + búsqueda en la galería en el servidor de modelos
+    with stage('identify'):
+        match, embeddings = run_inference(
+            'identify', crop_frame(frame, x1, y1, x2, y2), return_embeddings=True)
+    cache.put(key, embeddings)
+    return match
+
+
+def identify_each(img, regions):
+    """
+    Reconoce cada región (x1, y1, x2, y2) de la imagen; devuelve, por región, la
+    identidad aceptada (o None), su puntaje y los candidatos.
+    """
+    results = []
+    if not regions:
+        return results
+
+    # Publicar la imagen una sola vez; los recortes se envían por referencia
+    frame = share_frame(img)
+    for x1, y1, x2, y2 in regions:
+        try:
+            match = identify_region(img, frame, x1, y1, x2, y2)
+        except Exception as e:
+            logger.exception(f"Error en el reconocimiento facial: {str(e)}")
+            match = {'identity': None, 'score': None, 'candidates': []}
+
+        if match['identity'] is None:
+            logger.info("No se encontraron coincidencias para el rostro actual.")
+        results.append(match)
+    return results
+
+
+def best_match(results):
+    """
+    Mejor resultado entre todas las regiones: primero las identidades aceptadas y,
+    entre ellas, el mayor puntaje. None si no hay resultados.
+    """
+    return max(results, default=None, key=lambda r: (
+        r['identity'] is not None, r['score'] if r['score'] is not None else -1.0))
@@ -2,8 +2,8 @@ import logging
 import random
 from datetime import datetime
 
-import cx_Oracle
-from db_connection import get_db_connection
+from cache import fetch_one_cached, get_cache
+from db_connection import IntegrityError, get_db_connection, insert_returning_id
 from werkzeug.security import generate_password_hash
 
 from flask import Blueprint, jsonify, request
@@ -73,18 +73,12 @@ def create_appuser():
         if cursor.fetchone()[0] > 0:
             return jsonify({"error": "El email ya está registrado en el sistema."}), 400
 
-        # Variable para capturar el USER_ID generado
-        cursor.execute(
+        # Insertar el usuario y obtener el USER_ID generado
+        user_id = insert_returning_id(
+            cursor,
             """
-            DECLARE
-                v_user_id NUMBER;
-            BEGIN
-                INSERT INTO APP_USER (FIRST_NAME, LAST_NAME, EMAIL, PASSWORD, ROLE_ID, REGISTRATION_DATE, PROFESSOR_ID) 
-                VALUES (:first_name, :last_name, :email, :password, :role_id, TO_DATE(:registration_date, 'YYYY-MM-DD'), NULL)
-                RETURNING USER_ID INTO v_user_id;
-
-                :user_id := v_user_id;
-            END;
+            INSERT INTO APP_USER (FIRST_NAME, LAST_NAME, EMAIL, PASSWORD, ROLE_ID, REGISTRATION_DATE, PROFESSOR_ID) 
+            VALUES (:first_name, :last_name, :email, :password, :role_id, TO_DATE(:registration_date, 'YYYY-MM-DD'), NULL)
             """,
             {
                 'first_name': data['FIRST_NAME'],
@@ -92,29 +86,20 @@ def create_appuser():
                 'email': data['EMAIL'],
                 'password': hashed_password,
                 'role_id': data['ROLE_ID'],
-                'registration_date': registration_date,
-                'user_id': cursor.var(int)
-            }
+                'registration_date': registration_date
+            },
+            'USER_ID'
         )
 
-        # Obtener el ID del usuario recién creado
-        user_id = cursor.bindvars['user_id'].getvalue()
-
         # Generar un código de profesor único
         professor_code = generate_unique_professor_code(cursor)
 
-        # Inserción en la tabla PROFESSOR con RETURNING INTO
-        cursor.execute(
+        # Inserción en la tabla PROFESSOR obteniendo el PROFESSOR_ID generado
+        professor_id = insert_returning_id(
+            cursor,
             """
-            DECLARE
-                v_professor_id NUMBER;
-            BEGIN
-                INSERT INTO PROFESSOR (USER_ID, PROFESSOR_CODE, FIRST_NAME, LAST_NAME, EMAIL, REGISTRATION_DATE, PHOTO, UNIVERSITY_ID, ID_CARD) 
-                VALUES (:user_id, :professor_code, :first_name, :last_name, :email, TO_DATE(:registration_date, 'YYYY-MM-DD'), NULL, :university_id, :id_card)
-                RETURNING PROFESSOR_ID INTO v_professor_id;
-
-                :professor_id := v_professor_id;
-            END;
+            INSERT INTO PROFESSOR (USER_ID, PROFESSOR_CODE, FIRST_NAME, LAST_NAME, EMAIL, REGISTRATION_DATE, PHOTO, UNIVERSITY_ID, ID_CARD) 
+            VALUES (:user_id, :professor_code, :first_name, :last_name, :email, TO_DATE(:registration_date, 'YYYY-MM-DD'), NULL, :university_id, :id_card)
             """,
             {
                 'user_id': user_id,
@@ -124,14 +109,11 @@ def create_appuser():
                 'email': data['EMAIL'],
                 'registration_date': registration_date,
                 'university_id': data['UNIVERSITY_ID'],
-                'id_card': data['ID_CARD'],
-                'professor_id': cursor.var(int)
-            }
+                'id_card': data['ID_CARD']
+            },
+            'PROFESSOR_ID'
         )
 
-        # Obtener el ID del profesor recién creado
-        professor_id = cursor.bindvars['professor_id'].getvalue()
-
         # Actualizar el AppUser con el PROFESSOR_ID
         cursor.execute(
             """
@@ -147,7 +129,7 @@ def create_appuser():
 
         conn.commit()
         return jsonify({"message": "AppUser y Professor creados exitosamente", "professor_code": professor_code}), 201
-    except cx_Oracle.IntegrityError as e:
+    except IntegrityError as e:
         logger.exception(
             "Error de integridad de base de datos creando AppUser y Professor")
         conn.rollback()  # Hacer rollback en caso de error
@@ -187,23 +169,17 @@ def get_appuser(user_id):
         description: Error interno del servidor
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            "SELECT * FROM APP_USER WHERE USER_ID = :user_id", {'user_id': user_id})
-        appuser = cursor.fetchone()
+        appuser = fetch_one_cached(
+            'appuser', user_id, "SELECT * FROM APP_USER WHERE USER_ID = :user_id",
+            {'user_id': user_id})
 
         if appuser is None:
             return jsonify({"error": "AppUser no encontrado"}), 404
 
-        return jsonify(dict(zip([key[0] for key in cursor.description], appuser))), 200
+        return jsonify(appuser), 200
     except Exception as e:
         logger.exception("Error obteniendo AppUser")
         return jsonify({"error": str(e)}), 500
-    finally:
-        cursor.close()
-        conn.close()
 
 
 @appuser_bp.route('/appuser/<int:user_id>', methods=['PUT'])
@@ -259,6 +235,7 @@ def update_appuser(user_id):
             }
         )
         conn.commit()
+        get_cache().invalidate('appuser')
         return jsonify({"message": "AppUser actualizado exitosamente"}), 200
     except Exception as e:
         logger.exception("Error actualizando AppUser")
@@ -297,6 +274,7 @@ def delete_appuser(user_id):
         cursor.execute("DELETE FROM APP_USER WHERE USER_ID = :user_id", {
                        'user_id': user_id})
         conn.commit()
+        get_cache().invalidate('appuser')
         return jsonify({"message": "AppUser eliminado exitosamente"}), 200
     except Exception as e:
         logger.exception("Error eliminando AppUser")
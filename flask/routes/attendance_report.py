@@ -0,0 +1,492 @@
+import csv
+import io
+import json
+import logging
+import tempfile
+from datetime import date, datetime, timedelta
+
+from db_connection import get_db_connection
+from serialization import rows_to_dicts
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+logger = logging.getLogger(__name__)
+
+attendance_report_bp = Blueprint('attendance_report', __name__)
+
+# Filas que se traen de Oracle por cada viaje
+REPORT_FETCH_SIZE = 500
+MAX_PER_PAGE = 5000
+# Exportación: filas por viaje a Oracle y tamaño de los fragmentos HTTP
+EXPORT_FETCH_SIZE = 5000
+EXPORT_CHUNK_BYTES = 64 * 1024
+# Hasta este tamaño el xlsx generado se queda en memoria; después pasa a disco
+EXPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+EXPORT_QUERY = """
+    SELECT a.CLASS_SCHEDULE_ATTENDANCE_ID, a.ATTENDANCE_CODE,
+           TO_CHAR(a.REGISTER_DATE, 'YYYY-MM-DD') AS REGISTER_DATE,
+           a.PROFESSOR_ID, p.ID_CARD, p.FIRST_NAME, p.LAST_NAME,
+           cs.KNOWLEDGE_AREA, cs.SUBJECT, cs.NRC, a.TYPE,
+           TO_CHAR(a.ENTRY_TIME, 'HH24:MI:SS') AS ENTRY_TIME,
+           TO_CHAR(a.EXIT_TIME, 'HH24:MI:SS') AS EXIT_TIME,
+           a.TOTAL_HOURS, a.LATE_ENTRY, a.LATE_EXIT
+    FROM CLASS_SCHEDULE_ATTENDANCE a
+    JOIN CLASS_SCHEDULE cs ON cs.CLASS_SCHEDULE_ID = a.CLASS_SCHEDULE_ID
+    LEFT JOIN PROFESSOR p ON p.PROFESSOR_ID = a.PROFESSOR_ID
+    WHERE a.REGISTER_DATE BETWEEN :date_from AND :date_to{filters}
+    ORDER BY a.REGISTER_DATE, p.LAST_NAME, a.ENTRY_TIME
+"""
+
+# Dimensiones de agrupación: (columna en horarios programados, columna en asistencias, alias)
+DIMENSIONS = {
+    'professor': ("cs.PROFESSOR_ID", "cs.PROFESSOR_ID", "PROFESSOR_ID"),
+    'knowledge_area': ("cs.KNOWLEDGE_AREA", "cs.KNOWLEDGE_AREA", "KNOWLEDGE_AREA"),
+    'month': ("TO_CHAR(d.DAY, 'YYYY-MM')", "TO_CHAR(a.REGISTER_DATE, 'YYYY-MM')", "PERIOD"),
+}
+
+
+def build_report_query(dimensions, professor_id=None, knowledge_area=None, count=False):
+    """
+    Consulta de agregación por las dimensiones indicadas. Las clases programadas
+    salen de expandir DAYS_OF_WEEK sobre el calendario del rango; las horas,
+    atrasos y asistencias se agrupan en Oracle sobre CLASS_SCHEDULE_ATTENDANCE.
+    Con count=True solo cuenta las filas del reporte (sin :min_row ni :max_row).
+    """
+    scheduled_cols = [DIMENSIONS[d][0] for d in dimensions]
+    attended_cols = [DIMENSIONS[d][1] for d in dimensions]
+    aliases = [DIMENSIONS[d][2] for d in dimensions]
+
+    filters, binds = "", {}
+    if professor_id is not None:
+        filters += " AND cs.PROFESSOR_ID = :professor_id"
+        binds['professor_id'] = professor_id
+    if knowledge_area:
+        filters += " AND cs.KNOWLEDGE_AREA = :knowledge_area"
+        binds['knowledge_area'] = knowledge_area
+
+    def select(cols):
+        return ", ".join(f"{col} AS {alias}" for col, alias in zip(cols, aliases))
+
+    join = " AND ".join(f"s.{alias} = t.{alias}" for alias in aliases)
+    professor_join = ("LEFT JOIN PROFESSOR p ON p.PROFESSOR_ID = s.PROFESSOR_ID"
+                      if 'professor' in dimensions else "")
+    professor_cols = "p.FIRST_NAME, p.LAST_NAME, " if 'professor' in dimensions else ""
+    order = ", ".join(aliases)
+    page_query = f"""
+        SELECT * FROM (
+            SELECT r.*, ROWNUM rnum FROM (
+                SELECT * FROM report ORDER BY {order}
+            ) r WHERE ROWNUM <= :max_row
+        ) WHERE rnum >= :min_row
+    """
+
+    query = f"""
+        WITH days AS (
+            SELECT :date_from + LEVEL - 1 AS DAY FROM DUAL
+            CONNECT BY LEVEL <= :date_to - :date_from + 1
+        ),
+        scheduled AS (
+            SELECT {select(scheduled_cols)}, COUNT(*) AS SCHEDULED_CLASSES
+            FROM CLASS_SCHEDULE cs
+            JOIN days d ON INSTR(', ' || cs.DAYS_OF_WEEK || ',',
+                                 ', ' || TRIM(TO_CHAR(d.DAY, 'Day', 'NLS_DATE_LANGUAGE=ENGLISH')) || ',') > 0
+            WHERE 1 = 1{filters}
+            GROUP BY {", ".join(scheduled_cols)}
+        ),
+        attended AS (
+            SELECT {select(attended_cols)},
+                   COUNT(*) AS ATTENDED_CLASSES,
+                   SUM(NVL(a.TOTAL_HOURS, 0)) AS TOTAL_HOURS,
+                   SUM(CASE WHEN a.LATE_ENTRY = 'SI' THEN 1 ELSE 0 END) AS LATE_ENTRIES,
+                   SUM(CASE WHEN a.LATE_EXIT = 'SI' THEN 1 ELSE 0 END) AS LATE_EXITS,
+                   SUM(CASE WHEN a.EXIT_TIME IS NULL THEN 1 ELSE 0 END) AS MISSING_EXITS
+            FROM CLASS_SCHEDULE_ATTENDANCE a
+            JOIN CLASS_SCHEDULE cs ON cs.CLASS_SCHEDULE_ID = a.CLASS_SCHEDULE_ID
+            WHERE a.REGISTER_DATE BETWEEN :date_from AND :date_to{filters}
+            GROUP BY {", ".join(attended_cols)}
+        ),
+        report AS (
+            SELECT {", ".join(f"s.{alias}" for alias in aliases)}, {professor_cols}
+                   s.SCHEDULED_CLASSES,
+                   NVL(t.ATTENDED_CLASSES, 0) AS ATTENDED_CLASSES,
+                   GREATEST(s.SCHEDULED_CLASSES - NVL(t.ATTENDED_CLASSES, 0), 0) AS MISSED_CLASSES,
+                   ROUND(NVL(t.TOTAL_HOURS, 0), 2) AS TOTAL_HOURS,
+                   NVL(t.LATE_ENTRIES, 0) AS LATE_ENTRIES,
+                   NVL(t.LATE_EXITS, 0) AS LATE_EXITS,
+                   NVL(t.MISSING_EXITS, 0) AS MISSING_EXITS,
+                   ROUND(NVL(t.ATTENDED_CLASSES, 0) / s.SCHEDULED_CLASSES, 4) AS ATTENDANCE_RATE,
+                   ROUND(NVL(t.LATE_ENTRIES, 0) / NULLIF(t.ATTENDED_CLASSES, 0), 4) AS LATE_ENTRY_RATE,
+                   COUNT(*) OVER () AS TOTAL_ROWS
+            FROM scheduled s
+            LEFT JOIN attended t ON {join}
+            {professor_join}
+        )
+        {"SELECT COUNT(*) FROM report" if count else page_query}
+    """
+    return query, binds
+
+
+def parse_date(value, default):
+    if not value:
+        return default
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+@attendance_report_bp.route('/attendance_report', methods=['GET'])
+def get_attendance_report():
+    """
+    Reporte agregado de asistencia
+    ---
+    summary: Reporte de asistencia
+    description: Endpoint que agrupa en Oracle las horas, atrasos y clases asistidas frente a programadas por profesor, área de conocimiento y/o mes dentro de un rango de fechas. Los resultados se paginan y se envían a medida que se leen.
+    parameters:
+      - name: date_from
+        in: query
+        schema:
+          type: string
+          format: date
+        description: Fecha inicial (por defecto, el primer día del mes actual)
+      - name: date_to
+        in: query
+        schema:
+          type: string
+          format: date
+        description: Fecha final (por defecto, hoy)
+      - name: group_by
+        in: query
+        schema:
+          type: string
+        description: Dimensiones separadas por comas (professor, knowledge_area, month)
+      - name: professor_id
+        in: query
+        schema:
+          type: integer
+      - name: knowledge_area
+        in: query
+        schema:
+          type: string
+      - name: page
+        in: query
+        schema:
+          type: integer
+      - name: per_page
+        in: query
+        schema:
+          type: integer
+    responses:
+      200:
+        description: Reporte generado exitosamente
+        content:
+          application/json:
+            schema: AttendanceReportResponseSchema
+      400:
+        description: Error en los parámetros proporcionados
+      500:
+        description: Error interno del servidor
+    """
+    try:
+        today = date.today()
+        date_from = parse_date(request.args.get('date_from'), today.replace(day=1))
+        date_to = parse_date(request.args.get('date_to'), today)
+    except ValueError:
+        return jsonify({"error": "Las fechas deben tener el formato YYYY-MM-DD"}), 400
+    if date_from > date_to:
+        return jsonify({"error": "date_from debe ser anterior o igual a date_to"}), 400
+
+    dimensions = list(dict.fromkeys(
+        d.strip() for d in request.args.get('group_by', 'professor').split(',') if d.strip()))
+    unknown = [d for d in dimensions if d not in DIMENSIONS]
+    if not dimensions or unknown:
+        return jsonify({"error": f"Dimensiones no válidas: {unknown or dimensions}. "
+                                 f"Use {', '.join(DIMENSIONS)}"}), 400
+
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 100, type=int), 1), MAX_PER_PAGE)
+
+    filters = (request.args.get('professor_id', type=int), request.args.get('knowledge_area'))
+    query, binds = build_report_query(dimensions, *filters)
+    binds.update({
+        'date_from': date_from,
+        'date_to': date_to,
+        'min_row': (page - 1) * per_page + 1,
+        'max_row': page * per_page,
+    })
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.arraysize = REPORT_FETCH_SIZE
+    try:
+        cursor.execute(query, binds)
+    except Exception as e:
+        logger.error(f"Error al generar el reporte de asistencia: {e}")
+        cursor.close()
+        conn.close()
+        return jsonify({"error": "Ocurrió un error al generar el reporte de asistencia"}), 500
+
+    columns = [col[0] for col in cursor.description]
+    total_index, rnum_index = columns.index('TOTAL_ROWS'), columns.index('RNUM')
+    keep = [i for i in range(len(columns)) if i not in (total_index, rnum_index)]
+
+    def generate():
+        total = 0
+        try:
+            yield json.dumps({
+                'date_from': date_from.isoformat(),
+                'date_to': date_to.isoformat(),
+                'group_by': dimensions,
+                'page': page,
+                'per_page': per_page,
+            })[:-1] + ', "items": ['
+            first = True
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                total = rows[0][total_index]
+                for row in rows:
+                    item = json.dumps({columns[i]: row[i] for i in keep})
+                    yield item if first else ',' + item
+                    first = False
+            if first and page > 1:
+                # Página después de la última: TOTAL_ROWS no llegó en ninguna fila
+                count_query, count_binds = build_report_query(dimensions, *filters, count=True)
+                count_binds.update({'date_from': date_from, 'date_to': date_to})
+                cursor.execute(count_query, count_binds)
+                total = cursor.fetchone()[0]
+            yield f'], "total": {total}, "pages": {-(-total // per_page)}}}'
+        except Exception as e:
+            logger.error(f"Error al leer el reporte de asistencia: {e}")
+            yield '], "error": "Ocurrió un error al leer el reporte de asistencia"}'
+        finally:
+            cursor.close()
+            conn.close()
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+
+def fetch_batches(cursor):
+    while True:
+        rows = cursor.fetchmany()
+        if not rows:
+            break
+        yield rows
+
+
+def stream_csv(columns, cursor):
+    """
+    CSV en UTF-8 (con BOM para Excel), un fragmento por lote de filas de Oracle.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(columns)
+    for rows in fetch_batches(cursor):
+        writer.writerows(rows)
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def stream_xlsx(columns, cursor):
+    """
+    XLSX con openpyxl en modo write_only (las filas van a disco, no a memoria);
+    el archivo se envía por fragmentos cuando termina de escribirse.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Asistencia')
+    sheet.append(columns)
+    for rows in fetch_batches(cursor):
+        for row in rows:
+            sheet.append(row)
+
+    with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES) as output:
+        workbook.save(output)
+        output.seek(0)
+        while True:
+            chunk = output.read(EXPORT_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv; charset=utf-8'),
+    'xlsx': (stream_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+
+@attendance_report_bp.route('/attendance_report/export', methods=['GET'])
+def export_attendance():
+    """
+    Exportar registros de asistencia
+    ---
+    summary: Exportar asistencia
+    description: Endpoint que exporta los registros de CLASS_SCHEDULE_ATTENDANCE de un rango de fechas a CSV o XLSX. Las filas se leen de Oracle por lotes y se escriben en una respuesta por fragmentos, con memoria constante.
+    parameters:
+      - name: format
+        in: query
+        schema:
+          type: string
+          enum: [csv, xlsx]
+      - name: date_from
+        in: query
+        schema:
+          type: string
+          format: date
+      - name: date_to
+        in: query
+        schema:
+          type: string
+          format: date
+      - name: professor_id
+        in: query
+        schema:
+          type: integer
+      - name: knowledge_area
+        in: query
+        schema:
+          type: string
+    responses:
+      200:
+        description: Archivo de asistencia
+      400:
+        description: Error en los parámetros proporcionados
+      500:
+        description: Error interno del servidor
+    """
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": "El formato debe ser csv o xlsx"}), 400
+
+    try:
+        today = date.today()
+        date_from = parse_date(request.args.get('date_from'), today.replace(day=1))
+        date_to = parse_date(request.args.get('date_to'), today)
+    except ValueError:
+        return jsonify({"error": "Las fechas deben tener el formato YYYY-MM-DD"}), 400
+    if date_from > date_to:
+        return jsonify({"error": "date_from debe ser anterior o igual a date_to"}), 400
+
+    filters, binds = "", {'date_from': date_from, 'date_to': date_to}
+    professor_id = request.args.get('professor_id', type=int)
+    if professor_id is not None:
+        filters += " AND a.PROFESSOR_ID = :professor_id"
+        binds['professor_id'] = professor_id
+    if request.args.get('knowledge_area'):
+        filters += " AND cs.KNOWLEDGE_AREA = :knowledge_area"
+        binds['knowledge_area'] = request.args['knowledge_area']
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.arraysize = EXPORT_FETCH_SIZE
+    cursor.prefetchrows = EXPORT_FETCH_SIZE + 1
+    try:
+        cursor.execute(EXPORT_QUERY.format(filters=filters), binds)
+    except Exception as e:
+        logger.error(f"Error al exportar la asistencia: {e}")
+        cursor.close()
+        conn.close()
+        return jsonify({"error": "Ocurrió un error al exportar la asistencia"}), 500
+
+    columns = [col[0] for col in cursor.description]
+    writer, mimetype = EXPORT_FORMATS[export_format]
+
+    def generate():
+        try:
+            yield from writer(columns, cursor)
+        except Exception as e:
+            # Relanzar para que la respuesta por partes se corte y el cliente vea
+            # la transferencia incompleta en lugar de un archivo truncado con 200
+            logger.error(f"Error al exportar la asistencia: {e}")
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    filename = f"asistencia_{date_from.isoformat()}_{date_to.isoformat()}.{export_format}"
+    return Response(stream_with_context(generate()), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+
+@attendance_report_bp.route('/attendance_report/daily', methods=['GET'])
+def get_daily_summary():
+    """
+    Resumen diario de asistencia
+    ---
+    summary: Resumen diario de asistencia
+    description: Endpoint que lee ATTENDANCE_DAILY_SUMMARY (una fila por profesor y día, mantenida al registrar cada asistencia) sin recorrer CLASS_SCHEDULE_ATTENDANCE.
+    parameters:
+      - name: date_from
+        in: query
+        schema:
+          type: string
+          format: date
+      - name: date_to
+        in: query
+        schema:
+          type: string
+          format: date
+      - name: professor_id
+        in: query
+        schema:
+          type: integer
+    responses:
+      200:
+        description: Resumen obtenido exitosamente
+        content:
+          application/json:
+            schema: DailySummaryResponseSchema
+      400:
+        description: Error en los parámetros proporcionados
+      500:
+        description: Error interno del servidor
+    """
+    try:
+        today = date.today()
+        date_from = parse_date(request.args.get('date_from'), today - timedelta(days=today.weekday()))
+        date_to = parse_date(request.args.get('date_to'), today)
+    except ValueError:
+        return jsonify({"error": "Las fechas deben tener el formato YYYY-MM-DD"}), 400
+    if date_from > date_to:
+        return jsonify({"error": "date_from debe ser anterior o igual a date_to"}), 400
+
+    query = """
+        SELECT PROFESSOR_ID, TO_CHAR(SUMMARY_DATE, 'YYYY-MM-DD') AS SUMMARY_DATE,
+               SCHEDULED_CLASSES, SCHEDULED_HOURS, ATTENDED_CLASSES, ATTENDED_HOURS,
+               LATE_ENTRIES, LATE_EXITS, MISSING_EXITS
+        FROM ATTENDANCE_DAILY_SUMMARY
+        WHERE SUMMARY_DATE BETWEEN :date_from AND :date_to
+    """
+    binds = {'date_from': date_from, 'date_to': date_to}
+    professor_id = request.args.get('professor_id', type=int)
+    if professor_id is not None:
+        query += " AND PROFESSOR_ID = :professor_id"
+        binds['professor_id'] = professor_id
+    query += " ORDER BY SUMMARY_DATE, PROFESSOR_ID"
+
+    cursor = None
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.arraysize = REPORT_FETCH_SIZE
+        cursor.execute(query, binds)
+        items = rows_to_dicts(cursor, cursor.fetchall())
+        return jsonify({
+            'date_from': date_from.isoformat(),
+            'date_to': date_to.isoformat(),
+            'items': items,
+        }), 200
+    except Exception as e:
+        logger.error(f"Error al obtener el resumen diario: {e}")
+        return jsonify({"error": "Ocurrió un error al obtener el resumen diario"}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
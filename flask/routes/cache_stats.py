@@ -0,0 +1,23 @@
+import logging
+
+from cache import get_cache
+
+from flask import Blueprint, jsonify
+
+logger = logging.getLogger(__name__)
+
+cache_stats_bp = Blueprint('cache_stats', __name__)
+
+
+@cache_stats_bp.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """
+    Estadísticas de la caché de consultas
+    ---
+    summary: Estadísticas de la caché
+    description: Aciertos, fallos, invalidaciones y tasa de aciertos de la caché de roles, horarios de trabajo, usuarios y profesores.
+    responses:
+      200:
+        description: Estadísticas de la caché
+    """
+    return jsonify(get_cache().snapshot()), 200
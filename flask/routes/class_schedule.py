@@ -1,11 +1,12 @@
 import logging
 from datetime import datetime
 
-import cx_Oracle
 import numpy as np
 import pandas as pd
 import pytz
-from db_connection import get_db_connection
+from db_connection import IntegrityError, get_db_connection
+from http_cache import conditional_get, table_version
+from serialization import rows_to_dicts
 
 from flask import Blueprint, jsonify, request
 
@@ -210,7 +211,7 @@ def upload_class_schedule():
                         "days_of_week": days_of_week
                     })
                     connection.commit()
-                except cx_Oracle.IntegrityError as e:
+                except IntegrityError as e:
                     error_code = e.args[0].code
                     if error_code == 1:
                         error_message = f"Duplicate schedule detected for row {index}. The following data caused the conflict: {row.to_dict()}"
@@ -335,7 +336,7 @@ def create_class_schedule():
             logger.info("Class schedule created successfully.")
             return jsonify({"message": "Class schedule created successfully"}), 201
 
-        except cx_Oracle.IntegrityError as e:
+        except IntegrityError as e:
             error_code = e.args[0].code
             if error_code == 1:
                 error_message = "Duplicate schedule detected. The following data caused the conflict: {}".format(
@@ -360,7 +361,19 @@ def create_class_schedule():
             connection.close()
 
 
+def class_schedules_version(professor_id):
+    """
+    Versión de los horarios del profesor; incluye el día porque la respuesta
+    solo trae las clases del día actual en Ecuador.
+    """
+    today = datetime.now(pytz.timezone('America/Guayaquil')).date()
+    rows = table_version('CLASS_SCHEDULE', "PROFESSOR_ID = :professor_id",
+                         {'professor_id': professor_id})
+    return f"{today.isoformat()}:{rows}"
+
+
 @class_schedule_bp.route('/class-schedules/<int:professor_id>', methods=['GET'])
+@conditional_get(version=class_schedules_version)
 def get_class_schedules(professor_id):
     """
     Obtener horarios de clase por ID de profesor
@@ -411,12 +424,8 @@ def get_class_schedules(professor_id):
         if not class_schedules:
             return jsonify({"message": "No se encontraron horarios de clase para el profesor en el día actual."}), 404
 
-        # Obtener los nombres de las columnas para estructurar la respuesta
-        column_names = [desc[0] for desc in cursor.description]
-
         # Construir la respuesta como una lista de diccionarios
-        result = [dict(zip(column_names, schedule))
-                  for schedule in class_schedules]
+        result = rows_to_dicts(cursor, class_schedules)
 
         return jsonify(result), 200
 
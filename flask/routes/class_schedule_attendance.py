@@ -1,7 +1,9 @@
 import logging
 from datetime import datetime, timedelta
 
+from attendance_summary import DAILY_SUMMARY_REFRESH, refresh_daily_summary
 from db_connection import get_db_connection
+from metrics import stage
 
 from flask import Blueprint, jsonify, request
 
@@ -100,13 +102,15 @@ def register_attendance():
         time = datetime.strptime(data['TIME'], '%Y-%m-%dT%H:%M:%S.%fZ')
 
         # Obtener la conexión a la base de datos
-        conn = get_db_connection()
-        cur = conn.cursor()
+        with stage('db_connect'):
+            conn = get_db_connection()
+            cur = conn.cursor()
 
         # Verificar si existe el CLASS_SCHEDULE_ID y obtener detalles
-        cur.execute("SELECT * FROM CLASS_SCHEDULE WHERE CLASS_SCHEDULE_ID = :1",
-                    (data['CLASS_SCHEDULE_ID'],))
-        class_schedule = cur.fetchone()
+        with stage('db'):
+            cur.execute("SELECT * FROM CLASS_SCHEDULE WHERE CLASS_SCHEDULE_ID = :1",
+                        (data['CLASS_SCHEDULE_ID'],))
+            class_schedule = cur.fetchone()
 
         if not class_schedule:
             return jsonify({'error': "El CLASS_SCHEDULE_ID proporcionado no existe"}), 404
@@ -126,11 +130,12 @@ def register_attendance():
             data['CLASS_SCHEDULE_ID'], data['PROFESSOR_ID'], register_date)
 
         # Verificar si ya existe un registro de asistencia para esa clase y día
-        cur.execute("""
-            SELECT ENTRY_TIME, EXIT_TIME FROM CLASS_SCHEDULE_ATTENDANCE 
-            WHERE CLASS_SCHEDULE_ID = :1 AND PROFESSOR_ID = :2 AND REGISTER_DATE = :3
-        """, (data['CLASS_SCHEDULE_ID'], data['PROFESSOR_ID'], register_date))
-        existing_attendance = cur.fetchone()
+        with stage('db'):
+            cur.execute("""
+                SELECT ENTRY_TIME, EXIT_TIME FROM CLASS_SCHEDULE_ATTENDANCE 
+                WHERE CLASS_SCHEDULE_ID = :1 AND PROFESSOR_ID = :2 AND REGISTER_DATE = :3
+            """, (data['CLASS_SCHEDULE_ID'], data['PROFESSOR_ID'], register_date))
+            existing_attendance = cur.fetchone()
 
         if existing_attendance:
             if existing_attendance[1]:  # EXIT_TIME ya registrado
@@ -145,24 +150,36 @@ def register_attendance():
             class_end_time = extract_time_from_datetime(class_schedule[15])
             late_exit = "SI" if time.time() > class_end_time else "NO"
 
-            cur.execute("""
-                UPDATE CLASS_SCHEDULE_ATTENDANCE
-                SET EXIT_TIME = :1, TOTAL_HOURS = :2, LATE_EXIT = :3, REGISTER_EXIT = :4
-                WHERE CLASS_SCHEDULE_ID = :5 AND PROFESSOR_ID = :6 AND REGISTER_DATE = :7
-            """, (time, total_hours, late_exit, "SI", data['CLASS_SCHEDULE_ID'], data['PROFESSOR_ID'], register_date))
+            with stage('db'):
+                cur.execute("""
+                    UPDATE CLASS_SCHEDULE_ATTENDANCE
+                    SET EXIT_TIME = :1, TOTAL_HOURS = :2, LATE_EXIT = :3, REGISTER_EXIT = :4
+                    WHERE CLASS_SCHEDULE_ID = :5 AND PROFESSOR_ID = :6 AND REGISTER_DATE = :7
+                """, (time, total_hours, late_exit, "SI", data['CLASS_SCHEDULE_ID'], data['PROFESSOR_ID'], register_date))
             message = f"Salida registrada para la clase '{class_schedule[5]}' - NRC: {int(float(class_schedule[6]))}"
 
         else:
             # Es la entrada, registrar nuevo con TOTAL_HOURS = 0
-            cur.execute("""
-                INSERT INTO CLASS_SCHEDULE_ATTENDANCE (CLASS_SCHEDULE_ID, PROFESSOR_ID, REGISTER_DATE, ENTRY_TIME, ATTENDANCE_CODE, TOTAL_HOURS, TYPE, REGISTER_ENTRY, REGISTER_EXIT, LATE_ENTRY)
-                VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :9, :10)
-            """, (data['CLASS_SCHEDULE_ID'], data['PROFESSOR_ID'], register_date, time, attendance_code, 0,
-                  class_schedule[11],  # TYPE del CLASS_SCHEDULE
-                  "SI", "NO", late_entry))
+            with stage('db'):
+                cur.execute("""
+                    INSERT INTO CLASS_SCHEDULE_ATTENDANCE (CLASS_SCHEDULE_ID, PROFESSOR_ID, REGISTER_DATE, ENTRY_TIME, ATTENDANCE_CODE, TOTAL_HOURS, TYPE, REGISTER_ENTRY, REGISTER_EXIT, LATE_ENTRY)
+                    VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :9, :10)
+                """, (data['CLASS_SCHEDULE_ID'], data['PROFESSOR_ID'], register_date, time, attendance_code, 0,
+                      class_schedule[11],  # TYPE del CLASS_SCHEDULE
+                      "SI", "NO", late_entry))
             message = f"Entrada registrada para la clase '{class_schedule[5]}' - NRC: {int(float(class_schedule[6]))}"
 
-        conn.commit()
+        # Mantener el resumen diario del profesor en la misma transacción. Es una
+        # tabla derivada: si falla solo se deshace el MERGE y la asistencia se registra
+        if DAILY_SUMMARY_REFRESH:
+            try:
+                with stage('summary'):
+                    refresh_daily_summary(cur, data['PROFESSOR_ID'], register_date)
+            except Exception as e:
+                logger.error(f"Error al actualizar el resumen diario: {e}")
+
+        with stage('db'):
+            conn.commit()
         return jsonify({'message': message}), 201
 
     except Exception as e:
@@ -1,16 +1,36 @@
+import io
 import json
 import logging
+import os
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 
 import cv2
 import numpy as np
-from db_connection import get_db_connection
-from deepface import DeepFace
+from db_connection import LONG_BINARY, LONG_STRING, DatabaseError, get_db_connection
+from gallery import DEEPFACE_DB_PATH, IMAGE_EXTENSIONS
+from metrics import stage
+from model_server import run_inference, share_frame
+from utils import clean_filename
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 
 logger = logging.getLogger(__name__)
 embedding_bp = Blueprint('create_embedding', __name__)
 
+# Imágenes que se decodifican, embeben e insertan juntas en la inscripción masiva
+BULK_BATCH_SIZE = int(os.environ.get('BULK_BATCH_SIZE', 32))
+BULK_DECODE_THREADS = int(os.environ.get('BULK_DECODE_THREADS', 4))
+# Sufijo de las imágenes copiadas que aún no están en el índice (la sincronización
+# de la galería las ignora hasta que se renombran)
+PENDING_SUFFIX = '.pending'
+
+INSERT_FACE_SQL = """
+INSERT INTO Rostros (MaestroID, ImagenRostro, Caracteristicas)
+VALUES (:maestro_id, :image_blob, :embedding_str)
+"""
+
 
 def insert_face_data(maestro_id, image_blob, embedding_str):
     """
@@ -22,17 +42,12 @@ def insert_face_data(maestro_id, image_blob, embedding_str):
         connection = get_db_connection()
         cursor = connection.cursor()
 
-        # Preparar la consulta de inserción
-        sql = """
-        INSERT INTO Rostros (MaestroID, ImagenRostro, Caracteristicas)
-        VALUES (:maestro_id, :image_blob, :embedding_str)
-        """
-        cursor.execute(sql, [maestro_id, image_blob, embedding_str])
+        cursor.execute(INSERT_FACE_SQL, [maestro_id, image_blob, embedding_str])
 
         # Confirmar la transacción
         connection.commit()
         print("Datos insertados correctamente.")
-    except cx_Oracle.DatabaseError as e:
+    except DatabaseError as e:
         print(f"Error al insertar datos en la base de datos: {e}")
         if connection:
             connection.rollback()
@@ -78,8 +93,9 @@ def create_embedding():
             logger.error("El archivo de imagen está vacío.")
             return jsonify({"error": "El archivo de imagen está vacío."}), 400
 
-        np_img = np.frombuffer(file, np.uint8)
-        img = cv2.imdecode(np_img, cv2.IMREAD_COLOR)
+        with stage('decode'):
+            np_img = np.frombuffer(file, np.uint8)
+            img = cv2.imdecode(np_img, cv2.IMREAD_COLOR)
 
         if img is None:
             logger.error(
@@ -93,8 +109,8 @@ def create_embedding():
             return jsonify({"error": "El ID del maestro es requerido."}), 400
 
         # Generar el embedding usando "Facenet512"
-        embedding_objs = DeepFace.represent(
-            img_path=img, model_name="Facenet512")
+        with stage('embed'):
+            embedding_objs = run_inference('represent', share_frame(img))
         if not embedding_objs:
             logger.error("No se pudo generar el embedding del rostro.")
             return jsonify({"error": "No se pudo generar el embedding del rostro."}), 500
@@ -102,7 +118,8 @@ def create_embedding():
         embedding = embedding_objs[0]['embedding']
         embedding_str = json.dumps(embedding)
 
-        insert_face_data(maestro_id, file, embedding_str)
+        with stage('db'):
+            insert_face_data(maestro_id, file, embedding_str)
 
         response = {"message": "Embedding creado y almacenado con éxito."}
         return jsonify(response), 200
@@ -110,3 +127,189 @@ def create_embedding():
     except Exception as e:
         logger.exception(f"Error en /create_embedding: {str(e)}")
         return jsonify({"error": "Ocurrió un error interno en el servidor."}), 500
+
+
+def insert_face_batch(cursor, rows):
+    """
+    Inserta varias filas (maestro_id, imagen, embedding) en Rostros con un solo
+    executemany. Devuelve {posición en rows: mensaje de error} de las filas rechazadas.
+    """
+    cursor.setinputsizes(None, LONG_BINARY, LONG_STRING)
+    cursor.executemany(INSERT_FACE_SQL, rows, batcherrors=True)
+    return {error.offset: error.message for error in cursor.getbatcherrors()}
+
+
+def read_bulk_items():
+    """
+    Pares (maestro_id, imagen) de la solicitud: un zip con una carpeta por maestro
+    (archive) o listas paralelas de archivos image y campos maestro_id.
+    """
+    if 'archive' in request.files:
+        archive = zipfile.ZipFile(io.BytesIO(request.files['archive'].read()))
+        items = []
+        for name in sorted(archive.namelist()):
+            parts = name.strip('/').split('/')
+            if len(parts) < 2 or not name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            items.append({'maestro_id': parts[-2], 'filename': parts[-1],
+                          'load': lambda name=name: archive.read(name)})
+        return items
+
+    files = request.files.getlist('image')
+    maestro_ids = request.form.getlist('maestro_id')
+    if len(maestro_ids) == 1:
+        maestro_ids = maestro_ids * len(files)
+    if len(maestro_ids) != len(files):
+        raise ValueError("Se requiere un maestro_id por imagen (o uno para todas).")
+    items = [{'maestro_id': m, 'filename': f.filename or f"imagen_{i}.jpg", 'load': f.read}
+             for i, (m, f) in enumerate(zip(maestro_ids, files))]
+    # La sincronización de la galería solo considera estas extensiones
+    invalid = [item['filename'] for item in items if not item['filename'].lower().endswith(IMAGE_EXTENSIONS)]
+    if invalid:
+        raise ValueError(f"Extensión de imagen no válida ({', '.join(IMAGE_EXTENSIONS)}): {', '.join(invalid)}")
+    return items
+
+
+def decode_item(data):
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR) if data else None
+
+
+def save_gallery_image(maestro_id, index, filename, data):
+    """
+    Copia la imagen a la carpeta del maestro en la base de rostros con
+    PENDING_SUFFIX y devuelve la ruta definitiva (ver publish_gallery_images).
+    El nombre es único por elemento (<índice>_<uuid>.<ext>): dos imágenes con
+    el mismo nombre de archivo no se pisan.
+    """
+    directory = os.path.join(DEEPFACE_DB_PATH, clean_filename(str(maestro_id)))
+    os.makedirs(directory, exist_ok=True)
+    extension = os.path.splitext(filename)[1].lower()
+    path = os.path.join(directory, f"{index}_{uuid.uuid4().hex}{extension}")
+    with open(path + PENDING_SUFFIX, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def publish_gallery_images(paths):
+    """
+    Da a las imágenes copiadas su nombre definitivo. Se llama después de
+    agregarlas al índice para que la sincronización de la galería no las vuelva
+    a embeber una por una.
+    """
+    for path in paths:
+        if os.path.exists(path + PENDING_SUFFIX):
+            os.replace(path + PENDING_SUFFIX, path)
+
+
+def enroll_batch(batch, pool, cursor, connection):
+    """
+    Decodifica, embebe e inserta un lote; devuelve los resultados por elemento y
+    las (rutas, embeddings) a agregar a la galería.
+    """
+    payloads = [item['load']() for item in batch]
+    with stage('decode'):
+        images = list(pool.map(decode_item, payloads))
+    results = [{'index': item['index'], 'maestro_id': item['maestro_id'],
+                'filename': item['filename'], 'status': 'ok'} for item in batch]
+
+    decoded = [i for i, img in enumerate(images) if img is not None]
+    for i in set(range(len(batch))) - set(decoded):
+        results[i].update(status='error', error="No se pudo decodificar la imagen.")
+
+    # Las imágenes viajan en el mensaje: el lote supera los espacios del anillo compartido
+    with stage('embed'):
+        embeddings = run_inference('embed_batch', [images[i] for i in decoded]) if decoded else []
+    rows, row_items, item_embeddings = [], [], dict(zip(decoded, embeddings))
+    for i, embedding in item_embeddings.items():
+        if embedding is None:
+            results[i].update(status='error', error="No se encontró un rostro en la imagen.")
+            continue
+        rows.append([batch[i]['maestro_id'], payloads[i], json.dumps(np.asarray(embedding).tolist())])
+        row_items.append(i)
+
+    with stage('db'):
+        errors = insert_face_batch(cursor, rows) if rows else {}
+        connection.commit()
+
+    gallery_paths, gallery_embeddings = [], []
+    for offset, i in enumerate(row_items):
+        if offset in errors:
+            results[i].update(status='error', error=errors[offset])
+            continue
+        gallery_paths.append(save_gallery_image(batch[i]['maestro_id'], batch[i]['index'],
+                                                batch[i]['filename'], payloads[i]))
+        gallery_embeddings.append(item_embeddings[i])
+    return results, gallery_paths, gallery_embeddings
+
+
+@embedding_bp.route('/create_embedding/bulk', methods=['POST'])
+def create_embeddings_bulk():
+    """
+    Inscripción masiva de rostros
+    ---
+    summary: Crear embeddings en lote
+    description: Endpoint para inscribir muchas imágenes de uno o varios maestros en una sola solicitud (zip con una carpeta por maestro o archivos multipart). Devuelve un resultado por imagen en formato NDJSON a medida que se procesan los lotes.
+    requestBody:
+      required: true
+      content:
+        multipart/form-data:
+          schema: BulkEmbeddingSchema
+    responses:
+      200:
+        description: Resultados por imagen (application/x-ndjson)
+      400:
+        description: Error en los datos proporcionados
+      500:
+        description: Error interno del servidor
+    """
+    try:
+        items = read_bulk_items()
+    except (ValueError, zipfile.BadZipFile) as e:
+        logger.error(f"Solicitud de inscripción masiva inválida: {str(e)}")
+        return jsonify({"error": str(e)}), 400
+
+    if not items:
+        logger.error("No se proporcionaron imágenes para la inscripción masiva.")
+        return jsonify({"error": "No se proporcionaron imágenes."}), 400
+    for index, item in enumerate(items):
+        item['index'] = index
+
+    def generate():
+        connection = None
+        cursor = None
+        summary = {'total': len(items), 'ok': 0, 'error': 0, 'gallery_added': 0}
+        gallery_paths, gallery_embeddings = [], []
+        try:
+            connection = get_db_connection()
+            cursor = connection.cursor()
+            with ThreadPoolExecutor(max_workers=BULK_DECODE_THREADS) as pool:
+                for start in range(0, len(items), BULK_BATCH_SIZE):
+                    results, paths, embeddings = enroll_batch(
+                        items[start:start + BULK_BATCH_SIZE], pool, cursor, connection)
+                    gallery_paths.extend(paths)
+                    gallery_embeddings.extend(embeddings)
+                    for result in results:
+                        summary[result['status']] += 1
+                        yield json.dumps(result) + "\n"
+
+            # Actualizar el índice de reconocimiento una sola vez
+            if gallery_paths:
+                with stage('enroll'):
+                    summary['gallery_added'] = run_inference(
+                        'enroll', gallery_embeddings, gallery_paths)
+        except Exception as e:
+            logger.exception(f"Error en /create_embedding/bulk: {str(e)}")
+            if connection:
+                connection.rollback()
+            summary['error_message'] = "Ocurrió un error interno en el servidor."
+        finally:
+            # Si el índice no se actualizó, la próxima sincronización las agrega
+            publish_gallery_images(gallery_paths)
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+        logger.info(f"/create_embedding/bulk: {summary}")
+        yield json.dumps({'summary': summary}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
@@ -1,9 +1,12 @@
 import logging
-import os
 
 import cv2
-import numpy as np
-from ultralytics import YOLO
+from box_ops import merge_frames, select_faces
+from detectors import get_detector
+from image_ops import DETECT_INPUT_SIZE, decode_image
+from metrics import stage
+from model_server import is_remote
+from recognition import detect_boxes
 
 from flask import Blueprint, jsonify, request
 
@@ -13,19 +16,13 @@ logger = logging.getLogger(__name__)
 # Configurar el blueprint
 detect_bp = Blueprint('detect', __name__)
 
-# Ruta del modelo YOLOv8
-YOLO_MODEL_PATH = '/app/yolov8l-face-lindevs.pt'
 MIN_CONFIDENCE = 0.8
+# IoU a partir del cual dos cajas de fotogramas distintos son el mismo rostro
+NMS_IOU_THRESHOLD = 0.5
 
-# Verificar si el modelo existe
-if not os.path.exists(YOLO_MODEL_PATH):
-    logger.error(
-        f"El modelo YOLO no se encontró en la ruta: {YOLO_MODEL_PATH}")
-    raise FileNotFoundError(
-        f"El modelo YOLO no se encontró en la ruta: {YOLO_MODEL_PATH}")
-
-# Cargar el modelo YOLOv8
-model = YOLO(YOLO_MODEL_PATH)
+# Sin servidor de modelos, cargar el detector en este proceso al importar el blueprint
+if not is_remote():
+    get_detector()
 
 
 @detect_bp.route('/detect', methods=['POST'])
@@ -34,7 +31,7 @@ def detect_faces():
     Detectar rostros en una imagen
     ---
     summary: Detectar rostros
-    description: Endpoint para detectar rostros en una imagen.
+    description: Endpoint para detectar rostros en una imagen o en una ráfaga de imágenes de la misma cámara.
     requestBody:
       required: true
       content:
@@ -58,61 +55,75 @@ def detect_faces():
                 "No se proporcionó ningún archivo de imagen en la solicitud.")
             return jsonify({"error": "No se proporcionó ningún archivo de imagen."}), 400
 
-        file = request.files['image'].read()
-        if not file:
+        # Una o varias imágenes (ráfaga de fotogramas de la misma cámara)
+        files = [f.read() for f in request.files.getlist('image')]
+        if not all(files):
             logger.error("El archivo de imagen está vacío.")
             return jsonify({"error": "El archivo de imagen está vacío."}), 400
 
-        np_img = np.frombuffer(file, np.uint8)
-        img = cv2.imdecode(np_img, cv2.IMREAD_COLOR)
-
-        if img is None:
-            logger.error(
-                "No se pudo decodificar la imagen. Asegúrate de que el archivo sea una imagen válida.")
-            return jsonify({"error": "No se pudo decodificar la imagen."}), 400
-
-        # Leer el parámetro opcional save_image
+        # Leer los parámetros opcionales
         save_image = request.form.get('save_image', 'false').lower() == 'true'
-
-        # Detección de rostros con YOLO
-        results = model(img)
-
-        if not results or not results[0].boxes:
+        compact = request.form.get('compact', 'false').lower() == 'true'
+        try:
+            max_faces = int(request.form.get('max_faces', 1))
+            min_face_size = float(request.form.get('min_face_size', 0))
+        except ValueError:
+            return jsonify({"error": "max_faces y min_face_size deben ser numéricos."}), 400
+        if max_faces < 0:
+            return jsonify({"error": "max_faces debe ser mayor o igual a 0."}), 400
+
+        boxes_per_frame = []
+        for index, file in enumerate(files):
+            # Decodificar a resolución reducida si la imagen es mucho mayor que la entrada de YOLO
+            with stage('decode'):
+                img, scale = decode_image(file, DETECT_INPUT_SIZE)
+
+            if img is None:
+                logger.error(
+                    "No se pudo decodificar la imagen. Asegúrate de que el archivo sea una imagen válida.")
+                return jsonify({"error": "No se pudo decodificar la imagen."}), 400
+            if index == 0:
+                first_img, first_scale = img, scale
+
+            # Detección de rostros con YOLO, con las cajas en la resolución original
+            with stage('detect'):
+                boxes_per_frame.append(detect_boxes(img, scale))
+
+        # Filtrar, ordenar y (con varios fotogramas) fusionar las cajas sin bucles en Python
+        boxes = boxes_per_frame[0] if len(boxes_per_frame) == 1 else merge_frames(
+            boxes_per_frame, NMS_IOU_THRESHOLD)
+        boxes = select_faces(boxes, MIN_CONFIDENCE, max_faces, min_face_size)
+
+        if len(boxes) == 0:
             logger.info("No se detectaron rostros en la imagen.")
             return jsonify({"faces": []}), 200
 
-        # Extraer el rostro con la mayor confianza por encima del umbral
-        best_face = None
-        max_confidence = MIN_CONFIDENCE
-
-        for result in results[0].boxes.data.cpu().numpy():
-            x1, y1, x2, y2, conf, cls = result
-            if conf > max_confidence:
-                max_confidence = conf
-                best_face = {
-                    'x1': int(max(x1, 0)),
-                    'y1': int(max(y1, 0)),
-                    'x2': int(min(x2, img.shape[1] - 1)),
-                    'y2': int(min(y2, img.shape[0] - 1)),
-                    'confidence': float(conf),
-                    'class': int(cls)
-                }
-
-        response = {"faces": [best_face]} if best_face else {"faces": []}
-
-        if best_face and save_image:
-            # Dibujar un rectángulo alrededor del rostro en la imagen original
-            x1, y1, x2, y2 = best_face['x1'], best_face['y1'], best_face['x2'], best_face['y2']
-            cv2.rectangle(img, (x1, y1), (x2, y2), (0, 255, 0), 2)
-
-            # Opcional: Dibujar puntos clave en el rostro (si los tienes)
-            # Ejemplo de puntos clave ficticios
-            landmarks = [(int(x1 + (x2 - x1) * 0.3), int(y1 + (y2 - y1) * 0.3)),
-                         (int(x1 + (x2 - x1) * 0.7), int(y1 + (y2 - y1) * 0.3)),
-                         (int(x1 + (x2 - x1) * 0.5), int(y1 + (y2 - y1) * 0.6))]
-
-            for point in landmarks:
-                cv2.circle(img, point, 5, (0, 0, 255), -1)
+        coords = boxes[:, :4].astype(int).tolist()
+        confidences = boxes[:, 4].round(4).tolist()
+        if compact:
+            faces = [c + [conf] for c, conf in zip(coords, confidences)]
+        else:
+            classes = boxes[:, 5].astype(int).tolist()
+            faces = [{'x1': c[0], 'y1': c[1], 'x2': c[2], 'y2': c[3],
+                      'confidence': conf, 'class': cls}
+                     for c, conf, cls in zip(coords, confidences, classes)]
+
+        response = {"faces": faces}
+
+        if save_image:
+            # Dibujar los rostros fusionados sobre el primer fotograma de la ráfaga
+            img = first_img
+            for x1, y1, x2, y2 in (boxes[:, :4] / first_scale).astype(int).tolist():
+                cv2.rectangle(img, (x1, y1), (x2, y2), (0, 255, 0), 2)
+
+                # Opcional: Dibujar puntos clave en el rostro (si los tienes)
+                # Ejemplo de puntos clave ficticios
+                landmarks = [(int(x1 + (x2 - x1) * 0.3), int(y1 + (y2 - y1) * 0.3)),
+                             (int(x1 + (x2 - x1) * 0.7), int(y1 + (y2 - y1) * 0.3)),
+                             (int(x1 + (x2 - x1) * 0.5), int(y1 + (y2 - y1) * 0.6))]
+
+                for point in landmarks:
+                    cv2.circle(img, point, 5, (0, 0, 255), -1)
 
             # Guardar la imagen del rostro detectado con el rectángulo y puntos clave
             output_path = "/app/detected_face_with_landmarks.jpg"  # Cambia la ruta si lo deseas
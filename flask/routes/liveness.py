@@ -0,0 +1,116 @@
+import json
+import logging
+
+import cv2
+import numpy as np
+from box_ops import select_faces
+from image_ops import DETECT_INPUT_SIZE, decode_image
+from liveness import MIN_BURST_FRAMES, check_blink_burst, split_mjpeg
+from recognition import detect_boxes
+
+from flask import Blueprint, jsonify, request
+
+# Configuración del logger
+logger = logging.getLogger(__name__)
+
+# Configurar el blueprint
+liveness_bp = Blueprint('liveness', __name__)
+
+MIN_CONFIDENCE = 0.8
+
+
+def locate_face(data):
+    """
+    Caja (x1, y1, x2, y2) del rostro de mayor confianza del fotograma, o None.
+    """
+    img, scale = decode_image(data, DETECT_INPUT_SIZE)
+    if img is None:
+        return None
+
+    boxes = select_faces(detect_boxes(img, scale), MIN_CONFIDENCE)
+    if len(boxes) == 0:
+        return None
+    return boxes[0, :4].astype(int).tolist()
+
+
+@liveness_bp.route('/liveness', methods=['POST'])
+def check_liveness_burst():
+    """
+    Detección de vida por parpadeo en una ráfaga de fotogramas
+    ---
+    summary: Detectar vida
+    description: Endpoint que decide si el rostro es real a partir del parpadeo observado en una ráfaga corta de fotogramas (varias imágenes o un fragmento MJPEG).
+    requestBody:
+      required: true
+      content:
+        multipart/form-data:
+          schema: LivenessSchema
+    responses:
+      200:
+        description: Evaluación de vida realizada
+        content:
+          application/json:
+            schema: LivenessResponseSchema
+      400:
+        description: Error en los datos proporcionados
+      500:
+        description: Error interno del servidor
+    """
+    try:
+        # Fotogramas como varias imágenes o como un fragmento MJPEG
+        if 'video' in request.files:
+            files = split_mjpeg(request.files['video'].read())
+        else:
+            files = [f.read() for f in request.files.getlist('image')]
+
+        if len(files) < MIN_BURST_FRAMES:
+            logger.error(f"La ráfaga tiene {len(files)} fotogramas.")
+            return jsonify({"error": f"Se requieren al menos {MIN_BURST_FRAMES} fotogramas."}), 400
+
+        # Los landmarks trabajan en escala de grises: decodificar directamente en gris
+        frames = [cv2.imdecode(np.frombuffer(f, np.uint8), cv2.IMREAD_GRAYSCALE)
+                  for f in files]
+        if any(frame is None for frame in frames):
+            logger.error("No se pudo decodificar uno de los fotogramas.")
+            return jsonify({"error": "No se pudo decodificar la imagen."}), 400
+
+        # Caja del rostro: proporcionada por el cliente o detectada una sola vez en el primer fotograma
+        if 'face' in request.form:
+            try:
+                face = json.loads(request.form['face'])
+                box = [int(face['x1']), int(face['y1']), int(face['x2']), int(face['y2'])]
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+                logger.error(f"Coordenadas del rostro inválidas: {str(e)}")
+                return jsonify({"error": "Las coordenadas del rostro no son válidas."}), 400
+
+            # La caja debe tener área y caber en el primer fotograma
+            height, width = frames[0].shape[:2]
+            x1, y1, x2, y2 = box
+            if not (0 <= x1 < x2 <= width and 0 <= y1 < y2 <= height):
+                logger.error(f"Caja del rostro fuera del fotograma ({width}x{height}): {box}")
+                return jsonify({"error": "La caja del rostro está vacía o fuera del fotograma."}), 400
+        else:
+            box = locate_face(files[0])
+            if box is None:
+                logger.info("No se detectaron rostros en el primer fotograma.")
+                return jsonify({"live": False, "blink": False, "frames": len(frames), "ear": []}), 200
+
+        blink, ears, timings = check_blink_burst(frames, box)
+
+        response = {
+            "live": blink,
+            "blink": blink,
+            "frames": len(frames),
+            "face": box,
+            "ear": [None if np.isnan(e) else round(float(e), 4) for e in ears],
+            "timings": {k: round(v, 2) for k, v in timings.items()},
+        }
+        logger.info(f"/liveness response: {response}")
+        return jsonify(response), 200
+
+    except FileNotFoundError as e:
+        logger.error(str(e))
+        return jsonify({"error": "El modelo de landmarks no está disponible."}), 500
+    except Exception as e:
+        logger.exception(f"Error en /liveness: {str(e)}")
+        return jsonify({"error": "Ocurrió un error interno en el servidor."}), 500
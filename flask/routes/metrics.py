@@ -0,0 +1,23 @@
+import logging
+
+from metrics import render
+
+from flask import Blueprint, Response
+
+logger = logging.getLogger(__name__)
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Métricas en formato Prometheus
+    ---
+    summary: Métricas del servicio
+    description: Histogramas de latencia por ruta y por etapa (decodificación, detección, vida, reconocimiento, base de datos), solicitudes en curso y estado del pool de conexiones de Oracle, en formato de texto de Prometheus.
+    responses:
+      200:
+        description: Métricas (text/plain; version=0.0.4)
+    """
+    return Response(render(), mimetype='text/plain; version=0.0.4')
@@ -1,8 +1,11 @@
 import logging
 from datetime import datetime
 
+from cache import fetch_one_cached, get_cache
 from db_connection import get_db_connection
+from http_cache import conditional_get, table_version
 from schemas import ProfessorResponseSchema, ProfessorSchema
+from serialization import rows_to_dicts
 
 from flask import Blueprint, jsonify, request
 
@@ -12,6 +15,7 @@ professor_bp = Blueprint('professor', __name__)
 
 
 @professor_bp.route('/professors', methods=['GET'])
+@conditional_get(version=lambda: table_version('PROFESSOR'))
 def get_professors():
     try:
         page = request.args.get('page', 1, type=int)
@@ -51,7 +55,7 @@ def get_professors():
         cursor_total.close()
 
         result = {
-            'items': [dict(zip([col[0] for col in cursor.description], row)) for row in professors],
+            'items': rows_to_dicts(cursor, professors),
             'total': total,
             'page': page,
             'pages': (total // per_page) + (1 if total % per_page > 0 else 0),
@@ -67,6 +71,7 @@ def get_professors():
 
 
 @professor_bp.route('/professor/<int:professor_id>', methods=['GET'])
+@conditional_get('private, max-age=60')
 def get_professor(professor_id):
     """
     Obtener un Profesor por ID
@@ -92,23 +97,17 @@ def get_professor(professor_id):
         description: Error interno del servidor
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT * FROM PROFESSOR WHERE PROFESSOR_ID = :professor_id",
-                       {'professor_id': professor_id})
-        professor = cursor.fetchone()
+        professor = fetch_one_cached(
+            'professor', professor_id, "SELECT * FROM PROFESSOR WHERE PROFESSOR_ID = :professor_id",
+            {'professor_id': professor_id})
 
         if professor is None:
             return jsonify({"error": "Professor no encontrado"}), 404
 
-        return jsonify(dict(zip([key[0] for key in cursor.description], professor))), 200
+        return jsonify(professor), 200
     except Exception as e:
         logger.exception("Error obteniendo Professor")
         return jsonify({"error": str(e)}), 500
-    finally:
-        cursor.close()
-        conn.close()
 
 
 @professor_bp.route('/professor/<int:professor_id>', methods=['PUT'])
@@ -168,6 +167,7 @@ def update_professor(professor_id):
             }
         )
         conn.commit()
+        get_cache().invalidate('professor')
         return jsonify({"message": "Professor actualizado exitosamente"}), 200
     except Exception as e:
         logger.exception("Error actualizando Professor")
@@ -299,6 +299,7 @@ def patch_professor(professor_id):
 
         cursor.execute(sql, values)
         conn.commit()
+        get_cache().invalidate('professor')
 
         return jsonify({"message": "Professor actualizado exitosamente"}), 200
     except Exception as e:
@@ -338,6 +339,7 @@ def delete_professor(professor_id):
         cursor.execute("DELETE FROM PROFESSOR WHERE PROFESSOR_ID = :professor_id", {
                        'professor_id': professor_id})
         conn.commit()
+        get_cache().invalidate('professor')
         return jsonify({"message": "Professor eliminado exitosamente"}), 200
     except Exception as e:
         logger.exception("Error eliminando Professor")
@@ -348,6 +350,7 @@ def delete_professor(professor_id):
 
 
 @professor_bp.route('/professor/id_card/<string:id_card>', methods=['GET'])
+@conditional_get('private, max-age=60')
 def get_professor_by_id_card(id_card):
     """
     Obtener un Profesor por número de identificación
@@ -373,28 +376,23 @@ def get_professor_by_id_card(id_card):
         description: Error interno del servidor
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            "SELECT * FROM PROFESSOR WHERE ID_CARD = :id_card", {'id_card': id_card})
-        professor = cursor.fetchone()
+        professor = fetch_one_cached(
+            'professor', f"id_card:{id_card}", "SELECT * FROM PROFESSOR WHERE ID_CARD = :id_card",
+            {'id_card': id_card})
 
         if professor is None:
             return jsonify({"error": "Docente no reconocido"}), 404
 
-        return jsonify(dict(zip([key[0] for key in cursor.description], professor))), 200
+        return jsonify(professor), 200
     except Exception as e:
         logger.exception("Error obteniendo Professor por ID_CARD")
         return jsonify({"error": str(e)}), 500
-    finally:
-        cursor.close()
-        conn.close()
 
 
 # Nuevos endpoints para obtener profesores por UNIVERSITY_ID, EMAIL y PROFESSOR_CODE
 
 @professor_bp.route('/professor/university/<string:university_id>', methods=['GET'])
+@conditional_get('private, max-age=60')
 def get_professor_by_university_id(university_id):
     """
     Obtener un Profesor por UNIVERSITY_ID
@@ -420,26 +418,21 @@ def get_professor_by_university_id(university_id):
         description: Error interno del servidor
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            "SELECT * FROM PROFESSOR WHERE UNIVERSITY_ID = :university_id", {'university_id': university_id})
-        professor = cursor.fetchone()
+        professor = fetch_one_cached(
+            'professor', f"university_id:{university_id}", "SELECT * FROM PROFESSOR WHERE UNIVERSITY_ID = :university_id",
+            {'university_id': university_id})
 
         if professor is None:
             return jsonify({"error": "Profesor no encontrado"}), 404
 
-        return jsonify(dict(zip([key[0] for key in cursor.description], professor))), 200
+        return jsonify(professor), 200
     except Exception as e:
         logger.exception("Error obteniendo Professor por UNIVERSITY_ID")
         return jsonify({"error": str(e)}), 500
-    finally:
-        cursor.close()
-        conn.close()
 
 
 @professor_bp.route('/professor/email/<string:email>', methods=['GET'])
+@conditional_get('private, max-age=60')
 def get_professor_by_email(email):
     """
     Obtener un Profesor por EMAIL
@@ -465,26 +458,21 @@ def get_professor_by_email(email):
         description: Error interno del servidor
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            "SELECT * FROM PROFESSOR WHERE EMAIL = :email", {'email': email})
-        professor = cursor.fetchone()
+        professor = fetch_one_cached(
+            'professor', f"email:{email}", "SELECT * FROM PROFESSOR WHERE EMAIL = :email",
+            {'email': email})
 
         if professor is None:
             return jsonify({"error": "Profesor no encontrado"}), 404
 
-        return jsonify(dict(zip([key[0] for key in cursor.description], professor))), 200
+        return jsonify(professor), 200
     except Exception as e:
         logger.exception("Error obteniendo Professor por EMAIL")
         return jsonify({"error": str(e)}), 500
-    finally:
-        cursor.close()
-        conn.close()
 
 
 @professor_bp.route('/professor/code/<string:professor_code>', methods=['GET'])
+@conditional_get('private, max-age=60')
 def get_professor_by_code(professor_code):
     """
     Obtener un Profesor por PROFESSOR_CODE
@@ -510,20 +498,14 @@ def get_professor_by_code(professor_code):
         description: Error interno del servidor
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            "SELECT * FROM PROFESSOR WHERE PROFESSOR_CODE = :professor_code", {'professor_code': professor_code})
-        professor = cursor.fetchone()
+        professor = fetch_one_cached(
+            'professor', f"professor_code:{professor_code}", "SELECT * FROM PROFESSOR WHERE PROFESSOR_CODE = :professor_code",
+            {'professor_code': professor_code})
 
         if professor is None:
             return jsonify({"error": "Profesor no encontrado"}), 404
 
-        return jsonify(dict(zip([key[0] for key in cursor.description], professor))), 200
+        return jsonify(professor), 200
     except Exception as e:
         logger.exception("Error obteniendo Professor por PROFESSOR_CODE")
         return jsonify({"error": str(e)}), 500
-    finally:
-        cursor.close()
-        conn.close()
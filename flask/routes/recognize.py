@@ -1,11 +1,12 @@
 import json
 import logging
-import os
 
 import cv2
 import numpy as np
-from deepface import DeepFace
-from utils import detect_liveness
+from liveness import check_liveness
+from metrics import stage
+from recognition import best_match, identify_each
+from tracker import get_session_tracker
 
 from flask import Blueprint, jsonify, request
 
@@ -14,11 +15,31 @@ logger = logging.getLogger(__name__)
 # Configurar el blueprint
 recognize_bp = Blueprint('recognize', __name__)
 
-DEEPFACE_DB_PATH = '/app/academic_staff_database'
 eye_cascade = cv2.CascadeClassifier(
     cv2.data.haarcascades + 'haarcascade_eye.xml')
 
 
+def recognize_tracked(img, regions, confidences, session_id):
+    """
+    Reconoce usando el tracker de la sesión del kiosco: los rostros que siguen en
+    un track ya reconocido reutilizan su identidad sin calcular embeddings.
+    """
+    tracker = get_session_tracker(session_id)
+    boxes = [list(region) + [conf, 0] for region, conf in zip(regions, confidences)]
+    tracked = tracker.update(boxes)
+
+    pending = [i for i, face in enumerate(tracked) if face['recognize']]
+    results = [{'identity': face['identity'], 'score': None, 'candidates': []}
+               for face in tracked]
+    for i, match in zip(pending, identify_each(img, [regions[i] for i in pending])):
+        results[i] = match
+        tracker.set_identity(tracked[i]['track_id'], match['identity'])
+
+    logger.info(f"Sesión {session_id}: {len(tracked) - len(pending)} rostros desde caché, "
+                f"{len(pending)} reconocidos")
+    return results
+
+
 @recognize_bp.route('/recognize', methods=['POST'])
 def recognize_faces():
     """
@@ -54,8 +75,9 @@ def recognize_faces():
             logger.error("El archivo de imagen está vacío.")
             return jsonify({"error": "El archivo de imagen está vacío."}), 400
 
-        np_img = np.frombuffer(file, np.uint8)
-        img = cv2.imdecode(np_img, cv2.IMREAD_COLOR)
+        with stage('decode'):
+            np_img = np.frombuffer(file, np.uint8)
+            img = cv2.imdecode(np_img, cv2.IMREAD_COLOR)
 
         if img is None:
             logger.error(
@@ -78,8 +100,8 @@ def recognize_faces():
             logger.error("La lista de rostros proporcionada está vacía.")
             return jsonify({"error": "No se proporcionaron rostros para reconocer."}), 400
 
-        match_counts = {}  # Diccionario para contar coincidencias por identidad
-
+        # Validar todas las coordenadas antes de ejecutar la detección de vida
+        regions, confidences = [], []
         for face in faces:
             x1, y1, x2, y2 = face.get('x1'), face.get(
                 'y1'), face.get('x2'), face.get('y2')
@@ -101,44 +123,35 @@ def recognize_faces():
                     f"Coordenadas inválidas después de la validación para el rostro: {face}")
                 continue
 
-            # Recortar la región de la imagen donde está el rostro
-            face_img = img[y1:y2, x1:x2]
+            regions.append((x1, y1, x2, y2))
+            confidences.append(float(face.get('confidence', 1.0)))
 
-            if not detect_liveness(face_img, eye_cascade):
+        # Detección de vida de todos los recortes en una sola pasada
+        if regions:
+            crops = [img[y1:y2, x1:x2] for x1, y1, x2, y2 in regions]
+            with stage('liveness'):
+                live, _ = check_liveness(crops, eye_cascade)
+            if not all(live):
                 logger.info("No se detectó vida en el rostro.")
                 return jsonify({"identities": ["No se detectó un rostro real."]})
 
+        session_id = request.form.get('session_id')
+        if session_id and regions:
+            # Con sesión, solo se reconocen los rostros nuevos o cuyo track lo requiere
+            results = recognize_tracked(img, regions, confidences, session_id)
+        else:
             # Realizar el reconocimiento facial usando "Facenet512"
-            try:
-                results = DeepFace.find(
-                    face_img, db_path=DEEPFACE_DB_PATH, model_name="Facenet512", enforce_detection=False)
-                if results and isinstance(results, list):
-                    for df in results:
-                        if not df.empty:
-                            for _, row in df.iterrows():
-                                identity = row.get('identity', '')
-                                if identity:
-                                    identity_name = os.path.basename(
-                                        os.path.dirname(identity))
-                                    match_counts[identity_name] = match_counts.get(
-                                        identity_name, 0) + 1
-                        else:
-                            logger.info(
-                                "No se encontraron coincidencias para el rostro actual.")
-                else:
-                    logger.info(
-                        "DeepFace no devolvió resultados para el rostro actual.")
-            except Exception as e:
-                logger.exception(
-                    f"Error en el reconocimiento facial: {str(e)}")
-                continue  # Continuar con el siguiente rostro en caso de error
-
-        # Determinar la identidad con el mayor número de coincidencias
-        if match_counts:
-            recognized_identity = max(match_counts, key=match_counts.get)
-            response = {"identities": [recognized_identity]}
+            results = identify_each(img, regions)
+
+        # Identidad con el mayor puntaje que supera el umbral calibrado
+        match = best_match(results)
+        if match and match['identity']:
+            response = {"identities": [match['identity']]}
         else:
             response = {"identities": ["Desconocido"]}
+        if match:
+            response["score"] = match['score']
+            response["candidates"] = match['candidates']
 
         logger.info(f"/recognize response: {response}")
         return jsonify(response), 200
@@ -1,6 +1,7 @@
 import logging
 from datetime import datetime
 
+from cache import fetch_one_cached, get_cache
 from db_connection import get_db_connection
 
 from flask import Blueprint, jsonify, request
@@ -103,23 +104,17 @@ def get_role(role_id):
         description: Error interno del servidor
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            "SELECT * FROM ROLE WHERE ROLE_ID = :role_id", {'role_id': role_id})
-        role = cursor.fetchone()
+        role = fetch_one_cached(
+            'role', role_id, "SELECT * FROM ROLE WHERE ROLE_ID = :role_id",
+            {'role_id': role_id})
 
         if role is None:
             return jsonify({"error": "Role no encontrado"}), 404
 
-        return jsonify(dict(zip([key[0] for key in cursor.description], role))), 200
+        return jsonify(role), 200
     except Exception as e:
         logger.exception("Error obteniendo Role")
         return jsonify({"error": str(e)}), 500
-    finally:
-        cursor.close()
-        conn.close()
 
 
 @role_bp.route('/role/<int:role_id>', methods=['PUT'])
@@ -169,6 +164,7 @@ def update_role(role_id):
             }
         )
         conn.commit()
+        get_cache().invalidate('role')
         return jsonify({"message": "Role actualizado exitosamente"}), 200
     except Exception as e:
         logger.exception("Error actualizando Role")
@@ -207,6 +203,7 @@ def delete_role(role_id):
         cursor.execute("DELETE FROM ROLE WHERE ROLE_ID = :role_id", {
                        'role_id': role_id})
         conn.commit()
+        get_cache().invalidate('role')
         return jsonify({"message": "Role eliminado exitosamente"}), 200
     except Exception as e:
         logger.exception("Error eliminando Role")
@@ -0,0 +1,80 @@
+import json
+import logging
+import queue
+
+from capture import get_event_bus, start_capture
+from embedding_cache import get_embedding_cache
+from tracker import FaceTracker
+
+from flask import Blueprint, Response, jsonify
+
+# Configuración del logger
+logger = logging.getLogger(__name__)
+
+# Configurar el blueprint
+stream_bp = Blueprint('stream', __name__)
+
+# Segundos sin eventos tras los que se envía un comentario para mantener viva la conexión
+KEEPALIVE_SECONDS = 15
+
+
+def ensure_capture():
+    """
+    Inicia las cámaras de CAPTURE_SOURCES (un tracker por cámara) en el primer
+    uso de /stream y no al importar el blueprint: así los procesos que solo
+    importan la aplicación (recargador, otros workers, el cliente de pruebas)
+    no abren los dispositivos. Con CAPTURE_SOURCES vacío no hace nada.
+    """
+    return start_capture(tracker_factory=FaceTracker)
+
+
+@stream_bp.route('/stream/events', methods=['GET'])
+def stream_events():
+    """
+    Eventos de reconocimiento de las cámaras del servidor
+    ---
+    summary: Eventos de reconocimiento
+    description: Flujo Server-Sent Events con un evento por rostro reconocido en las cámaras configuradas en CAPTURE_SOURCES.
+    responses:
+      200:
+        description: Flujo de eventos (text/event-stream)
+    """
+    ensure_capture()
+    bus = get_event_bus()
+    subscriber = bus.subscribe()
+
+    def generate():
+        try:
+            while True:
+                try:
+                    event = subscriber.get(timeout=KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: recognition\ndata: {json.dumps(event)}\n\n"
+        finally:
+            bus.unsubscribe(subscriber)
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@stream_bp.route('/stream/status', methods=['GET'])
+def stream_status():
+    """
+    Estado de las cámaras del servidor
+    ---
+    summary: Estado de la captura
+    description: Contadores de cada cámara (capturados, descartados, reconocidos), aciertos de la caché de embeddings y los últimos eventos publicados.
+    responses:
+      200:
+        description: Estado de la captura
+    """
+    pipelines = ensure_capture()
+    return jsonify({
+        "cameras": {p.name: dict(p.stats, source=p.source,
+                                 tracker=p.tracker.stats if p.tracker else None)
+                    for p in pipelines.values()},
+        "embedding_cache": get_embedding_cache().snapshot(),
+        "recent_events": list(get_event_bus().recent),
+    }), 200
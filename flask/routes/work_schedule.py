@@ -1,6 +1,7 @@
 import logging
 from datetime import datetime
 
+from cache import fetch_one_cached, get_cache
 from db_connection import get_db_connection
 
 from flask import Blueprint, jsonify, request
@@ -108,23 +109,17 @@ def get_schedule(scheduleid):
         description: Error interno del servidor
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            "SELECT * FROM WORK_SCHEDULE WHERE SCHEDULEID = :scheduleid", {'scheduleid': scheduleid})
-        work_schedule = cursor.fetchone()
+        work_schedule = fetch_one_cached(
+            'work_schedule', scheduleid, "SELECT * FROM WORK_SCHEDULE WHERE SCHEDULEID = :scheduleid",
+            {'scheduleid': scheduleid})
 
         if work_schedule is None:
             return jsonify({"error": "Schedule no encontrado"}), 404
 
-        return jsonify(dict(zip([key[0] for key in cursor.description], work_schedule))), 200
+        return jsonify(work_schedule), 200
     except Exception as e:
         logger.exception("Error obteniendo Schedule")
         return jsonify({"error": str(e)}), 500
-    finally:
-        cursor.close()
-        conn.close()
 
 
 @work_schedule_bp.route('/work_schedule/<int:scheduleid>', methods=['PUT'])
@@ -182,6 +177,7 @@ def update_schedule(scheduleid):
             }
         )
         conn.commit()
+        get_cache().invalidate('work_schedule')
         return jsonify({"message": "Schedule actualizado exitosamente"}), 200
     except ValueError as ve:
         logger.warning(f"Error de validación: {ve}")
@@ -223,6 +219,7 @@ def delete_schedule(scheduleid):
         cursor.execute("DELETE FROM WORK_SCHEDULE WHERE SCHEDULEID = :scheduleid", {
                        'scheduleid': scheduleid})
         conn.commit()
+        get_cache().invalidate('work_schedule')
         return jsonify({"message": "Schedule eliminado exitosamente"}), 200
     except Exception as e:
         logger.exception("Error eliminando Schedule")
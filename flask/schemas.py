@@ -198,9 +198,25 @@ class CreateEmbeddingResponseSchema(Schema):
     message = fields.Str(required=True, description="Mensaje de éxito")
 
 
+class BulkEmbeddingSchema(Schema):
+    archive = fields.Raw(
+        description="Zip con una carpeta por maestro (nombre = maestro_id) con sus imágenes")
+    image = fields.List(fields.Raw(), description="Imágenes de los rostros")
+    maestro_id = fields.List(fields.Int(),
+                             description="ID del maestro de cada imagen (o uno para todas)")
+
+
 class DetectFaceSchema(Schema):
     image = fields.Raw(
-        required=True, description="Imagen para detectar rostros")
+        required=True, description="Imagen para detectar rostros (se admiten varias de la misma cámara)")
+    max_faces = fields.Int(
+        description="Número máximo de rostros a devolver (0 = todos, por defecto 1)")
+    min_face_size = fields.Float(
+        description="Lado mínimo en píxeles de un rostro válido")
+    compact = fields.Bool(
+        description="Devolver cada rostro como [x1, y1, x2, y2, confianza]")
+    save_image = fields.Bool(
+        description="Guardar la imagen con los rostros marcados (el primer fotograma de una ráfaga)")
 
 
 class DetectFaceResponseSchema(Schema):
@@ -213,8 +229,53 @@ class RecognizeFaceSchema(Schema):
         required=True, description="Imagen para reconocer rostros")
     faces = fields.List(fields.Dict(), required=True,
                         description="Coordenadas de los rostros detectados")
+    session_id = fields.Str(
+        description="Identificador del kiosco; reutiliza la identidad de los rostros ya seguidos")
 
 
 class RecognizeFaceResponseSchema(Schema):
     identities = fields.List(fields.Str(), required=True,
                              description="Lista de identidades reconocidas")
+    score = fields.Float(
+        description="Puntaje de similitud de la mejor identidad", allow_none=True)
+    candidates = fields.List(fields.Dict(),
+                             description="Identidades más parecidas con su puntaje")
+
+
+class LivenessSchema(Schema):
+    image = fields.Raw(
+        description="Fotogramas de la ráfaga (varias imágenes de la misma cámara)")
+    video = fields.Raw(
+        description="Fragmento MJPEG con los fotogramas de la ráfaga")
+    face = fields.Dict(
+        description="Coordenadas del rostro en el primer fotograma (si se omite, se detecta)")
+
+
+class LivenessResponseSchema(Schema):
+    live = fields.Bool(required=True, description="El rostro es real")
+    blink = fields.Bool(required=True, description="Se detectó un parpadeo")
+    frames = fields.Int(required=True, description="Fotogramas analizados")
+    face = fields.List(fields.Int(), description="Caja del rostro en el primer fotograma")
+    ear = fields.List(fields.Float(allow_none=True), required=True,
+                      description="Eye aspect ratio de cada fotograma")
+    timings = fields.Dict(description="Tiempo de cada etapa en milisegundos")
+
+
+class AttendanceReportResponseSchema(Schema):
+    date_from = fields.Date(required=True, description="Fecha inicial del reporte")
+    date_to = fields.Date(required=True, description="Fecha final del reporte")
+    group_by = fields.List(fields.Str(), required=True,
+                           description="Dimensiones de agrupación")
+    items = fields.List(fields.Dict(), required=True,
+                        description="Clases programadas, asistidas y perdidas, horas y atrasos por grupo")
+    total = fields.Int(required=True, description="Número total de grupos")
+    page = fields.Int(required=True, description="Página actual")
+    pages = fields.Int(required=True, description="Número de páginas")
+    per_page = fields.Int(required=True, description="Grupos por página")
+
+
+class DailySummaryResponseSchema(Schema):
+    date_from = fields.Date(required=True, description="Fecha inicial")
+    date_to = fields.Date(required=True, description="Fecha final")
+    items = fields.List(fields.Dict(), required=True,
+                        description="Clases y horas programadas y asistidas, atrasos y salidas sin registrar por profesor y día")
@@ -0,0 +1,112 @@
+"""
+Serialización de resultados de Oracle a JSON.
+
+- Los nombres de columna se calculan una vez por sentencia (cursor.statement) y
+  no por fila.
+- Decimal, LOB, bytes, fechas y tipos de numpy se convierten en un solo lugar.
+- OrjsonProvider reemplaza el proveedor JSON de Flask (jsonify) por orjson,
+  con la misma salida que el proveedor por defecto: claves ordenadas y fechas
+  en formato HTTP. Sin orjson instalado se usa el proveedor por defecto.
+
+    python -m benchmarks.bench_serialization
+"""
+import base64
+import threading
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from werkzeug.http import http_date
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Sentencias distintas cuyas columnas se recuerdan
+COLUMN_CACHE_SIZE = 256
+
+_columns = {}
+_columns_lock = threading.Lock()
+
+
+def column_names(cursor):
+    """
+    Tupla con los nombres de columna de la última sentencia del cursor.
+    """
+    statement = cursor.statement
+    names = _columns.get(statement)
+    if names is None:
+        names = tuple(col[0] for col in cursor.description)
+        with _columns_lock:
+            if len(_columns) >= COLUMN_CACHE_SIZE:
+                _columns.clear()
+            _columns[statement] = names
+    return names
+
+
+def row_to_dict(cursor, row):
+    return dict(zip(column_names(cursor), row))
+
+
+def rows_to_dicts(cursor, rows):
+    names = column_names(cursor)
+    return [dict(zip(names, row)) for row in rows]
+
+
+def to_native(value):
+    """
+    Valor serializable para los tipos que el codificador JSON no conoce.
+    """
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (datetime, date)):
+        return http_date(value)
+    if isinstance(value, time):
+        return value.isoformat()
+    if hasattr(value, 'read'):  # cx_Oracle.LOB
+        value = value.read()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(value).decode('ascii')
+    if isinstance(value, str):
+        return value
+    if hasattr(value, 'tolist'):  # escalares y arreglos de numpy
+        return value.tolist()
+    # UUID, dataclasses, Markup...; lanza TypeError para el resto
+    return DefaultJSONProvider.default(value)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Proveedor JSON de Flask con orjson; las fechas pasan por to_native para
+    conservar el formato HTTP del proveedor por defecto.
+    """
+
+    def _options(self, indent=False):
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            kwargs.setdefault('default', to_native)
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=to_native,
+                            option=self._options(kwargs.get('indent'))).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=to_native, option=self._options(indent))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
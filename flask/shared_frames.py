@@ -0,0 +1,144 @@
+import logging
+import os
+import threading
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+# Configuración del logger
+logger = logging.getLogger(__name__)
+
+# Anillo de memoria compartida con ranuras preasignadas para los fotogramas
+FRAME_RING_NAME = os.environ.get('FRAME_RING_NAME', 'attendance_frames')
+FRAME_RING_SLOTS = int(os.environ.get('FRAME_RING_SLOTS', 16))
+# Por defecto cabe un fotograma 1080p BGR; los más grandes se envían serializados
+FRAME_SLOT_BYTES = int(os.environ.get('FRAME_SLOT_BYTES', 1920 * 1080 * 3))
+
+
+class FrameRef:
+    """
+    Referencia a un fotograma escrito en una ranura del anillo. Opcionalmente
+    apunta a una región (recorte) del fotograma, sin copiar sus píxeles.
+    """
+    __slots__ = ('slot', 'shape', 'dtype', 'region')
+
+    def __init__(self, slot, shape, dtype, region=None):
+        self.slot = slot
+        self.shape = tuple(shape)
+        self.dtype = str(dtype)
+        self.region = region
+
+    def crop(self, x1, y1, x2, y2):
+        return FrameRef(self.slot, self.shape, self.dtype, (y1, y2, x1, x2))
+
+    @property
+    def nbytes(self):
+        return int(np.prod(self.shape)) * np.dtype(self.dtype).itemsize
+
+    def __repr__(self):
+        return f"FrameRef(slot={self.slot}, shape={self.shape}, region={self.region})"
+
+
+class FrameRing:
+    """
+    Bloque de memoria compartida dividido en ranuras de tamaño fijo.
+    """
+
+    def __init__(self, shm, slots, slot_bytes, owner=False):
+        self.shm = shm
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.owner = owner
+
+    @classmethod
+    def create(cls, name=FRAME_RING_NAME, slots=FRAME_RING_SLOTS, slot_bytes=FRAME_SLOT_BYTES):
+        try:
+            # Eliminar un segmento huérfano de una ejecución anterior
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+
+        shm = shared_memory.SharedMemory(
+            name=name, create=True, size=slots * slot_bytes)
+        logger.info(
+            f"Anillo de fotogramas '{name}' creado: {slots} ranuras de {slot_bytes} bytes")
+        return cls(shm, slots, slot_bytes, owner=True)
+
+    @classmethod
+    def attach(cls, name, slots, slot_bytes):
+        shm = shared_memory.SharedMemory(name=name)
+        # Solo el creador debe eliminar el segmento al terminar
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return cls(shm, slots, slot_bytes)
+
+    def fits(self, array):
+        return array.nbytes <= self.slot_bytes
+
+    def view(self, ref):
+        """
+        Devuelve un ndarray sobre la memoria compartida (sin copia) para la referencia.
+        """
+        offset = ref.slot * self.slot_bytes
+        array = np.ndarray(ref.shape, dtype=ref.dtype,
+                           buffer=self.shm.buf, offset=offset)
+        if ref.region is not None:
+            y1, y2, x1, x2 = ref.region
+            array = array[y1:y2, x1:x2]
+        return array
+
+    def write(self, slot, array):
+        """
+        Copia el fotograma una sola vez en la ranura y devuelve su referencia.
+        """
+        ref = FrameRef(slot, array.shape, array.dtype)
+        np.copyto(self.view(ref), array, casting='no')
+        return ref
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class SlotAllocator:
+    """
+    Reparte las ranuras del anillo entre las conexiones de los clientes.
+    """
+
+    def __init__(self, slots):
+        self._free = list(range(slots))
+        self._lock = threading.Lock()
+
+    def lease(self, count):
+        with self._lock:
+            count = min(count, len(self._free))
+            leased, self._free = self._free[:count], self._free[count:]
+        return leased
+
+    def release(self, slots):
+        with self._lock:
+            self._free.extend(slots)
+
+
+# Anillo adjunto en procesos que solo leen fotogramas (procesos de inferencia)
+_attached = {}
+
+
+def get_attached_ring(name, slots, slot_bytes):
+    ring = _attached.get(name)
+    if ring is None:
+        ring = FrameRing.attach(name, slots, slot_bytes)
+        _attached[name] = ring
+    return ring
+
+
+def resolve_frames(ring, args, kwargs):
+    """
+    Sustituye las FrameRef de los argumentos por vistas sobre la memoria compartida.
+    """
+    args = tuple(ring.view(a) if isinstance(a, FrameRef) else a for a in args)
+    kwargs = {k: ring.view(v) if isinstance(v, FrameRef) else v
+              for k, v in kwargs.items()}
+    return args, kwargs
@@ -0,0 +1,16 @@
+-- Anomalías de asistencia detectadas por attendance_anomalies.py:
+--     ABSENT        clase programada sin ningún registro de asistencia
+--     MISSING_EXIT  entrada registrada sin salida pasado END_TIME + gracia
+CREATE TABLE ATTENDANCE_ANOMALY (
+    ATTENDANCE_ANOMALY_ID NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    CLASS_SCHEDULE_ID     NUMBER       NOT NULL,
+    PROFESSOR_ID          NUMBER       NOT NULL,
+    SESSION_DATE          DATE         NOT NULL,
+    ANOMALY_TYPE          VARCHAR2(20) NOT NULL,
+    EXPECTED_START        DATE         NOT NULL,
+    EXPECTED_END          DATE         NOT NULL,
+    DETECTED_AT           DATE         DEFAULT SYSDATE NOT NULL,
+    CONSTRAINT ATTENDANCE_ANOMALY_UK UNIQUE (CLASS_SCHEDULE_ID, SESSION_DATE, ANOMALY_TYPE)
+);
+
+CREATE INDEX ATTENDANCE_ANOMALY_DATE_IX ON ATTENDANCE_ANOMALY (SESSION_DATE, PROFESSOR_ID);
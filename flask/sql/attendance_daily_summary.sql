@@ -0,0 +1,21 @@
+-- Resumen diario de asistencia: una fila por profesor y día.
+-- Lo mantiene register_attendance en cada entrada/salida y se regenera con
+--     python attendance_summary.py --date-from 2024-09-01 --date-to 2025-01-31
+CREATE TABLE ATTENDANCE_DAILY_SUMMARY (
+    PROFESSOR_ID      NUMBER       NOT NULL,
+    SUMMARY_DATE      DATE         NOT NULL,
+    SCHEDULED_CLASSES NUMBER       DEFAULT 0 NOT NULL,
+    SCHEDULED_HOURS   NUMBER(8, 2) DEFAULT 0 NOT NULL,
+    ATTENDED_CLASSES  NUMBER       DEFAULT 0 NOT NULL,
+    ATTENDED_HOURS    NUMBER(8, 2) DEFAULT 0 NOT NULL,
+    LATE_ENTRIES      NUMBER       DEFAULT 0 NOT NULL,
+    LATE_EXITS        NUMBER       DEFAULT 0 NOT NULL,
+    MISSING_EXITS     NUMBER       DEFAULT 0 NOT NULL,
+    UPDATED_AT        DATE         DEFAULT SYSDATE NOT NULL,
+    CONSTRAINT ATTENDANCE_DAILY_SUMMARY_PK PRIMARY KEY (PROFESSOR_ID, SUMMARY_DATE)
+);
+
+CREATE INDEX ATT_DAILY_SUMMARY_DATE_IX ON ATTENDANCE_DAILY_SUMMARY (SUMMARY_DATE);
+
+-- La actualización incremental agrega las asistencias de un profesor en un día
+CREATE INDEX CSA_PROFESSOR_DATE_IX ON CLASS_SCHEDULE_ATTENDANCE (PROFESSOR_ID, REGISTER_DATE);
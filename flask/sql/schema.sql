@@ -0,0 +1,100 @@
+-- Esquema base de espe_system (Oracle 21c), el que usan las consultas de routes/.
+-- Las tablas derivadas están en attendance_daily_summary.sql y attendance_anomaly.sql;
+-- schema_sqlite.sql es el mismo esquema para DB_BACKEND=sqlite.
+
+CREATE TABLE ROLE (
+    ROLE_ID      NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    ROLENAME     VARCHAR2(50) NOT NULL,
+    CREATIONDATE DATE         DEFAULT SYSDATE NOT NULL
+);
+
+CREATE TABLE APP_USER (
+    USER_ID           NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    FIRST_NAME        VARCHAR2(100) NOT NULL,
+    LAST_NAME         VARCHAR2(100) NOT NULL,
+    EMAIL             VARCHAR2(150) NOT NULL,
+    PASSWORD          VARCHAR2(255) NOT NULL,
+    ROLE_ID           NUMBER REFERENCES ROLE (ROLE_ID),
+    REGISTRATION_DATE DATE,
+    PROFESSOR_ID      NUMBER,
+    TEACHERID         NUMBER,
+    CONSTRAINT APP_USER_EMAIL_UK UNIQUE (EMAIL)
+);
+
+CREATE TABLE PROFESSOR (
+    PROFESSOR_ID      NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    USER_ID           NUMBER REFERENCES APP_USER (USER_ID),
+    PROFESSOR_CODE    VARCHAR2(10)  NOT NULL,
+    FIRST_NAME        VARCHAR2(100) NOT NULL,
+    LAST_NAME         VARCHAR2(100) NOT NULL,
+    EMAIL             VARCHAR2(150) NOT NULL,
+    REGISTRATION_DATE DATE,
+    PHOTO             VARCHAR2(255),
+    UNIVERSITY_ID     VARCHAR2(20),
+    ID_CARD           VARCHAR2(20),
+    CONSTRAINT PROFESSOR_CODE_UK UNIQUE (PROFESSOR_CODE)
+);
+
+CREATE INDEX PROFESSOR_LAST_NAME_IX ON PROFESSOR (LAST_NAME);
+CREATE INDEX PROFESSOR_UNIVERSITY_ID_IX ON PROFESSOR (UNIVERSITY_ID);
+CREATE INDEX PROFESSOR_ID_CARD_IX ON PROFESSOR (ID_CARD);
+CREATE INDEX PROFESSOR_EMAIL_IX ON PROFESSOR (EMAIL);
+
+CREATE TABLE WORK_SCHEDULE (
+    SCHEDULEID   NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    TEACHERID    NUMBER        NOT NULL,
+    DAYS_OF_WEEK VARCHAR2(100) NOT NULL,
+    START_TIME   DATE          NOT NULL,
+    END_TIME     DATE          NOT NULL,
+    TOTAL_HOURS  NUMBER(5, 2)
+);
+
+-- El orden de las columnas importa: register_attendance lee la fila por posición
+-- (SUBJECT 5, NRC 6, TYPE 11, START_TIME 14, END_TIME 15, DAYS_OF_WEEK 16).
+-- START_TIME y END_TIME guardan solo la hora, sobre una fecha fija.
+CREATE TABLE CLASS_SCHEDULE (
+    CLASS_SCHEDULE_ID NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    PROFESSOR_ID      NUMBER REFERENCES PROFESSOR (PROFESSOR_ID),
+    KNOWLEDGE_AREA    VARCHAR2(150),
+    EDUCATION_LEVEL   VARCHAR2(50),
+    CODE              VARCHAR2(20)  NOT NULL,
+    SUBJECT           VARCHAR2(200) NOT NULL,
+    NRC               VARCHAR2(20)  NOT NULL,
+    STATUS            VARCHAR2(20),
+    SECTION           VARCHAR2(20),
+    CREDITS           NUMBER(4, 1),
+    BUILDING          VARCHAR2(50),
+    TYPE              VARCHAR2(50),
+    CLASSROOM         VARCHAR2(50),
+    CAPACITY          NUMBER,
+    START_TIME        DATE          NOT NULL,
+    END_TIME          DATE          NOT NULL,
+    DAYS_OF_WEEK      VARCHAR2(100) NOT NULL,
+    CONSTRAINT CLASS_SCHEDULE_UK UNIQUE (PROFESSOR_ID, NRC, DAYS_OF_WEEK, START_TIME)
+);
+
+CREATE TABLE CLASS_SCHEDULE_ATTENDANCE (
+    CLASS_SCHEDULE_ATTENDANCE_ID NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    CLASS_SCHEDULE_ID            NUMBER NOT NULL REFERENCES CLASS_SCHEDULE (CLASS_SCHEDULE_ID),
+    PROFESSOR_ID                 NUMBER NOT NULL,
+    REGISTER_DATE                DATE   NOT NULL,
+    ENTRY_TIME                   TIMESTAMP,
+    EXIT_TIME                    TIMESTAMP,
+    TOTAL_HOURS                  NUMBER(6, 2) DEFAULT 0,
+    LATE_ENTRY                   VARCHAR2(2),
+    LATE_EXIT                    VARCHAR2(2),
+    TYPE                         VARCHAR2(50),
+    REGISTER_ENTRY               VARCHAR2(2),
+    REGISTER_EXIT                VARCHAR2(2),
+    ATTENDANCE_CODE              VARCHAR2(50)
+);
+
+-- Búsqueda de la entrada del día al registrar la salida
+CREATE INDEX CSA_SCHEDULE_DATE_IX ON CLASS_SCHEDULE_ATTENDANCE (CLASS_SCHEDULE_ID, PROFESSOR_ID, REGISTER_DATE);
+
+-- Imágenes y embeddings inscritos desde /create_embedding
+CREATE TABLE Rostros (
+    MaestroID       NUMBER NOT NULL,
+    ImagenRostro    BLOB,
+    Caracteristicas CLOB
+);
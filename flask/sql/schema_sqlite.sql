@@ -0,0 +1,127 @@
+-- Esquema de schema.sql, attendance_daily_summary.sql y attendance_anomaly.sql para
+-- DB_BACKEND=sqlite (SQLite >= 3.39). sqlite_backend lo crea en una base vacía.
+-- Las columnas DATE/TIMESTAMP guardan texto 'YYYY-MM-DD HH:MM:SS[.ffffff]' y se
+-- leen como datetime, igual que con cx_Oracle.
+
+CREATE TABLE ROLE (
+    ROLE_ID      INTEGER PRIMARY KEY,
+    ROLENAME     TEXT NOT NULL,
+    CREATIONDATE DATE DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+CREATE TABLE APP_USER (
+    USER_ID           INTEGER PRIMARY KEY,
+    FIRST_NAME        TEXT NOT NULL,
+    LAST_NAME         TEXT NOT NULL,
+    EMAIL             TEXT NOT NULL,
+    PASSWORD          TEXT NOT NULL,
+    ROLE_ID           INTEGER REFERENCES ROLE (ROLE_ID),
+    REGISTRATION_DATE DATE,
+    PROFESSOR_ID      INTEGER,
+    TEACHERID         INTEGER,
+    CONSTRAINT APP_USER_EMAIL_UK UNIQUE (EMAIL)
+);
+
+CREATE TABLE PROFESSOR (
+    PROFESSOR_ID      INTEGER PRIMARY KEY,
+    USER_ID           INTEGER REFERENCES APP_USER (USER_ID),
+    PROFESSOR_CODE    TEXT NOT NULL,
+    FIRST_NAME        TEXT NOT NULL,
+    LAST_NAME         TEXT NOT NULL,
+    EMAIL             TEXT NOT NULL,
+    REGISTRATION_DATE DATE,
+    PHOTO             TEXT,
+    UNIVERSITY_ID     TEXT,
+    ID_CARD           TEXT,
+    CONSTRAINT PROFESSOR_CODE_UK UNIQUE (PROFESSOR_CODE)
+);
+
+CREATE INDEX PROFESSOR_LAST_NAME_IX ON PROFESSOR (LAST_NAME);
+CREATE INDEX PROFESSOR_UNIVERSITY_ID_IX ON PROFESSOR (UNIVERSITY_ID);
+CREATE INDEX PROFESSOR_ID_CARD_IX ON PROFESSOR (ID_CARD);
+CREATE INDEX PROFESSOR_EMAIL_IX ON PROFESSOR (EMAIL);
+
+CREATE TABLE WORK_SCHEDULE (
+    SCHEDULEID   INTEGER PRIMARY KEY,
+    TEACHERID    INTEGER NOT NULL,
+    DAYS_OF_WEEK TEXT    NOT NULL,
+    START_TIME   DATE    NOT NULL,
+    END_TIME     DATE    NOT NULL,
+    TOTAL_HOURS  REAL
+);
+
+CREATE TABLE CLASS_SCHEDULE (
+    CLASS_SCHEDULE_ID INTEGER PRIMARY KEY,
+    PROFESSOR_ID      INTEGER REFERENCES PROFESSOR (PROFESSOR_ID),
+    KNOWLEDGE_AREA    TEXT,
+    EDUCATION_LEVEL   TEXT,
+    CODE              TEXT NOT NULL,
+    SUBJECT           TEXT NOT NULL,
+    NRC               TEXT NOT NULL,
+    STATUS            TEXT,
+    SECTION           TEXT,
+    CREDITS           REAL,
+    BUILDING          TEXT,
+    TYPE              TEXT,
+    CLASSROOM         TEXT,
+    CAPACITY          INTEGER,
+    START_TIME        DATE NOT NULL,
+    END_TIME          DATE NOT NULL,
+    DAYS_OF_WEEK      TEXT NOT NULL,
+    CONSTRAINT CLASS_SCHEDULE_UK UNIQUE (PROFESSOR_ID, NRC, DAYS_OF_WEEK, START_TIME)
+);
+
+CREATE TABLE CLASS_SCHEDULE_ATTENDANCE (
+    CLASS_SCHEDULE_ATTENDANCE_ID INTEGER PRIMARY KEY,
+    CLASS_SCHEDULE_ID            INTEGER NOT NULL REFERENCES CLASS_SCHEDULE (CLASS_SCHEDULE_ID),
+    PROFESSOR_ID                 INTEGER NOT NULL,
+    REGISTER_DATE                DATE    NOT NULL,
+    ENTRY_TIME                   TIMESTAMP,
+    EXIT_TIME                    TIMESTAMP,
+    TOTAL_HOURS                  REAL DEFAULT 0,
+    LATE_ENTRY                   TEXT,
+    LATE_EXIT                    TEXT,
+    TYPE                         TEXT,
+    REGISTER_ENTRY               TEXT,
+    REGISTER_EXIT                TEXT,
+    ATTENDANCE_CODE              TEXT
+);
+
+CREATE INDEX CSA_SCHEDULE_DATE_IX ON CLASS_SCHEDULE_ATTENDANCE (CLASS_SCHEDULE_ID, PROFESSOR_ID, REGISTER_DATE);
+CREATE INDEX CSA_PROFESSOR_DATE_IX ON CLASS_SCHEDULE_ATTENDANCE (PROFESSOR_ID, REGISTER_DATE);
+
+CREATE TABLE Rostros (
+    MaestroID       INTEGER NOT NULL,
+    ImagenRostro    BLOB,
+    Caracteristicas TEXT
+);
+
+CREATE TABLE ATTENDANCE_DAILY_SUMMARY (
+    PROFESSOR_ID      INTEGER NOT NULL,
+    SUMMARY_DATE      DATE    NOT NULL,
+    SCHEDULED_CLASSES INTEGER DEFAULT 0 NOT NULL,
+    SCHEDULED_HOURS   REAL    DEFAULT 0 NOT NULL,
+    ATTENDED_CLASSES  INTEGER DEFAULT 0 NOT NULL,
+    ATTENDED_HOURS    REAL    DEFAULT 0 NOT NULL,
+    LATE_ENTRIES      INTEGER DEFAULT 0 NOT NULL,
+    LATE_EXITS        INTEGER DEFAULT 0 NOT NULL,
+    MISSING_EXITS     INTEGER DEFAULT 0 NOT NULL,
+    UPDATED_AT        DATE    DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    CONSTRAINT ATTENDANCE_DAILY_SUMMARY_PK PRIMARY KEY (PROFESSOR_ID, SUMMARY_DATE)
+);
+
+CREATE INDEX ATT_DAILY_SUMMARY_DATE_IX ON ATTENDANCE_DAILY_SUMMARY (SUMMARY_DATE);
+
+CREATE TABLE ATTENDANCE_ANOMALY (
+    ATTENDANCE_ANOMALY_ID INTEGER PRIMARY KEY,
+    CLASS_SCHEDULE_ID     INTEGER NOT NULL,
+    PROFESSOR_ID          INTEGER NOT NULL,
+    SESSION_DATE          DATE    NOT NULL,
+    ANOMALY_TYPE          TEXT    NOT NULL,
+    EXPECTED_START        DATE    NOT NULL,
+    EXPECTED_END          DATE    NOT NULL,
+    DETECTED_AT           DATE    DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    CONSTRAINT ATTENDANCE_ANOMALY_UK UNIQUE (CLASS_SCHEDULE_ID, SESSION_DATE, ANOMALY_TYPE)
+);
+
+CREATE INDEX ATTENDANCE_ANOMALY_DATE_IX ON ATTENDANCE_ANOMALY (SESSION_DATE, PROFESSOR_ID);
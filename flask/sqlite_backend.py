@@ -0,0 +1,301 @@
+"""
+Implementación SQLite del acceso a datos (DB_BACKEND=sqlite, ver db_connection).
+
+Sirve para pruebas de carga, benchmarks y perfiles sin el contenedor de Oracle:
+la base es un archivo (DB_SQLITE_PATH) o, con ":memory:", una base en memoria
+compartida por las conexiones del proceso. En una base vacía se crea el esquema
+de sql/schema_sqlite.sql.
+
+Las rutas siguen escribiendo SQL de Oracle; translate reescribe las
+construcciones que SQLite no tiene (ORACLE_TO_SQLITE) y se registran TO_CHAR y
+TO_DATE. Las sentencias sin equivalente mecánico (el MERGE del resumen diario)
+tienen su variante en el módulo que las define. Los errores se lanzan con la
+forma de cx_Oracle (e.args[0].code, getbatcherrors).
+"""
+import itertools
+import logging
+import os
+import re
+import sqlite3
+from datetime import date, datetime
+from functools import lru_cache
+
+# Configuración del logger
+logger = logging.getLogger(__name__)
+
+DB_SQLITE_PATH = os.environ.get('DB_SQLITE_PATH', ':memory:')
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sql', 'schema_sqlite.sql')
+# Milisegundos que una escritura espera a que se libere el bloqueo de la base
+DB_SQLITE_TIMEOUT_MS = int(os.environ.get('DB_SQLITE_TIMEOUT_MS', 5000))
+
+# Reescrituras de SQL de Oracle a SQLite, en orden
+ORACLE_TO_SQLITE = [
+    # Calendario: SELECT :desde + LEVEL - 1 AS DAY FROM DUAL CONNECT BY LEVEL <= :hasta - :desde + 1
+    (re.compile(r"SELECT\s+(:\w+)\s*\+\s*LEVEL\s*-\s*1\s+AS\s+(\w+)\s+FROM\s+DUAL\s+"
+                r"CONNECT\s+BY\s+LEVEL\s*<=\s*(:\w+)\s*-\s*:\w+\s*\+\s*1", re.IGNORECASE),
+     r"WITH RECURSIVE calendar(\2) AS (SELECT datetime(\1, 'start of day') UNION ALL "
+     r"SELECT datetime(\2, '+1 day') FROM calendar WHERE \2 < datetime(\3, 'start of day')) "
+     r"SELECT \2 FROM calendar"),
+    # Paginación con ROWNUM:
+    #   SELECT a.*, ROWNUM rnum FROM (... ORDER BY cols) a WHERE ROWNUM <= :max_row) WHERE rnum >= :min_row
+    # SQLite no garantiza conservar el ORDER BY de una subconsulta: la numeración
+    # usa el mismo orden (cols son columnas de la subconsulta) y se ordena por ella
+    (re.compile(r"\bROWNUM\s+(\w+)\s+FROM\s*\((.*)\bORDER\s+BY\s+([^()]+?)\s*\)\s*(\w+)\s+"
+                r"WHERE\s+ROWNUM\s*<=\s*(:\w+)\s*\)\s*WHERE\s+\1\s*>=\s*(:\w+)",
+                re.IGNORECASE | re.DOTALL),
+     r"ROW_NUMBER() OVER (ORDER BY \3) AS \1 FROM (\2ORDER BY \3) \4 "
+     r"ORDER BY \1 LIMIT \5) WHERE \1 >= \6 ORDER BY \1"),
+    # Diferencia de DATE en días, pasada a horas
+    (re.compile(r"\(([\w.]+) - ([\w.]+)\) \* 24"), r"((julianday(\1) - julianday(\2)) * 24)"),
+    (re.compile(r"\bNVL\(", re.IGNORECASE), "IFNULL("),
+    (re.compile(r"\bGREATEST\(", re.IGNORECASE), "MAX("),
+    (re.compile(r"\bSYSDATE\b", re.IGNORECASE), "datetime('now', 'localtime')"),
+    (re.compile(r"MAX\(ORA_ROWSCN\)", re.IGNORECASE), "DATA_VERSION()"),
+    (re.compile(r"ROWIDTOCHAR\(ROWID\)", re.IGNORECASE), "CAST(ROWID AS TEXT)"),
+]
+
+# En Oracle la división de NUMBER nunca es entera: entre dos operandos
+# (columna, número, bind o paréntesis) y fuera de los literales de texto
+DIVISION_RE = re.compile(r"(?<=[\w)])\s+/\s+(?=[\w(:])")
+STRING_LITERAL_RE = re.compile(r"('(?:[^']|'')*')")
+
+# Elementos de formato de fecha de Oracle -> strftime
+DATE_FORMATS = {'YYYY': '%Y', 'MM': '%m', 'DD': '%d', 'HH24': '%H', 'MI': '%M', 'SS': '%S', 'Day': '%A'}
+DATE_FORMAT_RE = re.compile('|'.join(sorted(DATE_FORMATS, key=len, reverse=True)))
+
+# Mensaje de SQLite -> código ORA de la restricción violada
+INTEGRITY_CODES = (('UNIQUE', 1), ('NOT NULL', 1400), ('CHECK', 2290), ('FOREIGN KEY', 2291))
+
+
+@lru_cache(maxsize=512)
+def translate(statement):
+    for pattern, replacement in ORACLE_TO_SQLITE:
+        statement = pattern.sub(replacement, statement)
+    # Las partes pares de split quedan fuera de las comillas
+    parts = STRING_LITERAL_RE.split(statement)
+    parts[::2] = [DIVISION_RE.sub(" * 1.0 / ", part) for part in parts[::2]]
+    return ''.join(parts)
+
+
+@lru_cache(maxsize=64)
+def strftime_format(oracle_format):
+    return DATE_FORMAT_RE.sub(lambda m: DATE_FORMATS[m.group()], oracle_format)
+
+
+def to_char(value, oracle_format=None, nls=None):
+    if value is None or oracle_format is None:
+        return value if value is None else str(value)
+    return datetime.fromisoformat(value).strftime(strftime_format(oracle_format))
+
+
+def to_date(value, oracle_format):
+    if value is None:
+        return None
+    return datetime.strptime(value, strftime_format(oracle_format)).isoformat(' ')
+
+
+def adapt_date(value):
+    return value.isoformat() + ' 00:00:00'
+
+
+def adapt_datetime(value):
+    return value.replace(tzinfo=None).isoformat(' ')
+
+
+def convert_datetime(value):
+    return datetime.fromisoformat(value.decode())
+
+
+# Fechas como texto ordenable; DATE y TIMESTAMP se leen como datetime (como cx_Oracle)
+sqlite3.register_adapter(date, adapt_date)
+sqlite3.register_adapter(datetime, adapt_datetime)
+sqlite3.register_converter('DATE', convert_datetime)
+sqlite3.register_converter('TIMESTAMP', convert_datetime)
+
+
+class _Error:
+    """
+    Detalle del error como el de cx_Oracle (e.args[0]).
+    """
+
+    def __init__(self, message, code=0, offset=0):
+        self.message = message
+        self.code = code
+        self.offset = offset
+
+    def __str__(self):
+        return self.message
+
+
+class DatabaseError(Exception):
+    pass
+
+
+class IntegrityError(DatabaseError):
+    pass
+
+
+def oracle_error(e, offset=0):
+    message = str(e)
+    if isinstance(e, sqlite3.IntegrityError):
+        code = next((code for prefix, code in INTEGRITY_CODES if message.startswith(prefix)), 0)
+        return IntegrityError(_Error(message, code, offset))
+    return DatabaseError(_Error(message, 0, offset))
+
+
+class SqliteCursor:
+    """
+    Cursor con la parte de la interfaz de cx_Oracle que usa la aplicación.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._batch_errors = []
+        self.arraysize = 100
+        self.prefetchrows = 0
+        self.statement = None
+
+    @property
+    def description(self):
+        # Oracle devuelve en mayúsculas los nombres sin comillas
+        if self._cursor.description is None:
+            return None
+        return [(col[0].upper(),) + tuple(col[1:]) for col in self._cursor.description]
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def execute(self, statement, binds=()):
+        self.statement = statement
+        try:
+            self._cursor.execute(translate(statement), binds)
+        except sqlite3.DatabaseError as e:
+            raise oracle_error(e) from e
+
+    def executemany(self, statement, rows, batcherrors=False):
+        self.statement = statement
+        self._batch_errors = []
+        if not batcherrors:
+            try:
+                self._cursor.executemany(translate(statement), rows)
+            except sqlite3.DatabaseError as e:
+                raise oracle_error(e) from e
+            return
+        # Como batcherrors de cx_Oracle: las filas válidas se insertan y las demás se informan
+        sql = translate(statement)
+        for offset, row in enumerate(rows):
+            try:
+                self._cursor.execute(sql, row)
+            except sqlite3.DatabaseError as e:
+                self._batch_errors.append(oracle_error(e, offset).args[0])
+
+    def getbatcherrors(self):
+        return self._batch_errors
+
+    def setinputsizes(self, *args, **kwargs):
+        pass
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size=None):
+        return self._cursor.fetchmany(size or self.arraysize)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def close(self):
+        self._cursor.close()
+
+
+class SqliteConnection:
+    def __init__(self, backend):
+        self.backend = backend
+        self._connection = backend.open()
+        self._changes = self._connection.total_changes
+
+    def cursor(self):
+        return SqliteCursor(self._connection.cursor())
+
+    def commit(self):
+        self._connection.commit()
+        if self._connection.total_changes != self._changes:
+            self._changes = self._connection.total_changes
+            self.backend.bump_version()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def close(self):
+        self._connection.close()
+
+
+class SqliteBackend:
+    """
+    Una conexión de SQLite por get_db_connection (abrirla cuesta microsegundos,
+    no hace falta pool). Con ":memory:" se mantiene abierta una conexión para
+    que la base compartida no desaparezca entre solicitudes.
+    """
+    name = 'sqlite'
+    DatabaseError = DatabaseError
+    IntegrityError = IntegrityError
+
+    def __init__(self, path=DB_SQLITE_PATH):
+        self.memory = path == ':memory:'
+        self.uri = f"file:espe_system_{os.getpid()}?mode=memory&cache=shared" if self.memory else path
+        self.versions = itertools.count(1)
+        self.version = 0
+        self.keepalive = None
+
+        connection = self.open()
+        if not connection.execute("SELECT name FROM sqlite_master WHERE name = 'CLASS_SCHEDULE'").fetchone():
+            with open(SCHEMA_PATH) as f:
+                connection.executescript(f.read())
+            logger.info(f"Esquema de SQLite creado en {path}")
+        if self.memory:
+            self.keepalive = connection
+        else:
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.close()
+
+    def open(self):
+        connection = sqlite3.connect(self.uri, uri=self.memory, detect_types=sqlite3.PARSE_DECLTYPES,
+                                     check_same_thread=False, timeout=DB_SQLITE_TIMEOUT_MS / 1000)
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.create_function('TO_CHAR', -1, to_char, deterministic=True)
+        connection.create_function('TO_DATE', 2, to_date, deterministic=True)
+        connection.create_function('DATA_VERSION', 0, self.data_version)
+        return connection
+
+    def bump_version(self):
+        self.version = next(self.versions)
+
+    def data_version(self):
+        """
+        Sustituto de MAX(ORA_ROWSCN) para table_version: cambia con cada commit
+        que modificó filas (en un archivo, también con los de otros procesos).
+        """
+        if self.memory:
+            return self.version
+        # Con WAL los commits escriben en el archivo -wal hasta el checkpoint
+        mtimes = [os.stat(path).st_mtime_ns for path in (self.uri, self.uri + '-wal')
+                  if os.path.exists(path)]
+        return f"{max(mtimes)}.{self.version}"
+
+    def connect(self):
+        return SqliteConnection(self)
+
+    def pool_stats(self):
+        return None
+
+    def insert_returning_id(self, cursor, statement, binds, column):
+        cursor.execute(statement, binds)
+        return cursor.lastrowid
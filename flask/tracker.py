@@ -0,0 +1,178 @@
+"""
+Seguimiento de rostros entre fotogramas (estilo SORT, sin filtro de Kalman).
+
+Cada caja detectada se asocia por IoU con la posición predicha (velocidad
+constante) de los tracks existentes. La identidad reconocida se guarda en el
+track y solo se vuelve a reconocer cuando:
+  - el track es nuevo (un track perdido reaparece como uno nuevo),
+  - la confianza de la detección baja de REID_CONFIDENCE,
+  - el rostro fue "Desconocido" o no vivo y pasó UNKNOWN_RETRY_SECONDS,
+  - pasó REID_INTERVAL_SECONDS desde el último reconocimiento.
+"""
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from box_ops import box_iou
+
+# IoU mínimo entre la caja predicha de un track y una detección para asociarlas
+TRACK_IOU_THRESHOLD = float(os.environ.get('TRACK_IOU_THRESHOLD', 0.3))
+# Segundos sin detecciones tras los que un track se da por perdido
+TRACK_MAX_AGE = float(os.environ.get('TRACK_MAX_AGE', 1.0))
+REID_CONFIDENCE = float(os.environ.get('REID_CONFIDENCE', 0.85))
+REID_INTERVAL_SECONDS = float(os.environ.get('REID_INTERVAL_SECONDS', 30))
+UNKNOWN_RETRY_SECONDS = float(os.environ.get('UNKNOWN_RETRY_SECONDS', 1.0))
+# Un reconocimiento pedido y no resuelto (p. ej. fotograma descartado) se reintenta
+PENDING_TIMEOUT_SECONDS = 2.0
+# Trackers de /recognize por session_id
+MAX_SESSIONS = 256
+SESSION_TTL_SECONDS = 60
+
+
+class Track:
+    __slots__ = ('track_id', 'box', 'velocity', 'confidence', 'last_seen', 'hits',
+                 'identity', 'live', 'recognized_at', 'pending_since')
+
+    def __init__(self, track_id, box, confidence, timestamp):
+        self.track_id = track_id
+        self.box = box
+        self.velocity = np.zeros(4, dtype=np.float32)
+        self.confidence = confidence
+        self.last_seen = timestamp
+        self.hits = 1
+        self.identity = None
+        self.live = None
+        self.recognized_at = None
+        self.pending_since = None
+
+    def predict(self, timestamp):
+        return self.box + self.velocity * (timestamp - self.last_seen)
+
+    def update(self, box, confidence, timestamp):
+        dt = timestamp - self.last_seen
+        if dt > 0:
+            self.velocity = (box - self.box) / dt
+        self.box = box
+        self.confidence = confidence
+        self.last_seen = timestamp
+        self.hits += 1
+
+    def needs_recognition(self, timestamp):
+        if self.pending_since is not None and timestamp - self.pending_since < PENDING_TIMEOUT_SECONDS:
+            return False
+        if self.recognized_at is None or self.confidence < REID_CONFIDENCE:
+            return True
+        elapsed = timestamp - self.recognized_at
+        if self.identity is None or not self.live:
+            return elapsed >= UNKNOWN_RETRY_SECONDS
+        return elapsed >= REID_INTERVAL_SECONDS
+
+
+class FaceTracker:
+    """
+    Asigna identificadores de track a las cajas (x1, y1, x2, y2, conf, ...) de cada
+    fotograma y guarda en caché la identidad reconocida de cada track.
+    """
+
+    def __init__(self, iou_threshold=TRACK_IOU_THRESHOLD, max_age=TRACK_MAX_AGE):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.tracks = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.stats = {'tracks': 0, 'recognitions': 0, 'cached': 0}
+
+    def match(self, boxes, timestamp):
+        """
+        Asociación voraz por IoU descendente entre tracks y detecciones.
+        Devuelve {índice de detección: track}.
+        """
+        tracks = list(self.tracks.values())
+        if not tracks or len(boxes) == 0:
+            return {}
+
+        predicted = np.stack([t.predict(timestamp) for t in tracks])
+        iou = box_iou(predicted, boxes)
+        pairs = np.argwhere(iou >= self.iou_threshold)
+        pairs = pairs[np.argsort(-iou[pairs[:, 0], pairs[:, 1]], kind='stable')]
+
+        matches, used_tracks = {}, set()
+        for t, d in pairs.tolist():
+            if t not in used_tracks and d not in matches:
+                matches[d] = tracks[t]
+                used_tracks.add(t)
+        return matches
+
+    def update(self, boxes, timestamp=None):
+        """
+        Devuelve un diccionario por caja con track_id, box, identity (en caché) y
+        recognize (True si el rostro debe reconocerse en este fotograma).
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 6)
+
+        with self.lock:
+            # Descartar los tracks perdidos
+            for track_id in [i for i, t in self.tracks.items()
+                             if timestamp - t.last_seen > self.max_age]:
+                del self.tracks[track_id]
+
+            matches = self.match(boxes, timestamp)
+            faces = []
+            for d, box in enumerate(boxes):
+                track = matches.get(d)
+                if track is None:
+                    track = Track(next(self.ids), box[:4].copy(), float(box[4]), timestamp)
+                    self.tracks[track.track_id] = track
+                    self.stats['tracks'] += 1
+                else:
+                    track.update(box[:4].copy(), float(box[4]), timestamp)
+
+                recognize = track.needs_recognition(timestamp)
+                if recognize:
+                    track.pending_since = timestamp
+                    self.stats['recognitions'] += 1
+                else:
+                    self.stats['cached'] += 1
+
+                faces.append({
+                    'track_id': track.track_id,
+                    'box': box[:4].astype(int).tolist(),
+                    'identity': track.identity,
+                    'live': track.live,
+                    'recognize': recognize,
+                })
+            return faces
+
+    def set_identity(self, track_id, identity, live=True, timestamp=None):
+        with self.lock:
+            track = self.tracks.get(track_id)
+            if track is None:
+                return
+            track.identity = identity
+            track.live = live
+            track.recognized_at = time.time() if timestamp is None else timestamp
+            track.pending_since = None
+
+
+_sessions = OrderedDict()
+_sessions_lock = threading.Lock()
+
+
+def get_session_tracker(session_id):
+    """
+    Tracker de la sesión de un kiosco; las sesiones inactivas se descartan.
+    """
+    now = time.time()
+    with _sessions_lock:
+        for key in [k for k, (_, used) in _sessions.items() if now - used > SESSION_TTL_SECONDS]:
+            del _sessions[key]
+
+        tracker = _sessions.pop(session_id, (None, None))[0] or FaceTracker()
+        _sessions[session_id] = (tracker, now)
+        while len(_sessions) > MAX_SESSIONS:
+            _sessions.popitem(last=False)
+        return tracker